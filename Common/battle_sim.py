@@ -0,0 +1,417 @@
+"""
+NumPy 벡터화 전투 시뮬레이터 (시간적으로 이어진 학습 데이터 생성)
+
+generate_sample_data는 특성을 서로 독립인 균등 난수로, generate_battle_sequence는 시나리오별
+독립 잡음으로 만들어 실제 전투의 흐름(피해가 쌓이면 HP가 줄고, 아군이 죽으면 주변 아군 수가
+줄어드는 등)이 없습니다. 이 모듈은 전투 수천 개를 (전투, 유닛) 배열로 들고 한 번에 진행합니다.
+
+유닛 상태 (B 전투 x U 유닛, U = 팀당 유닛 수 x 2, 앞 절반이 팀 0):
+    hp, max_hp, attack(30~100), defense(20~80), position (x, y 0~100), 팀, 팀 목표 지점
+
+한 스텝:
+1. 같은 전투 안 유닛 간 거리 (B, U, U)로 가장 가까운 적, 반경 NEARBY_RADIUS 안 아군/적 수,
+   아군/적 평균 HP 비율 계산 -> create_state_vector 배치(11개 특성) 상태
+2. 행동 = label_actions 규칙 (explore 확률로 무작위 행동), 상태와 규칙 행동이 MLP 학습 샘플
+3. 이동 (ATTACK: 사거리 밖이면 적에게 접근, DEFEND: 사거리 밖이면 절반 속도로 접근,
+   MOVE_FORWARD: 목표 지점으로, RETREAT: 적 반대로, WAIT: 제자리)
+4. 사거리 안에서 ATTACK/DEFEND 중인 유닛이 가장 가까운 적을 공격 (방어 중인 대상은 피해 절반)
+5. 유닛별 전투 이벤트(create_event_vector 배치 7개 특성)를 최근 T개 이력에 추가
+   -> 살아 있는 유닛의 이력 윈도우가 GRU 학습 샘플
+   감정 레이블: 전장 우세도 a = (아군 HP 합 - 적 HP 합) / (합계)로 EMOTION_LABEL_TABLE의
+   'even' 행과 'winning'(a > 0) / 'losing'(a < 0) 행 사이를 보간
+6. 한 팀이 전멸하거나 제한 스텝이 지나면 승패(battle_outcome)를 기록하고 새 전투로 교체
+
+시작 배치(팀 간 간격, 초기 HP, 좌우 반전)를 전투마다 무작위로 뽑고 스텝마다 keep 비율만 샘플로
+내보내서, 적은 샘플을 요청해도 전투 초반 상태만 나오지 않게 합니다.
+
+simulate_sample_data / simulate_training_data / simulate_variable_length_data는
+generate_sample_data_batch 등과 같은 (num_samples, ..., rng) 형태라 Common.parallel_gen과
+학습 스크립트의 --generator sim에 그대로 사용할 수 있습니다.
+
+실행 (처리량, 기존 생성기와 분포 비교, 저장소 루트에서):
+    python -m Common.battle_sim --battles 4096 --steps 200
+    python -m Common.battle_sim --samples 1000000 --output sim_data.npz
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from GRU.gru_enhanced import EMOTION_LABEL_TABLE, create_event_vectors
+from MLP.mlp import ACTIONS, create_state_vectors, label_actions
+
+ARENA = 100.0
+NEARBY_RADIUS = 30.0
+ATTACK_RANGE = 12.0  # label_action의 '적이 15 안쪽이면 공격'보다 약간 짧게
+SPEED = 3.0
+DAMAGE_SCALE = 0.2
+EVENT_SIZE = 7
+
+# 생성 데이터 버전과 결과에 영향을 주는 다른 모듈 (Common.dataset_cache 키에 소스 해시 포함)
+# 레이블 규칙(label_actions, EMOTION_LABEL_TABLE)과 정규화(create_*_vectors)를 가져다 씀
+DATASET_VERSION = 1
+DATASET_DEPENDS = ('MLP.mlp', 'GRU.gru_enhanced')
+
+# EMOTION_LABEL_TABLE 행 순서 (gru_enhanced.SCENARIOS)
+WINNING, LOSING, EVEN = EMOTION_LABEL_TABLE
+
+
+class BattleSimulator:
+    """
+    전투 num_battles개를 동시에 진행하는 시뮬레이터
+    - step() -> (states (M, 11), actions (M,), sequences (K, T, 7), lengths (K,), emotions (K, 3))
+    - events=False면 이벤트 이력을 만들지 않음 (MLP 상태만 필요할 때 더 빠름)
+    - min_length < sequence_length면 이력이 짧은 유닛(전투 초반)도 앞쪽 L개 + 0 패딩 윈도우로 내보냄
+    """
+
+    def __init__(self, num_battles=1024, units_per_team=8, sequence_length=5, min_length=None,
+                 max_steps=150, explore=0.1, keep=0.25, events=True, rng=None):
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.num_battles = num_battles
+        self.num_units = units_per_team * 2
+        self.sequence_length = sequence_length
+        self.min_length = sequence_length if min_length is None else min_length
+        self.max_steps = max_steps
+        self.explore = explore
+        self.keep = keep
+        self.events = events
+
+        b, u = num_battles, self.num_units
+        self.team = np.arange(u) >= units_per_team
+        self.same_team = self.team[:, None] == self.team[None, :]
+        self.ally_pairs = self.same_team & ~np.eye(u, dtype=bool)
+        self.hp = np.zeros((b, u))
+        self.max_hp = np.zeros((b, u))
+        self.attack = np.zeros((b, u))
+        self.defense = np.zeros((b, u))
+        self.position = np.zeros((b, u, 2))
+        self.objective = np.zeros((b, u, 2))
+        self.steps = np.zeros(b, dtype=np.int64)
+        self.time_limit = np.zeros(b, dtype=np.int64)
+        self.history = np.zeros((b, u, sequence_length, EVENT_SIZE), dtype=np.float32) if events else None
+        self.history_length = np.zeros((b, u), dtype=np.int64)
+        self.battles_finished = 0
+        self.reset(np.ones(b, dtype=bool))
+
+    def reset(self, battles):
+        """
+        battles (B,) bool 마스크의 전투를 새로 배치
+        """
+        rng = self.rng
+        n, u = int(battles.sum()), self.num_units
+        if n == 0:
+            return
+        max_hp = rng.uniform(80, 120, (n, u))
+        self.max_hp[battles] = max_hp
+        self.hp[battles] = max_hp * rng.uniform(0.5, 1.0, (n, u))
+        self.attack[battles] = rng.uniform(30, 100, (n, u))
+        self.defense[battles] = rng.uniform(20, 80, (n, u))
+
+        # 팀 0은 왼쪽, 팀 1은 오른쪽에 모여서 시작 (간격은 전투마다 다르게, 절반은 좌우 반전)
+        gap = rng.uniform(5, 70, (n, 1))
+        center = rng.uniform(0.5 * gap + 10, ARENA - 0.5 * gap - 10)
+        x = np.where(self.team, center + 0.5 * gap, center - 0.5 * gap) + rng.normal(0, 4, (n, u))
+        y = rng.uniform(10, ARENA - 10, (n, 1)) + rng.normal(0, 8, (n, u))
+        flip = rng.random((n, 1)) < 0.5
+        x = np.where(flip, ARENA - x, x)
+        self.position[battles] = np.clip(np.stack([x, y], axis=-1), 0, ARENA)
+
+        # 목표 지점: 상대 팀 시작 지점 쪽 가장자리
+        enemy_side = np.where(self.team ^ flip, 10.0, ARENA - 10.0)
+        self.objective[battles] = np.stack([enemy_side, np.full((n, u), ARENA / 2)], axis=-1)
+
+        self.steps[battles] = 0
+        self.time_limit[battles] = rng.integers(self.max_steps // 2, self.max_steps + 1, n)
+        self.history_length[battles] = 0
+        if self.events:
+            self.history[battles] = 0.0
+
+    def _observe(self):
+        """
+        현재 상태에서 유닛별 관측값 계산 (원본 값 단위)
+        """
+        alive = self.hp > 0
+        offset = self.position[:, None, :, :] - self.position[:, :, None, :]  # [b, i, j] = j 위치 - i 위치
+        distance = np.sqrt((offset ** 2).sum(axis=-1))
+        enemy = ~self.same_team & alive[:, None, :]
+        ally = self.ally_pairs & alive[:, None, :]
+
+        enemy_distance = np.where(enemy, distance, np.inf)
+        nearest = enemy_distance.argmin(axis=2)
+        nearest_distance = np.take_along_axis(enemy_distance, nearest[..., None], axis=2)[..., 0]
+        near = distance < NEARBY_RADIUS
+        hp_ratio = np.maximum(self.hp, 0) / self.max_hp
+        ally_count = ally.sum(axis=2)
+        enemy_count = enemy.sum(axis=2)
+        allies_hp = np.where(ally, hp_ratio[:, None, :], 0).sum(axis=2) / np.maximum(ally_count, 1)
+        enemies_hp = np.where(enemy, hp_ratio[:, None, :], 0).sum(axis=2) / np.maximum(enemy_count, 1)
+
+        return {
+            'alive': alive,
+            'has_enemy': enemy_count > 0,
+            'nearest': nearest,
+            'offset': np.take_along_axis(offset, nearest[..., None, None], axis=2)[:, :, 0],
+            'hp_ratio': hp_ratio,
+            'attack': self.attack,
+            'defense': self.defense,
+            'distance_to_nearest_enemy': np.minimum(nearest_distance, ARENA),
+            'nearby_allies': (ally & near).sum(axis=2),
+            'nearby_enemies': (enemy & near).sum(axis=2),
+            'allies_avg_hp': allies_hp,
+            'enemies_avg_hp': enemies_hp,
+            'position_x': self.position[..., 0],
+            'position_y': self.position[..., 1],
+            'distance_to_objective': np.sqrt(((self.objective - self.position) ** 2).sum(axis=-1)),
+        }
+
+    def _move(self, observed, actions):
+        rng = self.rng
+        direction = observed['offset'] / np.maximum(np.sqrt((observed['offset'] ** 2).sum(axis=-1)), 1e-6)[..., None]
+        to_objective = self.objective - self.position
+        to_objective /= np.maximum(np.sqrt((to_objective ** 2).sum(axis=-1)), 1e-6)[..., None]
+
+        out_of_range = observed['distance_to_nearest_enemy'] > ATTACK_RANGE
+        velocity = np.zeros_like(self.position)
+        approach = (actions == ACTIONS['ATTACK']) & out_of_range
+        velocity[approach] = direction[approach]
+        advance = (actions == ACTIONS['DEFEND']) & out_of_range
+        velocity[advance] = 0.5 * direction[advance]
+        forward = actions == ACTIONS['MOVE_FORWARD']
+        velocity[forward] = to_objective[forward]
+        retreat = actions == ACTIONS['RETREAT']
+        velocity[retreat] = -direction[retreat]
+
+        velocity *= SPEED
+        velocity += rng.normal(0, 0.5, velocity.shape)
+        velocity[~(observed['alive'] & observed['has_enemy'])] = 0.0
+        np.clip(self.position + velocity, 0, ARENA, out=self.position)
+
+    def _combat(self, observed, actions):
+        """
+        이번 스텝에 유닛별로 받은 피해 (B, U)
+        """
+        b, u = self.hp.shape
+        fighting = np.isin(actions, (ACTIONS['ATTACK'], ACTIONS['DEFEND']))
+        attackers = (observed['alive'] & observed['has_enemy'] & fighting
+                     & (observed['distance_to_nearest_enemy'] <= ATTACK_RANGE))
+        target = (np.arange(b)[:, None] * u + observed['nearest'])[attackers]
+        target_defense = self.defense.ravel()[target]
+        damage = (self.attack[attackers] * self.rng.uniform(0.5, 1.0, len(target)) * DAMAGE_SCALE
+                  * 100.0 / (100.0 + target_defense))
+        damage[actions.ravel()[target] == ACTIONS['DEFEND']] *= 0.5
+        return np.bincount(target, weights=damage, minlength=b * u).reshape(b, u)
+
+    def _emotions(self, alive):
+        """
+        전장 우세도로 보간한 감정 레이블 (B, U, 3)
+        """
+        hp_ratio = np.maximum(self.hp, 0) / self.max_hp * alive
+        team_hp = np.stack([hp_ratio[:, ~self.team].sum(axis=1), hp_ratio[:, self.team].sum(axis=1)], axis=1)
+        ally_hp = team_hp[:, self.team.astype(np.int64)]
+        enemy_hp = team_hp[:, (~self.team).astype(np.int64)]
+        advantage = (ally_hp - enemy_hp) / np.maximum(ally_hp + enemy_hp, 1e-6)
+        target = np.where(advantage[..., None] >= 0, WINNING, LOSING)
+        return (EVEN + np.abs(advantage)[..., None] * (target - EVEN)).astype(np.float32)
+
+    def _windows(self, rows):
+        """
+        이력에서 rows (B, U) 마스크 유닛의 윈도우를 앞쪽 정렬로 꺼냄 (L < T면 뒤쪽 0 패딩)
+        """
+        history = self.history[rows]
+        lengths = np.minimum(self.history_length[rows], self.sequence_length)
+        t = self.sequence_length
+        short = lengths < t
+        if short.any():
+            # 이력은 최신 이벤트가 끝에 오도록 쌓이므로 마지막 L개를 앞으로 당김
+            index = (np.arange(t) + (t - lengths[short])[:, None]) % t
+            shifted = np.take_along_axis(history[short], index[..., None], axis=1)
+            shifted[np.arange(t) >= lengths[short][:, None]] = 0.0
+            history[short] = shifted
+        return history, lengths
+
+    def step(self):
+        """
+        모든 전투를 한 스텝 진행하고 이번 스텝의 학습 샘플 반환
+        """
+        rng = self.rng
+        observed = self._observe()
+        acting = observed['alive'] & observed['has_enemy']
+
+        hp_ratio = observed['hp_ratio']
+        actions = label_actions(hp_ratio, observed['distance_to_nearest_enemy'],
+                                observed['nearby_allies'], observed['nearby_enemies']).reshape(hp_ratio.shape)
+        taken = np.where(rng.random(actions.shape) < self.explore,
+                         rng.integers(0, len(ACTIONS), actions.shape), actions)
+
+        sampled = acting & (rng.random(acting.shape) < self.keep)
+        states = create_state_vectors({name: observed[name][sampled] for name in (
+            'hp_ratio', 'attack', 'defense', 'distance_to_nearest_enemy', 'nearby_allies', 'nearby_enemies',
+            'allies_avg_hp', 'enemies_avg_hp', 'position_x', 'position_y', 'distance_to_objective')})
+        labels = actions[sampled]
+
+        previous_distance = observed['distance_to_nearest_enemy']
+        self._move(observed, taken)
+        damage = self._combat(observed, taken)
+        self.hp -= damage
+        alive = self.hp > 0
+        died = observed['alive'] & ~alive
+        self.steps += 1
+
+        team_alive = np.stack([alive[:, ~self.team].any(axis=1), alive[:, self.team].any(axis=1)], axis=1)
+        finished = ~team_alive.all(axis=1) | (self.steps >= self.time_limit)
+
+        sequences = lengths = emotions = None
+        if self.events:
+            # 승패: 전멸이면 남은 팀 승리, 시간 초과면 남은 HP 비율 합이 큰 팀 승리 (같으면 0)
+            hp_left = np.maximum(self.hp, 0) / self.max_hp
+            team_hp = np.stack([hp_left[:, ~self.team].sum(axis=1), hp_left[:, self.team].sum(axis=1)], axis=1)
+            team_outcome = np.sign(team_hp - team_hp[:, ::-1]) * finished[:, None]
+            team_died = np.stack([died[:, ~self.team].any(axis=1), died[:, self.team].any(axis=1)], axis=1)
+            team_index = self.team.astype(np.int64)
+
+            offset = np.take_along_axis(self.position, observed['nearest'][..., None], axis=1) - self.position
+            new_distance = np.minimum(np.sqrt((offset ** 2).sum(axis=-1)), ARENA)
+            distance_change = np.where(acting, np.clip(new_distance - previous_distance, -50, 50), 0.0)
+
+            event = create_event_vectors({
+                'hp_ratio': hp_left,
+                'damage_taken': damage / self.max_hp * 100.0,
+                'ally_died': team_died[:, team_index],
+                'enemy_died': team_died[:, 1 - team_index],
+                'distance_change': distance_change,
+                'nearby_enemies': observed['nearby_enemies'],
+                'battle_outcome': team_outcome[:, team_index],
+            })
+            self.history[:, :, :-1] = self.history[:, :, 1:]
+            self.history[:, :, -1] = event
+            self.history_length += acting
+
+            ready = acting & alive & (self.history_length >= self.min_length)
+            ready &= rng.random(ready.shape) < self.keep
+            sequences, lengths = self._windows(ready)
+            emotions = self._emotions(alive)[ready]
+
+        self.battles_finished += int(finished.sum())
+        self.reset(finished)
+        return states, labels, sequences, lengths, emotions
+
+
+def _auto_battles(num_samples, units_per_team, keep, steps=50):
+    """
+    요청 샘플 수가 적어도 최소 steps 스텝 이상 진행되도록 전투 수 결정 (16~1024)
+    """
+    return int(np.clip(num_samples / (units_per_team * 2 * keep * steps), 16, 1024))
+
+
+def _collect(num_samples, simulator, outputs):
+    """
+    simulator.step() 출력 중 outputs 인덱스 배열들을 num_samples개 모을 때까지 진행
+    """
+    chunks = [[] for _ in outputs]
+    total = 0
+    while total < num_samples:
+        result = simulator.step()
+        for chunk, index in zip(chunks, outputs):
+            chunk.append(result[index])
+        total += len(result[outputs[0]])
+    return tuple(np.concatenate(chunk)[:num_samples] for chunk in chunks)
+
+
+def simulate_sample_data(num_samples=1000, rng=None, units_per_team=8, explore=0.1, keep=0.25, num_battles=None):
+    """
+    generate_sample_data_batch의 시뮬레이터 버전
+    - 반환값: states (N, 11) float32, actions (N,) int64 (label_actions 규칙 레이블)
+    """
+    simulator = BattleSimulator(num_battles or _auto_battles(num_samples, units_per_team, keep), units_per_team,
+                                explore=explore, keep=keep, events=False, rng=rng)
+    return _collect(num_samples, simulator, (0, 1))
+
+
+def simulate_training_data(num_samples=2000, sequence_length=5, rng=None, units_per_team=8, explore=0.1,
+                           keep=0.25, num_battles=None):
+    """
+    generate_training_data_batch의 시뮬레이터 버전
+    - 반환값: sequences (N, T, 7) float32, emotions (N, 3) float32
+    """
+    simulator = BattleSimulator(num_battles or _auto_battles(num_samples, units_per_team, keep), units_per_team,
+                                sequence_length, explore=explore, keep=keep, rng=rng)
+    return _collect(num_samples, simulator, (2, 4))
+
+
+def simulate_variable_length_data(num_samples=2000, max_length=5, min_length=1, rng=None, units_per_team=8,
+                                  explore=0.1, keep=0.25, num_battles=None):
+    """
+    generate_variable_length_data_batch의 시뮬레이터 버전 (전투 초반 유닛은 이력이 짧은 그대로 사용)
+    - 반환값: sequences (N, T_max, 7) float32, lengths (N,) int64, emotions (N, 3) float32
+    """
+    simulator = BattleSimulator(num_battles or _auto_battles(num_samples, units_per_team, keep), units_per_team,
+                                max_length, min_length, explore=explore, keep=keep, rng=rng)
+    return _collect(num_samples, simulator, (2, 3, 4))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벡터화 전투 시뮬레이터 처리량/분포 확인")
+    parser.add_argument('--battles', type=int, default=4096)
+    parser.add_argument('--units-per-team', type=int, default=8)
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--sequence-length', type=int, default=5)
+    parser.add_argument('--explore', type=float, default=0.1)
+    parser.add_argument('--keep', type=float, default=1.0, help="스텝마다 내보낼 샘플 비율")
+    parser.add_argument('--samples', type=int, default=0, help="저장할 MLP/GRU 샘플 수 (--output과 함께)")
+    parser.add_argument('--output', help="simulate_sample_data / simulate_training_data 결과 .npz")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    from GRU.gru_enhanced import generate_training_data_batch
+    from MLP.mlp import generate_sample_data_batch
+
+    rng = np.random.default_rng(args.seed)
+    simulator = BattleSimulator(args.battles, args.units_per_team, args.sequence_length,
+                                explore=args.explore, keep=args.keep, rng=rng)
+    simulator.step()  # 워밍업
+    states, actions, windows, emotions = [], [], [], []
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        step_states, step_actions, step_windows, _, step_emotions = simulator.step()
+        states.append(step_states)
+        actions.append(step_actions)
+        windows.append(step_windows)
+        emotions.append(step_emotions)
+    seconds = time.perf_counter() - start
+    states, actions = np.concatenate(states), np.concatenate(actions)
+    windows, emotions = np.concatenate(windows), np.concatenate(emotions)
+
+    print(f"전투 {args.battles:,}개 x 유닛 {simulator.num_units}명, {args.steps} 스텝: {seconds:.2f}s "
+          f"({seconds / args.steps * 1000:.1f} ms/step, 끝난 전투 {simulator.battles_finished:,}개)")
+    print(f"  MLP 상태:   {len(states):>12,}개 ({len(states) / seconds * 60:,.0f}/분)")
+    print(f"  GRU 윈도우: {len(windows):>12,}개 ({len(windows) / seconds * 60:,.0f}/분)")
+
+    iid_states, iid_actions = generate_sample_data_batch(len(states), np.random.default_rng(args.seed))
+    _, iid_emotions = generate_training_data_batch(len(windows), args.sequence_length,
+                                                   np.random.default_rng(args.seed))
+    print(f"\n{'action':>14} {'sim':>7} {'random':>7}")
+    for name, action in ACTIONS.items():
+        print(f"{name:>14} {np.mean(actions == action):7.1%} {np.mean(iid_actions == action):7.1%}")
+    print(f"\n{'feature':>14} {'sim mean':>9} {'random':>7}")
+    for i, name in enumerate(('hp_ratio', 'dist_enemy', 'allies', 'enemies')):
+        column = [0, 3, 4, 5][i]
+        print(f"{name:>14} {states[:, column].mean():9.3f} {iid_states[:, column].mean():7.3f}")
+    print(f"\n감정 레이블 평균 (fear, aggression, confidence): sim {np.round(emotions.mean(axis=0), 3)}, "
+          f"random {np.round(iid_emotions.mean(axis=0), 3)}")
+    print(f"감정 레이블 종류: sim {len(np.unique(emotions, axis=0)):,}개 (우세도 보간), "
+          f"random {len(np.unique(iid_emotions, axis=0))}개 (시나리오 3종)")
+
+    if args.output:
+        count = args.samples or len(states)
+        sim_states, sim_actions = simulate_sample_data(count, np.random.default_rng(args.seed),
+                                                       args.units_per_team, args.explore)
+        sim_windows, sim_emotions = simulate_training_data(count, args.sequence_length,
+                                                           np.random.default_rng(args.seed + 1),
+                                                           args.units_per_team, args.explore)
+        np.savez(args.output, states=sim_states, actions=sim_actions, sequences=sim_windows, emotions=sim_emotions)
+        print(f"\n저장: {args.output} (상태 {len(sim_states):,}개, 윈도우 {len(sim_windows):,}개)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+학습 모듈 콜드 import 시간 측정
+
+모듈마다 새 인터프리터를 띄워 `python -X importtime -c "import 모듈"`을 실행하고
+- 전체 import 시간 (ms)
+- torch 단독 import 대비 추가 시간 (모듈 자체 비용)
+- 무거운 선택 의존성(matplotlib, onnx, onnxruntime)이 import 시점에 로드되는지
+를 반복 측정의 중앙값으로 출력합니다. 선택 의존성이 로드되거나 추가 시간이 --budget-ms를
+넘으면 종료 코드 1 (CI 회귀 확인용).
+
+실행 (저장소 루트에서):
+    python -m Common.bench_import
+    python -m Common.bench_import --modules MLP.mlp --repeat 5 --budget-ms 300
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+import numpy as np
+
+DEFAULT_MODULES = ['MLP.mlp', 'GRU.gru_enhanced', 'Common.training']
+LAZY_MODULES = ['matplotlib', 'onnx', 'onnxruntime']
+
+
+def import_once(module):
+    """
+    새 프로세스에서 module을 import
+    - 반환: (전체 import 시간 ms, import 시점에 로드된 LAZY_MODULES 목록)
+    """
+    code = (f"import sys, {module}\n"
+            f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, env=env, check=True)
+    # importtime 줄: "import time: self [us] | cumulative | 모듈", 최상위 모듈은 들여쓰기 없음
+    total_us = sum(int(match.group(1)) for match in
+                   re.finditer(r'^import time:\s+\d+ \|\s+(\d+) \| \S', result.stderr, re.MULTILINE))
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return total_us / 1000.0, loaded
+
+
+def measure(module, repeat):
+    """
+    import_once를 repeat번 실행한 중앙값 (첫 실행은 디스크 캐시 워밍업으로 제외)
+    """
+    import_once(module)
+    runs = [import_once(module) for _ in range(repeat)]
+    return float(np.median([ms for ms, _ in runs])), runs[-1][1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="학습 모듈 콜드 import 시간 측정")
+    parser.add_argument('--modules', nargs='+', default=DEFAULT_MODULES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--budget-ms', type=float, default=500.0,
+                        help="torch 대비 허용 추가 import 시간 (ms)")
+    args = parser.parse_args()
+
+    torch_ms, _ = measure('torch', args.repeat)
+    print(f"기준 torch import: {torch_ms:.0f} ms (중앙값 {args.repeat}회)\n")
+    print(f"{'module':>20} {'total ms':>9} {'+torch ms':>10}  lazy deps loaded")
+
+    failed = False
+    for module in args.modules:
+        total_ms, loaded = measure(module, args.repeat)
+        extra_ms = total_ms - torch_ms
+        over = extra_ms > args.budget_ms
+        failed |= over or bool(loaded)
+        print(f"{module:>20} {total_ms:9.0f} {extra_ms:10.0f}  {', '.join(loaded) or '-'}"
+              f"{'  <- 예산 초과' if over else ''}")
+
+    if failed:
+        print(f"\n❌ 선택 의존성이 import 시점에 로드되었거나 추가 시간이 {args.budget_ms:.0f} ms를 넘었습니다.")
+        sys.exit(1)
+    print(f"\n✅ 모든 모듈이 예산({args.budget_ms:.0f} ms) 안이며 선택 의존성을 지연 로드합니다.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+UnitMLP / EmotionGRU 추론 벤치마크: PyTorch eager vs TorchScript vs ONNX Runtime
+
+- 배치 크기, 시퀀스 길이(GRU), 스레드 수별 p50/p99 지연 시간과 처리량 측정
+- 스레드 수는 torch.set_num_threads / ORT intra_op_num_threads로 고정
+- 결과는 JSON으로 저장해 mlp.py / gru_enhanced.py 구조가 바뀌었을 때 이전 결과와 비교
+
+ONNX 파일을 지정하지 않으면 현재 모델 구조를 임시 ONNX로 내보내 측정합니다.
+학습된 ONNX를 지정할 때는 같은 가중치(.pt)도 함께 줘야 eager / TorchScript도 같은 모델을 측정합니다.
+
+실행 (저장소 루트에서):
+    python -m Common.bench_inference --output inference_bench.json
+    python -m Common.bench_inference --mlp-weights unit_action_mlp.pt --mlp-onnx unit_action_mlp.onnx \\
+        --gru-weights emotion_gru.pt --gru-onnx emotion_gru.onnx
+"""
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+import warnings
+
+import numpy as np
+import torch
+
+from Common.benchmarking import measure_latency
+from Common.models import load_model
+from Common.onnx_export import export_onnx_model
+from Common.quantize import create_session
+
+
+def export_for_benchmark(model, dummy, path, input_name, output_name, dynamic_axes):
+    """
+    벤치마크용 ONNX 내보내기 (배치/시퀀스 축 동적)
+    """
+    export_onnx_model(
+        model,
+        dummy,
+        path,
+        input_names=[input_name],
+        output_names=[output_name],
+        dynamic_axes=dynamic_axes,
+    )
+
+
+def build_backends(model, dummy, onnx_path, threads):
+    """
+    {백엔드 이름: fn(numpy 입력) -> 출력} 생성 (TorchScript 실패 시 제외하고 이유 기록)
+    """
+    backends = {}
+    errors = {}
+
+    def eager(inputs):
+        with torch.inference_mode():
+            return model(torch.from_numpy(inputs))
+    backends['eager'] = eager
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            scripted = torch.jit.freeze(torch.jit.trace(model, dummy))
+
+        def torchscript(inputs):
+            with torch.inference_mode():
+                return scripted(torch.from_numpy(inputs))
+        backends['torchscript'] = torchscript
+    except Exception as e:  # TorchScript 지원이 없는 torch 빌드
+        errors['torchscript'] = repr(e)
+
+    try:
+        session = create_session(onnx_path, threads)
+        input_name = session.get_inputs()[0].name
+
+        def onnxruntime(inputs):
+            return session.run(None, {input_name: inputs})
+        backends['onnxruntime'] = onnxruntime
+    except ImportError as e:
+        errors['onnxruntime'] = repr(e)
+
+    return backends, errors
+
+
+def run_cases(name, backends, cases, repeat, min_seconds):
+    """
+    cases: [(설명 dict, numpy 입력)] 각각을 모든 백엔드로 측정
+    """
+    results = []
+    for params, inputs in cases:
+        for backend, fn in backends.items():
+            try:
+                stats = measure_latency(lambda: fn(inputs), repeat=repeat, warmup=5, min_seconds=min_seconds)
+            except Exception as e:  # 고정 shape ONNX 등 해당 입력을 지원하지 않는 경우
+                results.append({'model': name, 'backend': backend, **params, 'error': str(e).splitlines()[0]})
+                continue
+            batch = params['batch_size']
+            stats['samples_per_sec'] = batch / (stats['p50_ms'] / 1000.0)
+            results.append({'model': name, 'backend': backend, **params, **stats})
+            print(f"{name:>12} {backend:>12} "
+                  + ' '.join(f"{k}={v:<5}" for k, v in params.items())
+                  + f" p50 {stats['p50_ms']:9.4f} ms  p99 {stats['p99_ms']:9.4f} ms"
+                  + f"  {stats['samples_per_sec']:14,.0f} samples/s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UnitMLP/EmotionGRU 추론 벤치마크")
+    parser.add_argument('--mlp-weights', help="UnitMLP state_dict (.pt, 없으면 시드로 초기화한 모델)")
+    parser.add_argument('--gru-weights', help="EmotionGRU state_dict (.pt, 없으면 시드로 초기화한 모델)")
+    parser.add_argument('--mlp-onnx', help="측정할 UnitMLP ONNX (--mlp-weights 필요, 기본: 현재 모델을 임시로 내보냄)")
+    parser.add_argument('--gru-onnx', help="측정할 EmotionGRU ONNX (--gru-weights 필요, 기본: 현재 모델을 임시로 내보냄)")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 16, 256, 4096])
+    parser.add_argument('--sequence-lengths', type=int, nargs='+', default=[1, 5, 16])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--min-seconds', type=float, default=0.2, help="조합별 최소 측정 시간")
+    parser.add_argument('--output', default='inference_bench.json')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    for kind in ('mlp', 'gru'):
+        # 가중치 없이 ONNX만 주면 torch 백엔드는 다른 (무작위) 가중치를 측정하게 됨
+        if getattr(args, f"{kind}_onnx") and not getattr(args, f"{kind}_weights"):
+            parser.error(f"--{kind}-onnx에는 같은 가중치의 --{kind}-weights가 필요합니다")
+
+    torch.manual_seed(args.seed)
+    rng = np.random.default_rng(args.seed)
+    mlp = load_model('mlp', args.mlp_weights)
+    gru = load_model('gru', args.gru_weights)
+
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'torch': torch.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+        },
+        'models': {
+            'unit_mlp': {'parameters': sum(p.numel() for p in mlp.parameters()), 'weights': args.mlp_weights},
+            'emotion_gru': {'parameters': sum(p.numel() for p in gru.parameters()), 'weights': args.gru_weights},
+        },
+        'results': [],
+        'errors': {},
+    }
+    try:
+        import onnxruntime
+        report['environment']['onnxruntime'] = onnxruntime.__version__
+    except ImportError:
+        pass
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mlp_onnx = args.mlp_onnx
+        if mlp_onnx is None:
+            mlp_onnx = os.path.join(tmp, 'unit_action_mlp.onnx')
+            export_for_benchmark(mlp, torch.zeros(2, 11), mlp_onnx, 'state', 'action_logits',
+                                 {'state': {0: 'batch_size'}, 'action_logits': {0: 'batch_size'}})
+        gru_onnx = args.gru_onnx
+        if gru_onnx is None:
+            gru_onnx = os.path.join(tmp, 'emotion_gru.onnx')
+            export_for_benchmark(gru, torch.zeros(2, 5, 7), gru_onnx, 'event_sequence', 'emotion_state',
+                                 {'event_sequence': {0: 'batch_size', 1: 'sequence_length'},
+                                  'emotion_state': {0: 'batch_size'}})
+        report['models']['unit_mlp']['onnx'] = args.mlp_onnx or '(current architecture)'
+        report['models']['emotion_gru']['onnx'] = args.gru_onnx or '(current architecture)'
+
+        mlp_cases = [
+            ({'batch_size': b}, rng.random((b, 11), dtype=np.float32))
+            for b in args.batch_sizes
+        ]
+        gru_cases = [
+            ({'batch_size': b, 'sequence_length': t}, rng.random((b, t, 7), dtype=np.float32))
+            for t in args.sequence_lengths
+            for b in args.batch_sizes
+        ]
+
+        for threads in args.threads:
+            torch.set_num_threads(threads)
+            print(f"\n--- threads={threads} ---")
+            for name, model, dummy, onnx_path, cases in (
+                ('unit_mlp', mlp, torch.zeros(2, 11), mlp_onnx, mlp_cases),
+                ('emotion_gru', gru, torch.zeros(2, 5, 7), gru_onnx, gru_cases),
+            ):
+                backends, errors = build_backends(model, dummy, onnx_path, threads)
+                for backend, error in errors.items():
+                    report['errors'][f"{name}/{backend}"] = error
+                for result in run_cases(name, backends, cases, args.repeat, args.min_seconds):
+                    report['results'].append({'threads': threads, **result})
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n결과 저장: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+"""
+성능 회귀 벤치마크 (데이터 생성, 학습 스텝, ONNX 내보내기)
+
+고정 시드/크기로 hot path를 측정해 기준값(baseline) JSON과 비교하고,
+어느 하나라도 기준보다 허용 비율 이상 느려지면 종료 코드 1로 실패합니다.
+
+측정 항목 (CASES):
+- create_state_vector / create_event_vector: dict 하나 -> 벡터, 1,000회
+- create_state_vectors: 레코드 10,000개 한 번에 정규화
+- generate_sample_data / generate_training_data: 기존 루프 버전 (1,000 / 500개)
+- generate_sample_data_batch / generate_training_data_batch: 벡터화 버전 (100,000 / 20,000개)
+- mlp_train_step / gru_train_step: 배치 256 forward + backward + Adam step 1회
+- mlp_onnx_export / gru_onnx_export: torch.onnx.export 1회 (Common.onnx_export)
+
+기준값은 머신마다 다르므로 같은 머신(같은 스레드 수)에서 만든 파일과 비교해야 합니다.
+기준 파일의 환경 정보가 현재와 다르면 경고를 출력합니다.
+
+측정 잡음 대책:
+- 모든 항목을 --rounds번 돌아가며 측정하고 항목별로 가장 좋은 라운드를 씀 (라운드마다 최소 측정 시간 보장)
+- 회귀로 보인 항목은 --retries번까지 다시 측정해 계속 느릴 때만 실패 처리
+- 허용 비율은 CASES의 항목별 값 (--threshold를 주면 전체에 같은 값 적용)
+  1코어 공유 VM에서는 코드 변경 없이도 수십 초씩 전체가 느려지는 구간이 있어, 같은 코드의 두 실행이
+  파이썬 루프 항목은 최대 2.1배, 나머지는 최대 1.65배까지 차이 났음 -> 기본값은 그보다 넓게
+  (루프 항목 2.5배, 나머지 2배) 잡아 실수로 벡터화가 풀리는 수준의 회귀를 잡는 용도
+  전용/조용한 머신이면 --threshold 0.1~0.25로 좁혀서 사용
+
+실행 (저장소 루트에서):
+    python -m Common.bench_regression --save-baseline            # 기준값 저장
+    python -m Common.bench_regression                            # 기준값과 비교 (회귀 시 exit 1)
+    python -m Common.bench_regression --only mlp_train_step gru_train_step --threshold 0.1   # 조용한 머신
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from Common.benchmarking import measure_latency
+
+SEED = 0
+
+
+def _seed_everything():
+    random.seed(SEED)
+    np.random.seed(SEED)
+    torch.manual_seed(SEED)
+
+
+def _state_dict_sample():
+    return {'hp_ratio': 0.6, 'attack': 60, 'defense': 50, 'distance_to_nearest_enemy': 50,
+            'nearby_allies': 3, 'nearby_enemies': 1, 'allies_avg_hp': 0.6, 'enemies_avg_hp': 0.6,
+            'position_x': 50, 'position_y': 50, 'distance_to_objective': 40}
+
+
+def _event_dict_sample():
+    return {'hp_ratio': 0.7, 'damage_taken': 15, 'ally_died': False, 'enemy_died': True,
+            'distance_change': -5, 'nearby_enemies': 4, 'battle_outcome': 0}
+
+
+def case_create_state_vector(workdir):
+    from MLP.mlp import create_state_vector
+    unit = _state_dict_sample()
+    return lambda: [create_state_vector(unit) for _ in range(1000)]
+
+
+def case_create_event_vector(workdir):
+    from GRU.gru_enhanced import create_event_vector
+    event = _event_dict_sample()
+    return lambda: [create_event_vector(event) for _ in range(1000)]
+
+
+def case_create_state_vectors(workdir):
+    from MLP.mlp import create_state_vectors, draw_unit_states
+    units = draw_unit_states(10000, np.random.default_rng(SEED))
+    return lambda: create_state_vectors(units)
+
+
+def case_generate_sample_data(workdir):
+    from MLP.mlp import generate_sample_data
+
+    def run():
+        _seed_everything()
+        generate_sample_data(1000)
+    return run
+
+
+def case_generate_training_data(workdir):
+    from GRU.gru_enhanced import generate_training_data
+
+    def run():
+        _seed_everything()
+        generate_training_data(500)
+    return run
+
+
+def case_generate_sample_data_batch(workdir):
+    from MLP.mlp import generate_sample_data_batch
+    return lambda: generate_sample_data_batch(100000, np.random.default_rng(SEED))
+
+
+def case_generate_training_data_batch(workdir):
+    from GRU.gru_enhanced import generate_training_data_batch
+    return lambda: generate_training_data_batch(20000, 5, np.random.default_rng(SEED))
+
+
+def _train_step(model, inputs, targets, loss_fn):
+    optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
+    model.train()
+
+    def step():
+        loss = loss_fn(model(inputs), targets)
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+    return step
+
+
+def case_mlp_train_step(workdir):
+    from MLP.mlp import ACTIONS, UnitMLP, generate_sample_data_batch
+    states, actions = generate_sample_data_batch(256, np.random.default_rng(SEED))
+    return _train_step(UnitMLP(11, len(ACTIONS)), torch.from_numpy(states), torch.from_numpy(actions),
+                       nn.CrossEntropyLoss())
+
+
+def case_gru_train_step(workdir):
+    from GRU.gru_enhanced import EMOTIONS, EmotionGRU, generate_training_data_batch
+    sequences, emotions = generate_training_data_batch(256, 5, np.random.default_rng(SEED))
+    return _train_step(EmotionGRU(7, 32, len(EMOTIONS)), torch.from_numpy(sequences), torch.from_numpy(emotions),
+                       nn.MSELoss())
+
+
+def _export_case(export, model, workdir):
+    path = os.path.join(workdir, 'model.onnx')
+    model.eval()
+    return lambda: export(model, path)
+
+
+def case_mlp_onnx_export(workdir):
+    from MLP.mlp import ACTIONS, UnitMLP, export_onnx
+    return _export_case(export_onnx, UnitMLP(11, len(ACTIONS)), workdir)
+
+
+def case_gru_onnx_export(workdir):
+    from GRU.gru_enhanced import EMOTIONS, EmotionGRU, export_onnx
+    return _export_case(lambda model, path: export_onnx(model, 5, path), EmotionGRU(7, 32, len(EMOTIONS)), workdir)
+
+
+# 이름 -> (준비 함수(workdir) -> 측정할 함수, 반복 수, 최소 측정 시간(초), 허용 감속 비율)
+# workdir는 run_cases가 만들고 끝나면 지우는 임시 디렉터리 (ONNX 내보내기 출력 위치)
+CASES = {
+    'create_state_vector': (case_create_state_vector, 30, 0.5, 1.5),
+    'create_event_vector': (case_create_event_vector, 30, 0.5, 1.5),
+    'create_state_vectors': (case_create_state_vectors, 100, 0.5, 1.0),
+    'generate_sample_data': (case_generate_sample_data, 10, 0.5, 1.5),
+    'generate_training_data': (case_generate_training_data, 10, 0.5, 1.5),
+    'generate_sample_data_batch': (case_generate_sample_data_batch, 20, 0.5, 1.0),
+    'generate_training_data_batch': (case_generate_training_data_batch, 20, 0.5, 1.0),
+    'mlp_train_step': (case_mlp_train_step, 200, 0.5, 1.0),
+    'gru_train_step': (case_gru_train_step, 100, 0.5, 1.0),
+    'mlp_onnx_export': (case_mlp_onnx_export, 5, 0.5, 1.0),
+    'gru_onnx_export': (case_gru_onnx_export, 5, 0.5, 1.0),
+}
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'torch': torch.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'threads': torch.get_num_threads(),
+    }
+
+
+def run_cases(names, scale=1.0, rounds=3):
+    """
+    {이름: measure_latency 결과}
+    - 모든 항목을 rounds번 돌아가며 측정하고 항목마다 p50이 가장 낮은 라운드를 채택 (timeit의 best-of-N)
+      -> 공유 머신의 느린 구간(수 초)이 한 라운드에 걸려도 다른 라운드 결과를 씀
+    - scale로 반복 수 / 최소 측정 시간 조절
+    """
+    import warnings
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='bench_export_') as workdir:
+        for _ in range(rounds):
+            for name in names:
+                prepare, repeat, min_seconds, _ = CASES[name]
+                _seed_everything()
+                fn = prepare(workdir)
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')  # ONNX 내보내기 경고
+                    stats = measure_latency(fn, repeat=max(3, int(repeat * scale)), warmup=2,
+                                            min_seconds=min_seconds * scale)
+                if name not in results or stats['p50_ms'] < results[name]['p50_ms']:
+                    results[name] = stats
+    for name in names:
+        print(f"  {name:>30}: min {results[name]['min_ms']:10.3f} ms, p50 {results[name]['p50_ms']:10.3f} ms")
+    return results
+
+
+def compare(results, baseline, threshold, metric):
+    """
+    기준값 대비 비율 표 출력, 회귀한 항목 이름 리스트 반환
+    - threshold가 None이면 항목별 허용 비율(CASES) 사용
+    """
+    regressions = []
+    print(f"\n{'benchmark':>30} {'baseline ms':>12} {'current ms':>11} {'ratio':>7} {'limit':>6}  status")
+    for name, stats in results.items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            print(f"{name:>30} {'-':>12} {stats[metric]:11.3f} {'-':>7} {'-':>6}  기준값 없음")
+            continue
+        tolerance = CASES[name][3] if threshold is None else threshold
+        ratio = stats[metric] / base[metric]
+        if ratio > 1.0 + tolerance:
+            status = '❌ 회귀'
+            regressions.append(name)
+        elif ratio < 1.0 / (1.0 + tolerance):
+            status = '⚡ 개선'
+        else:
+            status = 'ok'
+        print(f"{name:>30} {base[metric]:12.3f} {stats[metric]:11.3f} {ratio:7.2f} {1.0 + tolerance:6.2f}  {status}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="성능 회귀 벤치마크")
+    parser.add_argument('--baseline', default='regression_baseline.json', help="기준값 JSON 경로")
+    parser.add_argument('--save-baseline', action='store_true', help="측정 결과를 기준값으로 저장 (비교 안 함)")
+    parser.add_argument('--threshold', type=float,
+                        help="전체 항목에 적용할 허용 감속 비율 (0.25 = 25%% 느려지면 실패, 기본: 항목별 값)")
+    parser.add_argument('--metric', choices=['p50_ms', 'min_ms', 'mean_ms'], default='p50_ms')
+    parser.add_argument('--rounds', type=int, default=5, help="전체 측정 라운드 수 (항목별 최선 라운드 채택)")
+    parser.add_argument('--retries', type=int, default=2, help="회귀로 보인 항목을 다시 측정할 횟수")
+    parser.add_argument('--only', nargs='+', choices=sorted(CASES), help="일부 항목만 측정")
+    parser.add_argument('--scale', type=float, default=0.5, help="라운드당 반복 수 배율 (CI에서 짧게 돌릴 때 더 작게)")
+    parser.add_argument('--threads', type=int, default=1, help="torch intra-op 스레드 수 (기준값과 같아야 함)")
+    parser.add_argument('--output', help="이번 측정 결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    names = args.only or list(CASES)
+    print(f"측정 항목 {len(names)}개 x {args.rounds}라운드 (시드 {SEED}, 스레드 {args.threads})")
+    results = run_cases(names, args.scale, args.rounds)
+    report = {'environment': environment(), 'rounds': args.rounds, 'scale': args.scale, 'results': results}
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        baseline = report
+        if os.path.exists(args.baseline) and args.only:
+            # 일부 항목만 다시 잰 경우 나머지 기준값은 유지
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+            baseline['results'].update(results)
+            baseline['environment'] = report['environment']
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\n기준값 저장: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\n기준값 파일이 없습니다: {args.baseline} (--save-baseline으로 먼저 생성)")
+        sys.exit(2)
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    changed = {key: (baseline['environment'].get(key), value) for key, value in report['environment'].items()
+               if baseline['environment'].get(key) != value}
+    if changed:
+        print("\n⚠️ 기준값과 환경이 다릅니다: " +
+              ", ".join(f"{key} {old} -> {new}" for key, (old, new) in changed.items()))
+
+    regressions = compare(results, baseline, args.threshold, args.metric)
+    for attempt in range(args.retries):
+        if not regressions:
+            break
+        # 잠깐의 간섭인지 실제 회귀인지 구분: 다시 재서 더 빠르면 그 값을 씀
+        print(f"\n회귀로 보인 {len(regressions)}개 항목 재측정 ({attempt + 1}/{args.retries})")
+        for name, stats in run_cases(regressions, args.scale, args.rounds).items():
+            if stats[args.metric] < results[name][args.metric]:
+                results[name] = stats
+        regressions = compare(results, baseline, args.threshold, args.metric)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if regressions:
+        print(f"\n❌ {len(regressions)}개 항목이 기준보다 허용 비율 이상 느려졌습니다: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\n✅ 회귀 없음")
+
+
+if __name__ == '__main__':
+    main()
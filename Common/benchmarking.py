@@ -0,0 +1,39 @@
+"""
+벤치마크 공용 도구 (지연 시간 분위수 측정)
+"""
+
+import time
+
+import numpy as np
+
+
+def measure_latency(fn, repeat=100, warmup=10, min_seconds=0.0, setup=None):
+    """
+    fn()을 반복 실행해 지연 시간 통계(ms)를 반환
+    - warmup회 먼저 실행해 첫 호출 비용(할당, 커널 선택 등)을 제외
+    - min_seconds > 0이면 repeat 이후에도 그 시간이 찰 때까지 계속 측정
+    - setup이 있으면 매 실행 직전에 호출 (입력 준비 등, 측정 시간에서 제외)
+    반환값: {'p50_ms', 'p99_ms', 'mean_ms', 'min_ms', 'runs'}
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < repeat or time.perf_counter() - start < min_seconds:
+        if setup:
+            setup()
+        begin = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - begin)
+
+    samples = np.array(samples) * 1000.0
+    return {
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p99_ms': float(np.percentile(samples, 99)),
+        'mean_ms': float(samples.mean()),
+        'min_ms': float(samples.min()),
+        'runs': len(samples),
+    }
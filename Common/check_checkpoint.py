@@ -0,0 +1,95 @@
+"""
+체크포인트 재개 확인
+
+모델마다 같은 데이터/시드로
+1. 끊김 없이 N 에폭 학습
+2. M 에폭까지 학습(체크포인트 저장) -> 새 모델/옵티마이저/DataLoader를 만들고 재개해 N 에폭까지
+를 실행해 최종 가중치와 에폭별 기록이 완전히 같은지 확인합니다.
+(MLP: dropout + 셔플 미니배치, GRU: 가변 길이 버킷 배치)
+
+실행 (저장소 루트에서):
+    python -m Common.check_checkpoint --epochs 12 --stop-at 7 --every 3
+"""
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.utils.data import TensorDataset
+
+from Common.checkpoint import CheckpointManager, load_checkpoint
+from Common.training import PaddedSequenceDataset, accuracy_count, fit, make_loader, split_train_val
+
+
+def build(model_name, samples, seed):
+    """
+    (모델 생성 함수, dataset, 손실 함수, metrics)
+    """
+    if model_name == 'mlp':
+        from MLP.mlp import ACTIONS, UnitMLP, generate_sample_data_batch
+        states, actions = generate_sample_data_batch(samples, np.random.default_rng(seed))
+        dataset = TensorDataset(torch.from_numpy(states), torch.from_numpy(actions))
+        return lambda: UnitMLP(11, len(ACTIONS)), dataset, nn.CrossEntropyLoss(), {'accuracy': accuracy_count}
+    from GRU.gru_enhanced import EMOTIONS, EmotionGRU, generate_variable_length_data_batch
+    sequences, lengths, emotions = generate_variable_length_data_batch(samples, 5, 1, np.random.default_rng(seed))
+    dataset = PaddedSequenceDataset(torch.from_numpy(sequences), torch.from_numpy(lengths),
+                                    torch.from_numpy(emotions))
+    return lambda: EmotionGRU(7, 32, len(EMOTIONS)), dataset, nn.MSELoss(), {}
+
+
+def run(make_model, dataset, loss_fn, metrics, epochs, seed, checkpoint=None, resume=None):
+    """
+    매번 새로 만든 모델/옵티마이저/DataLoader로 fit (다른 프로세스에서 재개하는 상황과 같음)
+    """
+    torch.manual_seed(seed)
+    model = make_model()
+    optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
+    train_set, val_set = split_train_val(dataset, 0.2, seed)
+    loader = make_loader(train_set, batch_size=64, shuffle=True, seed=seed)
+    val_loader = make_loader(val_set, batch_size=64)
+    if resume is not None:
+        torch.manual_seed(seed + 12345)  # 재개 전 난수 상태가 달라도 체크포인트가 덮어써야 함
+    history = fit(model, loader, loss_fn, optimizer, epochs, metrics, log_every=0, val_loader=val_loader,
+                  patience=0, checkpoint=checkpoint, resume=resume)
+    return model, history
+
+
+def main():
+    parser = argparse.ArgumentParser(description="체크포인트 재개 확인")
+    parser.add_argument('--models', nargs='+', default=['mlp', 'gru'], choices=['mlp', 'gru'])
+    parser.add_argument('--samples', type=int, default=2000)
+    parser.add_argument('--epochs', type=int, default=12)
+    parser.add_argument('--stop-at', type=int, default=7, help="중단을 흉내 낼 에폭")
+    parser.add_argument('--every', type=int, default=3)
+    parser.add_argument('--keep', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for model_name in args.models:
+        make_model, dataset, loss_fn, metrics = build(model_name, args.samples, args.seed)
+        straight, straight_history = run(make_model, dataset, loss_fn, metrics, args.epochs, args.seed)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = CheckpointManager(tmp, every=args.every, keep=args.keep)
+            run(make_model, dataset, loss_fn, metrics, args.stop_at, args.seed, checkpoint=manager)
+            kept = [os.path.basename(path) for path in manager.checkpoints()]
+            leftovers = [name for name in os.listdir(tmp) if name.endswith('.tmp')]
+            resumed, resumed_history = run(make_model, dataset, loss_fn, metrics, args.epochs, args.seed,
+                                           checkpoint=manager, resume=load_checkpoint(manager.latest()))
+
+        error = max((a - b).abs().max().item()
+                    for a, b in zip(straight.state_dict().values(), resumed.state_dict().values()))
+        same_history = all(straight_history[name] == resumed_history[name]
+                           for name in ('loss', 'val_loss', 'best_epoch', 'stopped_epoch'))
+        print(f"[{model_name}] {args.stop_at} 에폭에서 중단 후 재개 -> {args.epochs} 에폭: "
+              f"가중치 최대 차이 {error:.2e}, 기록 일치 {same_history}, "
+              f"중단 시 남은 체크포인트 {kept}, 임시 파일 {len(leftovers)}개")
+        assert error == 0.0 and same_history, "재개한 학습이 끊김 없는 학습과 다릅니다"
+        assert len(kept) <= args.keep and not leftovers
+
+
+if __name__ == '__main__':
+    main()
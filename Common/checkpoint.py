@@ -0,0 +1,154 @@
+"""
+학습 체크포인트 저장 / 재개
+
+- K 에폭마다 모델, 옵티마이저, 난수 상태(torch/numpy/random/DataLoader 셔플), 에폭별 기록,
+  조기 종료 상태와 최고 성능 가중치를 checkpoint_{에폭:06d}.pt 하나로 저장
+- 임시 파일에 쓴 뒤 fsync + os.replace로 교체하므로 저장 중 프로세스가 죽어도 이전 체크포인트는 온전
+- 최근 keep개만 남김 (Config/config.yaml의 keep_checkpoints와 같은 의미)
+- fit(..., checkpoint=manager, resume=state)로 마지막 체크포인트에서 같은 결과로 이어서 학습
+
+사용 예 (저장소 루트에서):
+    python -m MLP.mlp --seed 0 --checkpoint-dir ckpt/mlp --checkpoint-every 50
+    python -m MLP.mlp --seed 0 --checkpoint-dir ckpt/mlp --resume          # 가장 최근 체크포인트
+    python -m MLP.mlp --seed 0 --checkpoint-dir ckpt/mlp --resume ckpt/mlp/checkpoint_000300.pt
+"""
+
+import glob
+import os
+import random
+import re
+
+import numpy as np
+import torch
+
+CHECKPOINT_PATTERN = re.compile(r'checkpoint_(\d+)\.pt$')
+
+
+def loader_generator(loader):
+    """
+    DataLoader 셔플 순서를 정하는 torch.Generator (셔플하지 않으면 None)
+    - make_loader가 만든 BatchSampler(RandomSampler) 또는 LengthBucketSampler 지원
+    """
+    sampler = getattr(loader, 'batch_sampler', None) or getattr(loader, 'sampler', None)
+    sampler = getattr(sampler, 'sampler', sampler)
+    return getattr(sampler, 'generator', None)
+
+
+def capture_rng_state(loader=None):
+    """
+    재개 시 같은 난수 흐름을 만들기 위한 상태 (dropout, 셔플, numpy/random 사용 코드)
+    """
+    state = {
+        'torch': torch.get_rng_state(),
+        'numpy': np.random.get_state(),
+        'python': random.getstate(),
+    }
+    if torch.cuda.is_available():
+        state['cuda'] = torch.cuda.get_rng_state_all()
+    generator = loader_generator(loader) if loader is not None else None
+    if generator is not None:
+        state['loader'] = generator.get_state()
+    return state
+
+
+def restore_rng_state(state, loader=None):
+    torch.set_rng_state(state['torch'])
+    np.random.set_state(state['numpy'])
+    random.setstate(state['python'])
+    if 'cuda' in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state['cuda'])
+    generator = loader_generator(loader) if loader is not None else None
+    if generator is not None and 'loader' in state:
+        generator.set_state(state['loader'])
+
+
+def atomic_save(obj, path):
+    """
+    path.tmp에 저장하고 디스크에 내린 뒤 path로 교체 (중간에 죽어도 반쯤 쓴 파일이 남지 않음)
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        torch.save(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path, map_location='cpu'):
+    # numpy 난수 상태 등 텐서가 아닌 객체가 있어 weights_only=False (직접 만든 파일만 로드할 것)
+    return torch.load(path, map_location=map_location, weights_only=False)
+
+
+class CheckpointManager:
+    """
+    directory에 every 에폭마다 체크포인트를 쓰고 최근 keep개만 유지
+    - keep=0이면 모두 유지
+    - meta: 체크포인트마다 함께 저장할 정보 (예: 명령행 인자)
+    """
+
+    def __init__(self, directory, every=50, keep=5, meta=None):
+        self.directory = directory
+        self.every = every
+        self.keep = keep
+        self.meta = meta or {}
+        os.makedirs(directory, exist_ok=True)
+
+    def checkpoints(self):
+        """
+        저장된 체크포인트 경로 (에폭 오름차순)
+        """
+        paths = []
+        for path in glob.glob(os.path.join(self.directory, 'checkpoint_*.pt')):
+            match = CHECKPOINT_PATTERN.search(path)
+            if match:
+                paths.append((int(match.group(1)), path))
+        return [path for _, path in sorted(paths)]
+
+    def latest(self):
+        paths = self.checkpoints()
+        return paths[-1] if paths else None
+
+    def due(self, epoch):
+        """
+        epoch(완료한 에폭 수)에 저장할 차례인지
+        """
+        return self.every > 0 and epoch % self.every == 0
+
+    def save(self, state):
+        """
+        state['epoch'] 이름으로 원자적 저장 후 오래된 체크포인트 정리, 저장 경로 반환
+        """
+        path = os.path.join(self.directory, f"checkpoint_{state['epoch']:06d}.pt")
+        atomic_save(dict(state, meta=self.meta), path)
+        if self.keep > 0:
+            for old in self.checkpoints()[:-self.keep]:
+                os.remove(old)
+        return path
+
+
+def checkpoint_from_args(args):
+    """
+    add_training_arguments 옵션으로 (CheckpointManager 또는 None, 재개할 상태 또는 None) 생성
+    - --resume만 주면 --checkpoint-dir의 가장 최근 체크포인트, 경로를 주면 그 파일
+    """
+    manager = None
+    if args.checkpoint_dir:
+        manager = CheckpointManager(args.checkpoint_dir, args.checkpoint_every, args.keep_checkpoints,
+                                    meta={'args': {k: v for k, v in vars(args).items()
+                                                   if isinstance(v, (str, int, float, bool, type(None)))}})
+    if not args.resume:
+        return manager, None
+
+    path = args.resume
+    if path == 'latest':
+        if manager is None:
+            raise ValueError("--resume에 경로가 없으면 --checkpoint-dir가 필요합니다")
+        path = manager.latest()
+        if path is None:
+            print(f"체크포인트 없음 ({args.checkpoint_dir}), 처음부터 학습합니다.")
+            return manager, None
+    if args.seed is None and not args.data:
+        print("⚠️ --seed 없이 합성 데이터로 재개하면 데이터가 달라 결과가 이어지지 않습니다.")
+    state = load_checkpoint(path)
+    print(f"체크포인트에서 재개: {path} ({state['epoch']} 에폭 완료)")
+    return manager, state
@@ -0,0 +1,298 @@
+"""
+생성된 학습 데이터셋 디스크 캐시 (내용 주소 방식, LRU 용량 제한)
+
+generate_parallel(generator, num_samples, workers, seed, **kwargs) 결과를 아래 값의 해시로 저장합니다.
+- 생성 함수의 모듈/이름
+- 생성 함수가 정의된 모듈 전체의 소스와 그 모듈의 DATASET_VERSION
+  (보조 함수, 레이블 규칙, 테이블이 같은 모듈에 있으므로 어느 것을 고쳐도 자동으로 다른 키)
+- 모듈의 DATASET_DEPENDS에 적힌 모듈의 소스 (battle_sim처럼 다른 모듈의 규칙을 가져다 쓰는 경우)
+- num_samples, workers (워커 수에 따라 난수 스트림 분할이 달라짐), seed, kwargs
+- SCHEMA_VERSION (캐시 저장 형식 버전)
+생성 코드와 관계없는 스크립트(학습 옵션, 다른 모듈)만 바꿔 실험을 반복할 때는 같은 키가 되어
+데이터 생성을 건너뜁니다. 같은 모듈의 모델 코드를 고치면 보수적으로 다시 생성합니다.
+
+디렉터리 구성:
+    <root>/<key>/meta.json      생성 함수, 인자, 배열 shape/dtype, 크기
+    <root>/<key>/array_0.npy    출력 배열 (np.load(mmap_mode='c')로 필요한 부분만 읽음)
+    (compress=True면 array_0.npy 대신 arrays.npz 하나, 메모리 매핑 불가 대신 크기 작음)
+
+- 임시 디렉터리(.<key>-*)에 다 쓴 뒤 이름을 바꿔 등록하므로 중간에 죽어도 깨진 항목이 남지 않음
+  (죽은 프로세스가 남긴 임시 디렉터리는 STAGING_MAX_AGE가 지나면 prune/clear가 삭제)
+- 항목을 읽을 때마다 meta.json 수정 시각을 갱신하고, 전체 크기가 max_bytes를 넘으면
+  가장 오래 안 쓴 항목부터 삭제
+- seed가 None이면 재현할 수 없는 데이터라 캐시하지 않음
+
+사용 예:
+    cache = DatasetCache('.dataset_cache', max_bytes=20 * 2**30)
+    states, actions = cache.generate(generate_sample_data_batch, 10_000_000, workers=8, seed=0)
+
+실행 (저장소 루트에서):
+    python -m MLP.mlp --seed 0 --samples 5000000 --cache-dir .dataset_cache
+    python -m Common.dataset_cache list .dataset_cache
+    python -m Common.dataset_cache prune .dataset_cache --max-gb 5
+"""
+
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from Common.parallel_gen import generate_parallel
+
+SCHEMA_VERSION = 1
+META_FILE = 'meta.json'
+STAGING_MAX_AGE = 3600  # 초, 이보다 오래 수정되지 않은 임시 디렉터리는 죽은 프로세스가 남긴 것으로 봄
+
+
+def generator_name(generator):
+    """
+    'MLP.mlp.generate_sample_data_batch' 형태 이름
+    (python -m MLP.mlp로 실행하면 모듈이 __main__이 되므로 실제 모듈 이름으로 바꿔 같은 키가 되게 함)
+    """
+    module = generator.__module__
+    if module == '__main__':
+        spec = getattr(sys.modules['__main__'], '__spec__', None)
+        if spec is not None:
+            module = spec.name
+    return f"{module}.{generator.__qualname__}"
+
+
+def _module_source(module):
+    try:
+        return inspect.getsource(module)
+    except (OSError, TypeError):  # 소스가 없는 모듈 (대화형 정의 등)
+        return ''
+
+
+def generator_sources(generator):
+    """
+    캐시 키에 넣을 (생성 함수 모듈, DATASET_DEPENDS 모듈들)의 소스 sha256 리스트와 DATASET_VERSION
+    """
+    module = inspect.getmodule(generator)
+    modules = [module] + [importlib.import_module(name) for name in getattr(module, 'DATASET_DEPENDS', ())]
+    digests = [hashlib.sha256(_module_source(m).encode('utf-8')).hexdigest() for m in modules]
+    return digests, getattr(module, 'DATASET_VERSION', None)
+
+
+def cache_key(generator, num_samples, workers, seed, kwargs, version=SCHEMA_VERSION):
+    """
+    생성 조건의 sha256 (앞 32자)
+    """
+    sources, dataset_version = generator_sources(generator)
+    description = {
+        'generator': generator_name(generator),
+        'sources': sources,
+        'dataset_version': dataset_version,
+        'num_samples': num_samples,
+        'workers': workers,
+        'seed': seed,
+        'kwargs': kwargs,
+        'version': version,
+    }
+    encoded = json.dumps(description, sort_keys=True, default=repr).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:32]
+
+
+def _directory_bytes(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class DatasetCache:
+    """
+    root 디렉터리의 데이터셋 캐시
+    - max_bytes: 전체 용량 상한 (None이면 무제한)
+    - compress: True면 np.savez_compressed (메모리 매핑 대신 작은 파일)
+    """
+
+    def __init__(self, root, max_bytes=None, compress=False):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.compress = compress
+        os.makedirs(root, exist_ok=True)
+
+    def entries(self):
+        """
+        [(key, meta, 크기(바이트), 마지막 사용 시각)] 오래 안 쓴 순서
+        """
+        result = []
+        for entry in os.scandir(self.root):
+            meta_path = os.path.join(entry.path, META_FILE)
+            if not entry.is_dir() or not os.path.exists(meta_path):
+                continue  # 쓰는 중인 임시 디렉터리
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            result.append((entry.name, meta, _directory_bytes(entry.path), os.path.getmtime(meta_path)))
+        result.sort(key=lambda item: item[3])
+        return result
+
+    def remove_stale_staging(self, max_age=STAGING_MAX_AGE):
+        """
+        store 도중 죽은 프로세스가 남긴 임시 디렉터리(.<key>-*) 삭제, 삭제한 이름 리스트 반환
+        - 마지막 수정 후 max_age초가 지나지 않은 것은 다른 프로세스가 쓰는 중일 수 있어 남김
+        """
+        removed = []
+        now = time.time()
+        for entry in os.scandir(self.root):
+            if not entry.name.startswith('.') or not entry.is_dir():
+                continue
+            try:
+                modified = max([entry.stat().st_mtime] + [f.stat().st_mtime for f in os.scandir(entry.path)])
+            except FileNotFoundError:  # 그 사이 등록(이름 변경)이 끝난 디렉터리
+                continue
+            if now - modified >= max_age:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed.append(entry.name)
+        return removed
+
+    def size_bytes(self):
+        return sum(size for _, _, size, _ in self.entries())
+
+    def load(self, key):
+        """
+        key 항목의 배열 튜플 (없으면 None), 읽으면 마지막 사용 시각 갱신
+        """
+        path = os.path.join(self.root, key)
+        meta_path = os.path.join(path, META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['compressed']:
+            with np.load(os.path.join(path, 'arrays.npz')) as archive:
+                arrays = tuple(archive[f"array_{i}"] for i in range(meta['count']))
+        else:
+            # 'c'(copy-on-write): 필요한 부분만 읽고, 쓰기 가능한 배열이라 torch.from_numpy 경고도 없음
+            arrays = tuple(np.load(os.path.join(path, f"array_{i}.npy"), mmap_mode='c')
+                           for i in range(meta['count']))
+        os.utime(meta_path)
+        return arrays
+
+    def store(self, key, arrays, description):
+        """
+        배열 튜플을 key 항목으로 저장한 뒤 용량 상한에 맞게 정리
+        """
+        target = os.path.join(self.root, key)
+        staging = tempfile.mkdtemp(prefix=f".{key}-", dir=self.root)
+        try:
+            if self.compress:
+                np.savez_compressed(os.path.join(staging, 'arrays.npz'),
+                                    **{f"array_{i}": array for i, array in enumerate(arrays)})
+            else:
+                for i, array in enumerate(arrays):
+                    np.save(os.path.join(staging, f"array_{i}.npy"), array)
+            meta = {
+                **description,
+                'count': len(arrays),
+                'shapes': [list(array.shape) for array in arrays],
+                'dtypes': [array.dtype.str for array in arrays],
+                'compressed': self.compress,
+                'created': time.time(),
+            }
+            with open(os.path.join(staging, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, indent=2, default=repr)
+            try:
+                os.rename(staging, target)
+            except OSError:  # 다른 프로세스가 같은 키를 먼저 등록
+                shutil.rmtree(staging)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self.prune(keep=key)
+
+    def prune(self, max_bytes=None, keep=None):
+        """
+        전체 크기가 max_bytes(기본 self.max_bytes) 이하가 될 때까지 오래 안 쓴 항목 삭제
+        - keep: 방금 저장한 항목처럼 지우지 않을 키
+        - 반환값: 삭제한 키 리스트
+        """
+        self.remove_stale_staging()
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        if limit is None:
+            return []
+        entries = self.entries()
+        total = sum(size for _, _, size, _ in entries)
+        removed = []
+        for key, _, size, _ in entries:
+            if total <= limit:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+            total -= size
+            removed.append(key)
+        return removed
+
+    def clear(self):
+        self.remove_stale_staging()
+        for key, _, _, _ in self.entries():
+            shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+
+    def generate(self, generator, num_samples, workers=1, seed=None, **kwargs):
+        """
+        generate_parallel과 같은 인자/결과, 같은 조건으로 만든 적이 있으면 디스크에서 읽음
+        """
+        if seed is None:
+            return generate_parallel(generator, num_samples, workers, seed, **kwargs)
+        key = cache_key(generator, num_samples, workers, seed, kwargs)
+        start = time.perf_counter()
+        arrays = self.load(key)
+        if arrays is not None:
+            print(f"데이터셋 캐시 적중: {key} ({time.perf_counter() - start:.2f}s)")
+            return arrays
+        arrays = generate_parallel(generator, num_samples, workers, seed, **kwargs)
+        self.store(key, arrays, {'generator': generator_name(generator), 'num_samples': num_samples,
+                                 'workers': workers, 'seed': seed, 'kwargs': kwargs, 'version': SCHEMA_VERSION,
+                                 'dataset_version': generator_sources(generator)[1]})
+        print(f"데이터셋 캐시 저장: {key} ({time.perf_counter() - start:.2f}s 생성)")
+        return arrays
+
+
+def generate_cached(args, generator, **kwargs):
+    """
+    add_training_arguments 옵션(--cache-dir, --cache-max-gb, --gen-workers, --seed, --samples)으로
+    캐시를 거쳐 데이터 생성 (--cache-dir가 없으면 generate_parallel 그대로)
+    """
+    if not args.cache_dir:
+        return generate_parallel(generator, args.samples, args.gen_workers, args.seed, **kwargs)
+    if args.seed is None:
+        print("--seed가 없어 재현할 수 없는 데이터이므로 캐시를 사용하지 않습니다.")
+    max_bytes = int(args.cache_max_gb * 2 ** 30) if args.cache_max_gb else None
+    cache = DatasetCache(args.cache_dir, max_bytes)
+    return cache.generate(generator, args.samples, args.gen_workers, args.seed, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="데이터셋 캐시 관리")
+    parser.add_argument('command', choices=['list', 'prune', 'clear'])
+    parser.add_argument('root', help="캐시 디렉터리")
+    parser.add_argument('--max-gb', type=float, help="prune: 남길 최대 용량 (GB)")
+    args = parser.parse_args()
+
+    cache = DatasetCache(args.root)
+    if args.command == 'prune':
+        if args.max_gb is None:
+            parser.error("prune에는 --max-gb가 필요합니다")
+        removed = cache.prune(int(args.max_gb * 2 ** 30))
+        print(f"삭제한 항목 {len(removed)}개")
+    elif args.command == 'clear':
+        cache.clear()
+        print("캐시를 비웠습니다.")
+
+    entries = cache.entries()
+    print(f"{'key':>32} {'MB':>9} {'last used':>19}  generator (samples, seed, workers)")
+    for key, meta, size, used in reversed(entries):
+        print(f"{key:>32} {size / 2 ** 20:9.1f} {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(used)):>19}  "
+              f"{meta['generator']} ({meta['num_samples']:,}, {meta['seed']}, {meta['workers']})")
+    print(f"항목 {len(entries)}개, 전체 {sum(size for _, _, size, _ in entries) / 2 ** 20:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+gloo 백엔드 DistributedDataParallel 다중 프로세스 CPU 학습과 확장 효율 측정
+
+GPU 없이 코어가 많은 머신에서 intra-op 스레드 하나의 프로세스 대신 rank N개를 띄워 학습합니다.
+- 각 rank: torch.set_num_threads(--threads), 학습 세트의 1/N 샤드 (rank, rank + N, ...)
+- 전역 배치 크기(--batch-size)를 rank 수로 나눠 각 rank가 처리 (강한 확장, strong scaling)
+  -> rank 수와 상관없이 한 스텝의 유효 배치가 같아 학습 결과를 비교할 수 있음
+- 기울기는 DDP가 스텝마다 all-reduce, 에폭 손실/지표/샘플 수도 all-reduce로 합산
+- 처리량 = 전체 샘플 수 / 가장 느린 rank의 에폭 시간 (첫 에폭은 워밍업으로 제외한 중앙값)
+- 확장 효율 = N개 처리량 / (N x 1개 처리량)
+- 검증 세트는 샤드에 넣지 않고 학습이 끝난 뒤 rank 0에서만 평가
+
+실행 (저장소 루트에서):
+    python -m Common.distributed --model mlp --ranks 1 2 4 8 --threads 1
+    python -m Common.distributed --model gru --ranks 1 4 --epochs 20 --save emotion_gru_ddp.pt
+"""
+
+import argparse
+import json
+import os
+import socket
+import tempfile
+
+import numpy as np
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+import torch.nn as nn
+from torch.nn.parallel import DistributedDataParallel
+from torch.utils.data import Subset, TensorDataset
+
+from Common.training import (PaddedSequenceDataset, accuracy_count, evaluate, make_loader, split_train_val,
+                             train_epoch)
+
+
+def build_training(kind, samples, seed):
+    """
+    (모델, 데이터셋, 손실 함수, 지표) - 모든 rank가 같은 시드로 같은 데이터를 만든 뒤 샤드만 나눠 가짐
+    """
+    if kind == 'mlp':
+        from MLP.mlp import ACTIONS, UnitMLP, generate_sample_data_batch
+        states, actions = generate_sample_data_batch(samples, np.random.default_rng(seed))
+        dataset = TensorDataset(torch.from_numpy(states), torch.from_numpy(actions))
+        return UnitMLP(11, len(ACTIONS)), dataset, nn.CrossEntropyLoss(), {'accuracy': accuracy_count}
+
+    from GRU.gru_enhanced import EMOTIONS, EmotionGRU, generate_variable_length_data_batch
+    sequences, lengths, emotions = generate_variable_length_data_batch(samples, 5, 1, np.random.default_rng(seed))
+    dataset = PaddedSequenceDataset(torch.from_numpy(sequences), torch.from_numpy(lengths),
+                                    torch.from_numpy(emotions))
+    return EmotionGRU(7, 32, len(EMOTIONS)), dataset, nn.MSELoss(), {}
+
+
+def shard(dataset, rank, world_size):
+    """
+    rank번째 샤드 (모든 rank가 같은 크기가 되도록 나머지는 버림 -> 에폭당 스텝 수가 같아 all-reduce가 맞물림)
+    """
+    usable = len(dataset) - len(dataset) % world_size
+    return Subset(dataset, list(range(rank, usable, world_size)))
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _worker(rank, world_size, port, kind, settings, result_path):
+    os.environ['MASTER_ADDR'] = '127.0.0.1'
+    os.environ['MASTER_PORT'] = str(port)
+    dist.init_process_group('gloo', rank=rank, world_size=world_size)
+    torch.set_num_threads(settings['threads'])
+
+    torch.manual_seed(settings['seed'])  # 초기 가중치는 rank 0 값으로 DDP가 브로드캐스트
+    model, dataset, loss_fn, metrics = build_training(kind, settings['samples'], settings['seed'])
+    train_set, val_set = split_train_val(dataset, settings['val_fraction'], settings['seed'])
+    local_batch = max(1, settings['batch_size'] // world_size) if settings['batch_size'] else 0
+    loader = make_loader(shard(train_set, rank, world_size), batch_size=local_batch, shuffle=True,
+                         seed=settings['seed'] + rank)
+
+    ddp_model = DistributedDataParallel(model)
+    optimizer = torch.optim.Adam(ddp_model.parameters(), lr=settings['lr'])
+
+    history = {'loss': [], 'samples_per_sec': []}
+    for name in metrics:
+        history[name] = []
+    for _ in range(settings['epochs']):
+        dist.barrier()  # 모든 rank가 같이 출발해야 에폭 시간이 비교 가능
+        result = train_epoch(ddp_model, loader, loss_fn, optimizer, metrics)
+        sums = torch.tensor([result['samples']] + [result[name] * result['samples'] for name in ['loss', *metrics]],
+                            dtype=torch.float64)
+        seconds = torch.tensor([result['seconds']], dtype=torch.float64)
+        dist.all_reduce(sums, op=dist.ReduceOp.SUM)
+        dist.all_reduce(seconds, op=dist.ReduceOp.MAX)
+        for i, name in enumerate(['loss', *metrics]):
+            history[name].append((sums[i + 1] / sums[0]).item())
+        history['samples_per_sec'].append(sums[0].item() / seconds.item())
+
+    if rank == 0:
+        report = {
+            'ranks': world_size,
+            'threads_per_rank': settings['threads'],
+            'local_batch': local_batch,
+            'samples_per_sec': float(np.median(history['samples_per_sec'][1:] or history['samples_per_sec'])),
+            'history': history,
+        }
+        if val_set is not None:
+            val_loader = make_loader(val_set, batch_size=4096)
+            report['val'] = evaluate(model, val_loader, loss_fn, metrics)
+        if settings['save']:
+            torch.save(model.state_dict(), settings['save'])
+        with open(result_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f)
+    dist.destroy_process_group()
+
+
+def run(kind, world_size, settings):
+    """
+    world_size개 프로세스를 띄워 학습하고 rank 0 리포트 반환
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        result_path = os.path.join(tmp, 'rank0.json')
+        mp.spawn(_worker, args=(world_size, free_port(), kind, settings, result_path), nprocs=world_size, join=True)
+        with open(result_path, encoding='utf-8') as f:
+            return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="gloo DDP 다중 프로세스 CPU 학습 / 확장 효율 측정")
+    parser.add_argument('--model', choices=['mlp', 'gru'], default='mlp')
+    parser.add_argument('--ranks', type=int, nargs='+', default=[1, 2, 4], help="측정할 프로세스 수 목록")
+    parser.add_argument('--threads', type=int, default=1, help="rank당 torch intra-op 스레드 수")
+    parser.add_argument('--samples', type=int, default=50000)
+    parser.add_argument('--epochs', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=512, help="전역 배치 크기 (rank 수로 나눔, 0이면 전체)")
+    parser.add_argument('--lr', type=float, default=0.001)
+    parser.add_argument('--val-fraction', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', help="마지막 실행의 학습된 state_dict 저장 경로 (.pt)")
+    parser.add_argument('--report', default='ddp_scaling.json')
+    args = parser.parse_args()
+
+    print(f"CPU 코어: {os.cpu_count()}, 모델: {args.model}, 샘플 {args.samples:,}, "
+          f"전역 배치 {args.batch_size or '전체'}, rank당 스레드 {args.threads}")
+    if max(args.ranks) * args.threads > (os.cpu_count() or 1):
+        print("⚠️ rank x 스레드 수가 코어 수보다 많아 확장 효율이 낮게 측정됩니다.")
+
+    reports = []
+    for world_size in args.ranks:
+        settings = {
+            'samples': args.samples, 'epochs': args.epochs, 'batch_size': args.batch_size, 'lr': args.lr,
+            'val_fraction': args.val_fraction, 'seed': args.seed, 'threads': args.threads,
+            'save': args.save if world_size == args.ranks[-1] else None,
+        }
+        report = run(args.model, world_size, settings)
+        reports.append(report)
+        print(f"  ranks {world_size}: {report['samples_per_sec']:,.0f} samples/s")
+
+    base = next((r for r in reports if r['ranks'] == 1), reports[0])
+    base_per_rank = base['samples_per_sec'] / base['ranks']
+    metric = 'accuracy' if args.model == 'mlp' else 'loss'
+    print(f"\n{'ranks':>5} {'local batch':>11} {'samples/s':>11} {'speedup':>8} {'efficiency':>10} "
+          f"{'train loss':>10} {'val ' + metric:>12}")
+    for report in reports:
+        report['speedup'] = report['samples_per_sec'] / base['samples_per_sec']
+        report['efficiency'] = report['samples_per_sec'] / (report['ranks'] * base_per_rank)
+        val = report.get('val', {}).get(metric, float('nan'))
+        print(f"{report['ranks']:5} {report['local_batch']:11} {report['samples_per_sec']:11,.0f} "
+              f"{report['speedup']:7.2f}x {report['efficiency']:10.1%} {report['history']['loss'][-1]:10.4f} "
+              f"{val:12.4f}")
+
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump({'model': args.model, 'cpu_count': os.cpu_count(), 'runs': reports}, f, indent=2)
+    print(f"\n리포트 저장: {args.report}")
+    if args.save:
+        print(f"학습된 가중치 저장: {args.save} (ranks {args.ranks[-1]})")
+
+
+if __name__ == '__main__':
+    main()
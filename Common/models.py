@@ -0,0 +1,49 @@
+"""
+저장된 UnitMLP / EmotionGRU 가중치(.pt) 로드
+
+가지치기(Common.prune)나 증류(MLP.distill)로 은닉 크기가 바뀐 state_dict도 있으므로
+기본 구조에 넣지 않고 가중치 shape에서 구조를 복원합니다.
+벤치마크, 검증, 양자화 스크립트가 같은 방식으로 모델을 읽도록 여기서만 정의합니다.
+
+사용 예:
+    model = load_model('mlp', 'unit_action_mlp.pt')   # eval 모드
+    model = load_model('gru')                          # 기본 구조, 시드로 초기화
+"""
+
+import torch
+
+
+def model_from_state_dict(kind, state):
+    """
+    state_dict의 가중치 shape로 구조를 정해 만든 UnitMLP ('mlp') / EmotionGRU ('gru')
+    """
+    if kind == 'mlp':
+        from MLP.mlp import UnitMLP
+
+        names = sorted((name for name in state if name.startswith('net.') and name.endswith('.weight')),
+                       key=lambda name: int(name.split('.')[1]))
+        weights = [state[name] for name in names]
+        model = UnitMLP(weights[0].shape[1], weights[-1].shape[0], tuple(w.shape[0] for w in weights[:-1]))
+    else:
+        from GRU.gru_enhanced import EmotionGRU
+
+        model = EmotionGRU(state['gru.weight_ih_l0'].shape[1], state['gru.weight_hh_l0'].shape[1],
+                           state['fc.2.weight'].shape[0])
+    model.load_state_dict(state)
+    return model
+
+
+def load_model(kind, weights=None):
+    """
+    UnitMLP / EmotionGRU, eval 모드
+    - weights가 있으면 state_dict의 shape대로 구조를 만들어 로드, 없으면 기본 구조를 현재 torch 시드로 초기화
+    """
+    if weights:
+        return model_from_state_dict(kind, torch.load(weights, map_location='cpu')).eval()
+    if kind == 'mlp':
+        from MLP.mlp import ACTIONS, UnitMLP
+
+        return UnitMLP(11, len(ACTIONS)).eval()
+    from GRU.gru_enhanced import EMOTIONS, EmotionGRU
+
+    return EmotionGRU(7, 32, len(EMOTIONS)).eval()
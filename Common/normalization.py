@@ -0,0 +1,43 @@
+"""
+모델 입력 정규화 층
+
+create_state_vector / create_event_vector의 스케일 상수(/100, /10, /50)를 모델 버퍼로 보관해
+ONNX 그래프 안에서 나눗셈까지 수행합니다. 이렇게 내보낸 모델은 게임의 원본 값을 그대로
+입력받으므로 Python/C#에서 특성별 정규화 코드를 따로 유지할 필요가 없습니다.
+
+사용 예:
+    raw_model = RawInputModel(model, STATE_FEATURE_SCALES)  # MLP.mlp
+    raw_model(raw_states)  # == model(raw_states / STATE_FEATURE_SCALES)
+"""
+
+import torch
+import torch.nn as nn
+
+
+class FeatureScale(nn.Module):
+    """
+    마지막 축의 특성마다 고정 스케일로 나누는 층 (학습되지 않는 buffer)
+    - (batch, features)와 (batch, sequence, features) 입력 모두 지원
+    """
+
+    def __init__(self, scales):
+        super().__init__()
+        self.register_buffer('scale', torch.as_tensor(scales, dtype=torch.float32))
+
+    def forward(self, x):
+        return x / self.scale
+
+
+class RawInputModel(nn.Module):
+    """
+    FeatureScale + 기존 모델 (원본 값 입력용 ONNX 내보내기 래퍼)
+    - 추가 인자(예: EmotionGRU의 lengths)는 그대로 모델에 전달
+    """
+
+    def __init__(self, model, scales):
+        super().__init__()
+        self.normalize = FeatureScale(scales)
+        self.model = model
+
+    def forward(self, x, *args):
+        return self.model(self.normalize(x), *args)
@@ -0,0 +1,35 @@
+"""
+공용 ONNX 내보내기
+
+모든 모델을 opset 13 + dynamic_axes로 내보냅니다 (Unity Sentis 호환).
+최신 torch는 torch.export 기반(dynamo) 내보내기가 기본값인데, 이 경로는 opset 13을 직접 만들지 못해
+opset 18에서 변환을 시도하고, 같은 프로세스에서 GRU를 한 번 실행한 뒤에는 시퀀스 길이 축을
+상수로 고정해 버리는 경우가 있습니다. 그래서 지원되는 버전에서는 TorchScript 기반 내보내기
+(dynamo=False)를 명시적으로 사용합니다.
+"""
+
+import inspect
+
+import torch
+
+
+def export_onnx_model(model, dummy, path, input_names, output_names, dynamic_axes, opset_version=13):
+    """
+    model을 path로 내보내기
+    - dummy: 더미 입력 텐서 또는 튜플 (배치 1은 축이 상수로 고정될 수 있어 배치 2 이상 권장)
+    - dynamic_axes: {입출력 이름: {축 번호: 이름}}
+    """
+    options = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        options['dynamo'] = False
+    torch.onnx.export(
+        model,
+        dummy,
+        path,
+        input_names=input_names,
+        output_names=output_names,
+        opset_version=opset_version,
+        do_constant_folding=True,
+        dynamic_axes=dynamic_axes,
+        **options,
+    )
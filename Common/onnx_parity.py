@@ -0,0 +1,367 @@
+"""
+PyTorch vs ONNX Runtime 수치 동일성 / 지연 시간 검증 (배포 전 게이트)
+
+unit_action_mlp.onnx / emotion_gru.onnx / emotion_gru_step.onnx (및 _raw 변형)를
+같은 가중치의 PyTorch 모델과 비교합니다.
+최적화/양자화한 모델을 Unity로 넘기기 전에 이 검사를 통과해야 합니다.
+
+입력 세트 (모델마다):
+- random: 정규화 범위를 벗어난 값까지 포함한 균등 난수 + 경계 행(전부 0, 전부 1)
+- generated: generate_sample_data_batch / generate_training_data_batch 분포
+- recorded: --mlp-records / --gru-records로 준 Common.shards 디렉터리의 실제 기록 (선택)
+
+확인 항목:
+1. 최대 절대 오차 <= --atol
+2. argmax 일치율 (MLP 행동, GRU 가장 강한 감정) >= --min-agreement
+   PyTorch 출력의 1, 2위 차이가 --atol 이하인 행(동점에 가까운 행)은 어느 쪽이 이겨도 정상이라 제외
+3. 동적 batch_size 축: --batch-sizes 크기를 나누지 않고 그대로 실행 (GRU는 시퀀스 길이 1~T도)
+4. 백엔드별 지연 시간 (PyTorch eager / ONNX Runtime, p50/p99), --max-slowdown을 주면 게이트에 포함
+
+raw_ 로 시작하는 입력(export_raw_onnx)은 원본 게임 값(정규화 값 x 스케일)을 넣어 비교합니다.
+h_in/h_out 단일 스텝 그래프(export_step_onnx)는 0 상태 h_in에서 시퀀스의 이벤트를 하나씩 넣어
+스텝마다 EmotionGRU.step과 비교합니다 (시퀀스 길이 축이 없으므로 3의 시퀀스 길이 검사는 생략).
+입력 이름이 event 그대로인 _raw 스텝 그래프는 입력을 바로 나누는 정규화 노드로 판별합니다.
+그 밖에 지원하지 않는 입력 구성의 그래프는 실패로 기록하고 나머지 검사를 계속합니다.
+하나라도 실패하면 종료 코드 1, 리포트는 JSON으로 저장합니다.
+
+실행 (저장소 루트에서):
+    python -m Common.onnx_parity                                     # 현재 구조를 임시로 내보내 확인
+    python -m Common.onnx_parity --mlp-weights unit_action_mlp.pt \\
+        --mlp-onnx unit_action_mlp.onnx unit_action_mlp_raw.onnx \\
+        --gru-weights emotion_gru.pt --gru-onnx emotion_gru.onnx emotion_gru_raw.onnx \\
+        emotion_gru_step.onnx emotion_gru_step_raw.onnx
+    python -m Common.onnx_parity --models mlp --mlp-weights unit_action_mlp.pt \\
+        --mlp-onnx unit_action_mlp.int8_static.onnx --atol 0.05 --min-agreement 0.98
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import warnings
+
+import numpy as np
+import torch
+
+from Common.benchmarking import measure_latency
+from Common.models import load_model
+from Common.quantize import create_session
+from GRU.gru_enhanced import (EVENT_FEATURE_SCALES, export_onnx as export_gru_onnx,
+                              export_raw_onnx as export_gru_raw_onnx, export_step_onnx,
+                              generate_training_data_batch)
+from MLP.mlp import (STATE_FEATURE_SCALES, export_onnx as export_mlp_onnx,
+                     export_raw_onnx as export_mlp_raw_onnx, generate_sample_data_batch)
+
+FILE_NAMES = {
+    'mlp': ('unit_action_mlp.onnx', 'unit_action_mlp_raw.onnx'),
+    'gru': ('emotion_gru.onnx', 'emotion_gru_raw.onnx', 'emotion_gru_step.onnx', 'emotion_gru_step_raw.onnx'),
+}
+
+
+def export_default(kind, model, directory, sequence_length):
+    """
+    현재 모델을 정규화 입력 / 원본 값 입력 ONNX로 내보낸 경로 리스트 (GRU는 단일 스텝 그래프 포함)
+    """
+    paths = [os.path.join(directory, name) for name in FILE_NAMES[kind]]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        if kind == 'mlp':
+            export_mlp_onnx(model, paths[0])
+            export_mlp_raw_onnx(model, paths[1])
+        else:
+            export_gru_onnx(model, sequence_length, paths[0])
+            export_gru_raw_onnx(model, sequence_length, paths[1])
+            export_step_onnx(model, paths[2])
+            export_step_onnx(model, paths[3], raw_inputs=True)
+    return paths
+
+
+def input_sets(kind, samples, sequence_length, records, rng):
+    """
+    {세트 이름: 정규화된 입력 배열} (MLP (N, 11), GRU (N, T, 7))
+    """
+    if kind == 'mlp':
+        random = rng.uniform(-0.5, 1.5, (samples, 11)).astype(np.float32)
+        edges = np.stack([np.zeros(11), np.ones(11)]).astype(np.float32)
+        generated, _ = generate_sample_data_batch(samples, rng)
+    else:
+        random = rng.uniform(-1.5, 1.5, (samples, sequence_length, 7)).astype(np.float32)
+        edges = np.stack([np.zeros((sequence_length, 7)), np.ones((sequence_length, 7))]).astype(np.float32)
+        generated, _ = generate_training_data_batch(samples, sequence_length, rng)
+    sets = {'random': np.concatenate([edges, random]), 'generated': generated}
+
+    if records:
+        from Common.shards import ShardedDataset
+
+        dataset = ShardedDataset(records, schema='state' if kind == 'mlp' else 'event')
+        count = min(len(dataset), samples)
+        index = np.sort(rng.choice(len(dataset), count, replace=False))
+        sets['recorded'] = np.ascontiguousarray(dataset.records(index)['features'], dtype=np.float32)
+    return sets
+
+
+def torch_outputs(model, inputs, batch_size=4096):
+    with torch.inference_mode():
+        return np.concatenate([
+            model(torch.from_numpy(inputs[start:start + batch_size])).numpy()
+            for start in range(0, len(inputs), batch_size)
+        ])
+
+
+def onnx_outputs(session, inputs, batch_size=4096):
+    name = session.get_inputs()[0].name
+    return np.concatenate([
+        session.run(None, {name: inputs[start:start + batch_size]})[0]
+        for start in range(0, len(inputs), batch_size)
+    ])
+
+
+def is_step_graph(session):
+    """
+    은닉 상태를 h_in/h_out으로 주고받는 단일 스텝 그래프(export_step_onnx)인지
+    """
+    return any(node.name == 'h_in' for node in session.get_inputs())
+
+
+def takes_raw_input(path, input_name):
+    """
+    입력이 원본 게임 값인지: raw_ 이름이거나 입력을 바로 스케일로 나누는 FeatureScale 노드가 있음
+    - export_step_onnx(raw_inputs=True)는 Unity 코드와 맞추려고 입력 이름이 event 그대로라 그래프로 판별
+    """
+    if input_name.startswith('raw_'):
+        return True
+    import onnx
+
+    return any(node.op_type == 'Div' and node.input[0] == input_name for node in onnx.load(path).graph.node)
+
+
+def torch_step_outputs(model, inputs, batch_size=4096):
+    """
+    0 상태에서 (N, T, 7) 시퀀스의 이벤트를 하나씩 EmotionGRU.step에 넣은 스텝별 감정 (N * T, 3)
+    """
+    outputs = []
+    with torch.inference_mode():
+        for start in range(0, len(inputs), batch_size):
+            events = torch.from_numpy(inputs[start:start + batch_size])
+            h, steps = None, []
+            for step in range(events.shape[1]):
+                emotion, h = model.step(events[:, step], h)
+                steps.append(emotion.numpy())
+            outputs.append(np.stack(steps, axis=1).reshape(-1, steps[0].shape[1]))
+    return np.concatenate(outputs)
+
+
+def onnx_step_outputs(session, inputs, batch_size=4096):
+    """
+    torch_step_outputs의 ONNX 버전: h_in을 0으로 시작해 h_out을 다음 스텝 h_in으로 넘김
+    """
+    name = next(node.name for node in session.get_inputs() if node.name != 'h_in')
+    hidden_size = next(node.shape[2] for node in session.get_inputs() if node.name == 'h_in')
+    outputs = []
+    for start in range(0, len(inputs), batch_size):
+        events = inputs[start:start + batch_size]
+        h = np.zeros((1, len(events), hidden_size), dtype=np.float32)
+        steps = []
+        for step in range(events.shape[1]):
+            emotion, h = session.run(None, {name: np.ascontiguousarray(events[:, step]), 'h_in': h})
+            steps.append(emotion)
+        outputs.append(np.stack(steps, axis=1).reshape(-1, steps[0].shape[1]))
+    return np.concatenate(outputs)
+
+
+def compare_outputs(expected, actual, atol):
+    """
+    최대 절대 오차, 전체 argmax 일치율, 동점에 가까운 행을 뺀 일치율
+    """
+    top2 = np.sort(expected, axis=1)[:, -2:]
+    decisive = (top2[:, 1] - top2[:, 0]) > atol
+    agree = expected.argmax(axis=1) == actual.argmax(axis=1)
+    return {
+        'rows': len(expected),
+        'max_abs_error': float(np.abs(expected - actual).max()),
+        'agreement': float(agree.mean()),
+        'decisive_rows': int(decisive.sum()),
+        'decisive_agreement': float(agree[decisive].mean()) if decisive.any() else 1.0,
+    }
+
+
+def check_model(kind, model, path, sets, args):
+    """
+    ONNX 파일 하나 검사 -> (리포트 dict, 실패 메시지 리스트)
+    """
+    session = create_session(path, args.threads)
+    step = is_step_graph(session)
+    inputs_info = [node for node in session.get_inputs() if node.name != 'h_in']
+    model_input = inputs_info[0]
+    report = {'path': path, 'input': model_input.name, 'input_shape': [str(d) for d in model_input.shape],
+              'step': step, 'sets': {}, 'batch_sizes': {}, 'sequence_lengths': {}, 'latency': {}}
+    failures = []
+    if len(inputs_info) > 1 or (step and kind != 'gru'):
+        # 비교할 PyTorch 호출 방식을 알 수 없는 그래프: 게이트 전체를 멈추지 않고 이 모델만 실패 처리
+        failures.append(f"지원하지 않는 입력 구성 {[node.name for node in session.get_inputs()]}")
+        report['failures'] = failures
+        return report, failures
+
+    scales = None
+    if takes_raw_input(path, model_input.name):
+        scales = (STATE_FEATURE_SCALES if kind == 'mlp' else EVENT_FEATURE_SCALES).astype(np.float32)
+
+    def onnx_input(inputs):
+        return inputs * scales if scales is not None else inputs
+
+    def expected_outputs(inputs):
+        return torch_step_outputs(model, inputs) if step else torch_outputs(model, inputs)
+
+    def actual_outputs(inputs):
+        inputs = onnx_input(inputs)
+        return onnx_step_outputs(session, inputs) if step else onnx_outputs(session, inputs)
+
+    if not isinstance(model_input.shape[0], str):
+        # 배치 축이 상수면 Unity의 배치 추론이 불가능하고 나머지 검사도 실행할 수 없음
+        failures.append(f"배치 축이 고정되어 있습니다 (shape {model_input.shape})")
+        report['failures'] = failures
+        return report, failures
+
+    # 1, 2. 입력 세트별 오차와 argmax 일치율
+    for name, inputs in sets.items():
+        result = compare_outputs(expected_outputs(inputs), actual_outputs(inputs), args.atol)
+        report['sets'][name] = result
+        if result['max_abs_error'] > args.atol:
+            failures.append(f"{name}: 최대 오차 {result['max_abs_error']:.2e} > {args.atol:g}")
+        if result['decisive_agreement'] < args.min_agreement:
+            failures.append(f"{name}: argmax 일치율 {result['decisive_agreement']:.4f} < {args.min_agreement:g}")
+
+    # 3. 동적 축: 배치 크기 (GRU 시퀀스 그래프는 시퀀스 길이도)
+    pool = sets['random']
+    cases = [('batch_sizes', size, np.resize(pool, (size,) + pool.shape[1:])) for size in args.batch_sizes]
+    if kind == 'gru' and not step:
+        cases += [('sequence_lengths', length, pool[:3, :length]) for length in range(1, pool.shape[1] + 1)]
+    for group, size, inputs in cases:
+        inputs = np.ascontiguousarray(inputs)
+        try:
+            actual = actual_outputs(inputs)
+        except Exception as e:  # 고정 shape 그래프는 다른 크기 입력에서 실행 오류
+            report[group][size] = {'error': str(e).splitlines()[0]}
+            failures.append(f"{group} {size}: 실행 실패")
+            continue
+        expected = expected_outputs(inputs)
+        error = float(np.abs(expected - actual).max()) if actual.shape == expected.shape else float('inf')
+        report[group][size] = {'max_abs_error': error, 'output_shape': list(actual.shape)}
+        if actual.shape != expected.shape or error > args.atol:
+            failures.append(f"{group} {size}: 출력 {list(actual.shape)}, 최대 오차 {error:.2e}")
+
+    # 4. 백엔드별 지연 시간
+    name = model_input.name
+    for size in args.latency_batches:
+        inputs = np.ascontiguousarray(np.resize(sets['generated'], (size,) + pool.shape[1:]))
+        if step:
+            # 스텝 그래프는 틱마다 이벤트 하나 (마지막 이벤트 + 0 상태)
+            inputs = np.ascontiguousarray(inputs[:, -1])
+            h_in = np.zeros((1, size, model.gru.hidden_size), dtype=np.float32)
+            h_tensor = torch.from_numpy(h_in)
+            feed = {name: onnx_input(inputs), 'h_in': h_in}
+        else:
+            feed = {name: onnx_input(inputs)}
+        tensor = torch.from_numpy(inputs)
+
+        def eager():
+            with torch.inference_mode():
+                if step:
+                    model.step(tensor, h_tensor)
+                else:
+                    model(tensor)
+
+        backends = {'eager': measure_latency(eager, repeat=args.repeat, warmup=10),
+                    'onnxruntime': measure_latency(lambda: session.run(None, feed), repeat=args.repeat, warmup=10)}
+        report['latency'][size] = backends
+        slowdown = backends['onnxruntime']['p50_ms'] / backends['eager']['p50_ms']
+        if args.max_slowdown and slowdown > args.max_slowdown:
+            failures.append(f"배치 {size}: ONNX Runtime이 eager보다 {slowdown:.1f}배 느림")
+
+    report['failures'] = failures
+    return report, failures
+
+
+def print_report(kind, report):
+    kind = f"{kind} step(h_in/h_out)" if report.get('step') else kind
+    print(f"\n=== {kind}: {report['path']} (입력 {report['input']} {report['input_shape']}) ===")
+    print(f"{'set':>10} {'rows':>7} {'max |err|':>10} {'agreement':>10} {'decisive':>9}")
+    for name, result in report['sets'].items():
+        print(f"{name:>10} {result['rows']:7,} {result['max_abs_error']:10.2e} {result['agreement']:10.4f} "
+              f"{result['decisive_agreement']:9.4f}")
+    for group in ('batch_sizes', 'sequence_lengths'):
+        if report[group]:
+            cells = [f"{size}:{'실패' if 'error' in r else format(r['max_abs_error'], '.1e')}"
+                     for size, r in report[group].items()]
+            print(f"{group}: " + ', '.join(cells))
+    for size, backends in report['latency'].items():
+        print(f"배치 {size:>5}: " + ', '.join(
+            f"{backend} p50 {stats['p50_ms']:.4f} ms / p99 {stats['p99_ms']:.4f} ms"
+            for backend, stats in backends.items()))
+    for failure in report['failures']:
+        print(f"  ❌ {failure}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PyTorch vs ONNX Runtime 동일성/지연 시간 검증")
+    parser.add_argument('--models', nargs='+', choices=['mlp', 'gru'], default=['mlp', 'gru'])
+    parser.add_argument('--mlp-weights', help="UnitMLP state_dict (.pt, 구조는 shape에서 복원, 없으면 시드로 초기화한 모델)")
+    parser.add_argument('--gru-weights', help="EmotionGRU state_dict (.pt, 구조는 shape에서 복원, 없으면 시드로 초기화한 모델)")
+    parser.add_argument('--mlp-onnx', nargs='+', help="검사할 UnitMLP ONNX (--mlp-weights 필요, 기본: 가중치를 임시로 내보냄)")
+    parser.add_argument('--gru-onnx', nargs='+', help="검사할 EmotionGRU ONNX (--gru-weights 필요, 기본: 가중치를 임시로 내보냄)")
+    parser.add_argument('--mlp-records', help="state 스키마 샤드 디렉터리 (실제 기록 입력)")
+    parser.add_argument('--gru-records', help="event 스키마 샤드 디렉터리 (실제 기록 입력)")
+    parser.add_argument('--samples', type=int, default=5000, help="입력 세트별 샘플 수")
+    parser.add_argument('--sequence-length', type=int, default=5)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 3, 17, 256, 4096])
+    parser.add_argument('--atol', type=float, default=1e-4, help="허용 최대 절대 오차 (양자화 모델은 크게)")
+    parser.add_argument('--min-agreement', type=float, default=1.0, help="동점 근처를 뺀 argmax 최소 일치율")
+    parser.add_argument('--latency-batches', type=int, nargs='+', default=[1, 256])
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--max-slowdown', type=float, help="ONNX Runtime p50 / eager p50 허용 배수 (기본: 보고만)")
+    parser.add_argument('--threads', type=int, default=1, help="torch / ONNX Runtime intra-op 스레드 수")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--report', default='onnx_parity.json')
+    args = parser.parse_args()
+    for kind in args.models:
+        # 시드로 초기화한 모델과 학습된 ONNX를 비교하면 모든 항목이 실패해 원인을 알기 어려움
+        if getattr(args, f"{kind}_onnx") and not getattr(args, f"{kind}_weights"):
+            parser.error(f"--{kind}-onnx에는 같은 가중치의 --{kind}-weights가 필요합니다")
+
+    try:
+        import onnxruntime
+    except ImportError:
+        print("onnxruntime이 설치되어 있지 않아 검증할 수 없습니다.")
+        sys.exit(2)
+
+    torch.set_num_threads(args.threads)
+    torch.manual_seed(args.seed)
+    rng = np.random.default_rng(args.seed)
+    report = {'onnxruntime': onnxruntime.__version__, 'torch': torch.__version__, 'atol': args.atol,
+              'min_agreement': args.min_agreement, 'models': []}
+    failed = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in args.models:
+            model = load_model(kind, getattr(args, f"{kind}_weights"))
+            paths = getattr(args, f"{kind}_onnx") or export_default(kind, model, tmp, args.sequence_length)
+            sets = input_sets(kind, args.samples, args.sequence_length, getattr(args, f"{kind}_records"), rng)
+            for path in paths:
+                result, failures = check_model(kind, model, path, sets, args)
+                result['model'] = kind
+                print_report(kind, result)
+                report['models'].append(result)
+                failed += bool(failures)
+
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n리포트 저장: {args.report}")
+    if failed:
+        print(f"❌ {failed}개 모델이 검증을 통과하지 못했습니다.")
+        sys.exit(1)
+    print(f"✅ {len(report['models'])}개 모델 통과")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+멀티 프로세스 학습 데이터 생성
+
+- N개 샘플을 워커 수만큼 고정된 구간으로 나눔
+- 워커마다 마스터 시드에서 SeedSequence.spawn으로 파생한 np.random.Generator 사용
+- 워커는 결과를 공유 메모리 배열의 자기 구간에 직접 기록 (파이프로 큰 배열을 보내지 않음)
+
+같은 시드와 워커 수라면 결과는 비트 단위로 같습니다.
+(워커 수가 달라지면 난수 스트림 분할이 달라지므로 결과도 달라집니다.)
+
+사용 예:
+    from MLP.mlp import generate_sample_data_batch
+    states, actions = generate_parallel(generate_sample_data_batch, 10_000_000, workers=8, seed=0)
+
+    from GRU.gru_enhanced import generate_training_data_batch
+    sequences, emotions = generate_parallel(generate_training_data_batch, 10_000_000,
+                                            workers=8, seed=0, sequence_length=5)
+
+실행 (재현성 확인 및 워커 수별 처리량, 저장소 루트에서):
+    python -m Common.parallel_gen --samples 4000000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def split_counts(num_samples, workers):
+    """
+    num_samples를 workers개 구간으로 나눈 (시작, 개수) 목록 (앞 구간부터 1개씩 더 받음)
+    """
+    base, extra = divmod(num_samples, workers)
+    ranges = []
+    start = 0
+    for index in range(workers):
+        count = base + (1 if index < extra else 0)
+        ranges.append((start, count))
+        start += count
+    return ranges
+
+
+def _output_specs(generator, kwargs):
+    # 샘플 1개를 만들어 출력 배열 개수, 샘플당 shape, dtype 확인 (본 생성 난수와 무관한 rng 사용)
+    probe = generator(1, rng=np.random.default_rng(0), **kwargs)
+    return [(array.shape[1:], array.dtype) for array in probe]
+
+
+def _generate_chunk(generator, kwargs, seed_sequence, start, count, blocks):
+    """
+    워커: 자기 구간을 생성해 공유 메모리에 기록
+    blocks: [(공유 메모리 이름, 전체 shape, dtype)]
+    """
+    if count == 0:
+        return 0
+    outputs = generator(count, rng=np.random.default_rng(seed_sequence), **kwargs)
+    for (name, shape, dtype), array in zip(blocks, outputs):
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            view = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            view[start:start + count] = array
+            del view
+        finally:
+            shm.close()
+    return count
+
+
+def generate_parallel(generator, num_samples, workers=None, seed=None, **kwargs):
+    """
+    generator(n, rng=..., **kwargs) -> (배열, ...)를 여러 프로세스로 나눠 실행
+    - generator는 generate_sample_data_batch / generate_training_data_batch처럼
+      모든 출력의 첫 번째 축이 샘플 축이고 rng 인자를 받는 모듈 수준 함수여야 함
+    - seed가 None이면 OS 엔트로피로 마스터 시드를 정함 (재현 불가)
+    - 반환값: 일반 numpy 배열 튜플 (공유 메모리에서 복사 후 해제)
+    """
+    workers = workers or os.cpu_count() or 1
+    children = np.random.SeedSequence(seed).spawn(workers)
+    ranges = split_counts(num_samples, workers)
+
+    if workers == 1:
+        return generator(num_samples, rng=np.random.default_rng(children[0]), **kwargs)
+
+    specs = _output_specs(generator, kwargs)
+    memories = []
+    try:
+        blocks = []
+        for sample_shape, dtype in specs:
+            shape = (num_samples,) + sample_shape
+            size = max(1, int(np.prod(shape)) * dtype.itemsize)
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            memories.append(shm)
+            blocks.append((shm.name, shape, dtype))
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_generate_chunk, generator, kwargs, child, start, count, blocks)
+                for child, (start, count) in zip(children, ranges)
+            ]
+            for future in futures:
+                future.result()
+
+        results = []
+        for shm, (_, shape, dtype) in zip(memories, blocks):
+            view = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            results.append(view.copy())
+            del view
+        return tuple(results)
+    finally:
+        for shm in memories:
+            shm.close()
+            shm.unlink()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="멀티 프로세스 데이터 생성 재현성/처리량 확인")
+    parser.add_argument('--model', choices=['mlp', 'gru'], default='mlp')
+    parser.add_argument('--samples', type=int, default=2_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.model == 'mlp':
+        from MLP.mlp import generate_sample_data_batch as generator
+        kwargs = {}
+    else:
+        from GRU.gru_enhanced import generate_training_data_batch as generator
+        kwargs = {'sequence_length': 5}
+
+    print(f"{'workers':>8} {'seconds':>9} {'samples/s':>14} {'speedup':>8} {'repeatable':>10}")
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        first = generate_parallel(generator, args.samples, workers, args.seed, **kwargs)
+        seconds = time.perf_counter() - start
+        second = generate_parallel(generator, args.samples, workers, args.seed, **kwargs)
+        repeatable = all(np.array_equal(a, b) for a, b in zip(first, second))
+        baseline = baseline or seconds
+        print(f"{workers:>8} {seconds:9.3f} {args.samples / seconds:14,.0f} "
+              f"{baseline / seconds:7.2f}x {str(repeatable):>10}")
+        if not repeatable:
+            raise SystemExit("같은 시드/워커 수에서 결과가 다릅니다")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+학습/추론 단계별 시간 측정 (프로파일링 훅)
+
+- Profiler.phase(이름): 구간 시간을 이름별로 누적 (횟수, 합계, 평균, 최대)
+- Profiler.add_samples(이름, n): 그 단계의 처리량(samples/s) 계산용 샘플 수
+- 최대 RSS(상주 메모리), JSON / CSV 내보내기, 선택적으로 torch.profiler Chrome trace
+- 끄면(enabled=False) phase()는 미리 만든 nullcontext를 그대로 돌려줘 측정 비용이 거의 없음
+- 구간은 중첩될 수 있음 (train_epoch 안에 forward 등), share는 전체 경과 시간 대비 비율
+- CPU 기준 측정: GPU에서는 커널이 비동기라 시간이 다음 동기화 지점(.item() 등)으로 옮겨감
+
+train_epoch/fit에 profiler=를 넘기면 배치마다 data(배치 조회), forward, backward, optimizer,
+metrics(손실/지표 누적) 구간을, fit은 validation/checkpoint 구간을 추가로 기록합니다.
+
+사용 예:
+    profiler = Profiler()
+    with profiler.phase('data_generation'):
+        dataset = build_dataset(args)
+    fit(..., profiler=profiler)
+    profiler.save('profile')   # profile.json, profile.csv
+"""
+
+import contextlib
+import csv
+import json
+import os
+import sys
+import time
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+def peak_rss_mb():
+    """
+    지금까지 프로세스의 최대 상주 메모리 (MB, resource 모듈이 없는 플랫폼은 None)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class _Phase:
+    __slots__ = ('stats', 'start')
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stats = self.stats
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed > stats[2]:
+            stats[2] = elapsed
+        return False
+
+
+class Profiler:
+    """
+    이름별 구간 시간 누적기
+    - enabled=False면 모든 기록이 no-op
+    - trace_path가 있으면 fit이 첫 에폭을 torch.profiler로 기록해 Chrome trace로 저장
+    """
+
+    def __init__(self, enabled=True, trace_path=None):
+        self.enabled = enabled
+        self.trace_path = trace_path if enabled else None
+        self._phases = {}  # 이름 -> [횟수, 합계(초), 최대(초)]
+        self._samples = {}
+        self._start = time.perf_counter()
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NULL_CONTEXT
+        stats = self._phases.get(name)
+        if stats is None:
+            stats = self._phases[name] = [0, 0.0, 0.0]
+        return _Phase(stats)
+
+    def add_samples(self, name, count):
+        if self.enabled:
+            self._samples[name] = self._samples.get(name, 0) + count
+
+    @contextlib.contextmanager
+    def torch_trace(self, path=None):
+        """
+        블록 안을 torch.profiler로 기록해 path(기본 trace_path)에 Chrome trace(JSON) 저장
+        (chrome://tracing 또는 https://ui.perfetto.dev 에서 열기)
+        """
+        path = path or self.trace_path
+        if not path:
+            yield None
+            return
+        from torch.profiler import ProfilerActivity, profile
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with profile(activities=[ProfilerActivity.CPU], record_shapes=True) as prof:
+            yield prof
+        prof.export_chrome_trace(path)
+
+    def summary(self):
+        """
+        구간별 통계 리스트 (합계 시간 내림차순) + 전체 경과 시간, 최대 RSS
+        """
+        wall = time.perf_counter() - self._start
+        rows = []
+        for name, (count, total, longest) in self._phases.items():
+            row = {
+                'phase': name,
+                'count': count,
+                'total_s': total,
+                'mean_ms': total / count * 1000.0 if count else 0.0,
+                'max_ms': longest * 1000.0,
+                'share': total / wall if wall > 0 else 0.0,
+            }
+            if name in self._samples:
+                row['samples'] = self._samples[name]
+                row['samples_per_sec'] = self._samples[name] / total if total > 0 else float('inf')
+            rows.append(row)
+        rows.sort(key=lambda row: row['total_s'], reverse=True)
+        return {'wall_s': wall, 'peak_rss_mb': peak_rss_mb(), 'phases': rows}
+
+    def save(self, prefix):
+        """
+        prefix.json (요약 전체)과 prefix.csv (구간별 한 줄) 저장, 저장한 경로 반환
+        """
+        summary = self.summary()
+        directory = os.path.dirname(prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        json_path, csv_path = prefix + '.json', prefix + '.csv'
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        fields = ['phase', 'count', 'total_s', 'mean_ms', 'max_ms', 'share', 'samples', 'samples_per_sec']
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(summary['phases'])
+        return json_path, csv_path
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"\n=== 프로파일 (전체 {summary['wall_s']:.2f}s, 최대 RSS "
+              f"{summary['peak_rss_mb'] or float('nan'):.0f} MB) ===")
+        print(f"{'phase':>16} {'count':>8} {'total s':>9} {'mean ms':>9} {'max ms':>9} {'share':>7} {'samples/s':>12}")
+        for row in summary['phases']:
+            rate = f"{row['samples_per_sec']:12,.0f}" if 'samples_per_sec' in row else f"{'':>12}"
+            print(f"{row['phase']:>16} {row['count']:8,} {row['total_s']:9.3f} {row['mean_ms']:9.3f} "
+                  f"{row['max_ms']:9.3f} {row['share']:7.1%} {rate}")
+
+
+NULL_PROFILER = Profiler(enabled=False)
@@ -0,0 +1,296 @@
+"""
+UnitMLP / EmotionGRU 구조적 가지치기(structured pruning)
+
+가중치를 0으로 가리는(mask) 대신 중요도가 낮은 뉴런을 통째로 제거하고
+더 작은 dense 레이어로 모델을 다시 만듭니다. 그래서 ONNX 파일, 파라미터 메모리, 추론 시간이
+실제로 줄어듭니다.
+
+- UnitMLP: 은닉 뉴런 j의 중요도 = ||들어오는 가중치 행 j||_2 x ||나가는 가중치 열 j||_2
+- EmotionGRU: 은닉 유닛 j의 중요도 = 게이트(r, z, n) 입력/순환 가중치 행 j의 노름
+  x (다음 스텝 순환 가중치 열 j + 출력층 열 j의 노름)
+- 라운드마다 목표 희소도(제거한 은닉 뉴런 비율)까지 자르고 fine-tune (이전 라운드 결과에서 이어감)
+- 라운드별 검증 정확도(GRU는 MSE), 파라미터 수/바이트, ONNX 크기, 배치 1 지연 시간을 기록하고
+  정확도-희소도 곡선을 PNG로 저장 (--no-plot이면 생략, matplotlib 불필요)
+- --weights는 구조를 가중치 shape에서 복원하므로 이미 가지치기/증류한 .pt도 다시 가지치기 가능
+
+실행 (저장소 루트에서):
+    python -m Common.prune --model mlp --weights unit_action_mlp.pt
+    python -m Common.prune --model gru --weights emotion_gru.pt --sparsity 0.25 0.5 0.75
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from Common.benchmarking import measure_latency
+from Common.models import load_model
+from Common.training import accuracy_count, add_training_arguments, build_loaders, evaluate, fit
+
+
+def _keep_indices(importance, keep):
+    # 중요도 상위 keep개, 원래 순서 유지
+    return torch.sort(torch.topk(importance, keep).indices).values
+
+
+def mlp_hidden_sizes(model):
+    linears = [m for m in model.net if isinstance(m, nn.Linear)]
+    return tuple(layer.out_features for layer in linears[:-1])
+
+
+def prune_mlp(model, hidden_sizes):
+    """
+    UnitMLP의 은닉층을 hidden_sizes 크기로 줄인 새 UnitMLP
+    - 층마다 중요도 상위 뉴런만 남기고, 다음 층의 입력 열도 같은 인덱스만 남김
+    """
+    from MLP.mlp import UnitMLP
+
+    linears = [m for m in model.net if isinstance(m, nn.Linear)]
+    dropouts = [m.p for m in model.net if isinstance(m, nn.Dropout)]
+    pruned = UnitMLP(linears[0].in_features, linears[-1].out_features, tuple(hidden_sizes),
+                     dropouts[0] if dropouts else 0.0)
+    new_linears = [m for m in pruned.net if isinstance(m, nn.Linear)]
+
+    with torch.no_grad():
+        kept_inputs = torch.arange(linears[0].in_features)
+        for i, (old, new) in enumerate(zip(linears, new_linears)):
+            weight = old.weight[:, kept_inputs]
+            if i < len(hidden_sizes):
+                outgoing = linears[i + 1].weight
+                importance = weight.norm(dim=1) * outgoing.norm(dim=0)
+                kept = _keep_indices(importance, hidden_sizes[i])
+            else:
+                kept = torch.arange(old.out_features)
+            new.weight.copy_(weight[kept])
+            new.bias.copy_(old.bias[kept])
+            kept_inputs = kept
+    return pruned
+
+
+def prune_gru(model, hidden_size):
+    """
+    EmotionGRU의 은닉 크기를 hidden_size로 줄인 새 EmotionGRU
+    - PyTorch GRU 가중치는 게이트 (r, z, n) 순서로 [3H, ...]에 쌓여 있으므로
+      유닛 j에 해당하는 j, H+j, 2H+j 행과 순환 가중치의 j 열을 함께 남김
+    """
+    from GRU.gru_enhanced import EmotionGRU
+
+    gru = model.gru
+    h = gru.hidden_size
+    head = model.fc[0]
+    pruned = EmotionGRU(gru.input_size, hidden_size, model.fc[-2].out_features)
+
+    with torch.no_grad():
+        w_ih = gru.weight_ih_l0.view(3, h, -1)
+        w_hh = gru.weight_hh_l0.view(3, h, h)
+        incoming = (w_ih.pow(2).sum(dim=(0, 2)) + w_hh.pow(2).sum(dim=(0, 2))).sqrt()
+        outgoing = (w_hh.pow(2).sum(dim=(0, 1)) + head.weight.pow(2).sum(dim=0)).sqrt()
+        kept = _keep_indices(incoming * outgoing, hidden_size)
+        rows = torch.cat([kept + gate * h for gate in range(3)])
+
+        pruned.gru.weight_ih_l0.copy_(gru.weight_ih_l0[rows])
+        pruned.gru.weight_hh_l0.copy_(gru.weight_hh_l0[rows][:, kept])
+        pruned.gru.bias_ih_l0.copy_(gru.bias_ih_l0[rows])
+        pruned.gru.bias_hh_l0.copy_(gru.bias_hh_l0[rows])
+        pruned.fc[0].weight.copy_(head.weight[:, kept])
+        pruned.fc[0].bias.copy_(head.bias)
+        for new, old in zip(pruned.fc[1:], model.fc[1:]):
+            new.load_state_dict(old.state_dict())
+    return pruned
+
+
+def target_sizes(base_sizes, sparsity):
+    """
+    원래 은닉 크기에서 sparsity 비율만큼 뉴런을 뺀 크기 (층마다 최소 1)
+    """
+    return tuple(max(1, int(round(size * (1.0 - sparsity)))) for size in base_sizes)
+
+
+def parameter_bytes(model):
+    return sum(p.numel() * p.element_size() for p in model.parameters())
+
+
+def measure_model(kind, model, sequence_length, repeat):
+    """
+    파라미터 수/바이트, ONNX 크기, torch/ORT 배치 1 지연 시간
+    """
+    model.eval()
+    if kind == 'mlp':
+        from MLP.mlp import export_onnx
+        inputs = torch.rand(1, 11)
+        export = lambda path: export_onnx(model, path)
+    else:
+        from GRU.gru_enhanced import export_onnx
+        inputs = torch.rand(1, sequence_length, 7)
+        export = lambda path: export_onnx(model, sequence_length, path)
+
+    with torch.inference_mode():
+        torch_stats = measure_latency(lambda: model(inputs), repeat=repeat, warmup=20)
+    result = {
+        'parameters': sum(p.numel() for p in model.parameters()),
+        'parameter_bytes': parameter_bytes(model),
+        'torch_p50_ms': torch_stats['p50_ms'],
+    }
+    try:
+        from Common.quantize import create_session, model_size_bytes
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'model.onnx')
+            export(path)
+            result['onnx_bytes'] = model_size_bytes(path)
+            session = create_session(path)
+            feed = {session.get_inputs()[0].name: inputs.numpy()}
+            result['onnx_p50_ms'] = measure_latency(lambda: session.run(None, feed), repeat=repeat,
+                                                    warmup=20)['p50_ms']
+    except ImportError:  # onnxruntime 미설치
+        pass
+    return result
+
+
+def plot_curve(kind, rounds, metric, path):
+    """
+    정확도-희소도 / 지연 시간 곡선을 path에 저장 (창을 띄우지 않는 Agg 백엔드, 헤드리스 서버용)
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    sparsity = [r['sparsity'] for r in rounds]
+    fig, ax1 = plt.subplots(figsize=(8, 5))
+    ax1.plot(sparsity, [r[metric] for r in rounds], 'o-', label=metric)
+    ax1.set_xlabel('Sparsity (removed hidden neurons)')
+    ax1.set_ylabel(metric)
+    ax1.grid(True)
+    ax2 = ax1.twinx()
+    ax2.plot(sparsity, [r['torch_p50_ms'] for r in rounds], 's--', color='tab:orange', label='torch p50 ms')
+    ax2.set_ylabel('Latency p50 (ms, batch 1)')
+    ax1.set_title(f'{kind} structured pruning: {metric} vs sparsity')
+    fig.legend(loc='lower left')
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def build_base(kind, args):
+    """
+    (기준 모델, 데이터셋, 손실 함수, 지표, 평가 지표 이름, 클수록 좋은지)
+    """
+    from torch.utils.data import TensorDataset
+
+    rng = np.random.default_rng(0 if args.seed is None else args.seed)
+    if kind == 'mlp':
+        from MLP.mlp import ACTIONS, UnitMLP, generate_sample_data_batch
+        states, actions = generate_sample_data_batch(args.samples, rng)
+        dataset = TensorDataset(torch.from_numpy(states), torch.from_numpy(actions))
+        model = UnitMLP(11, len(ACTIONS))
+        return model, dataset, nn.CrossEntropyLoss(), {'accuracy': accuracy_count}, 'val_accuracy', True
+
+    from Common.training import PaddedSequenceDataset
+    from GRU.gru_enhanced import EMOTIONS, EmotionGRU, generate_variable_length_data_batch
+    sequences, lengths, emotions = generate_variable_length_data_batch(args.samples, args.sequence_length, 1, rng)
+    dataset = PaddedSequenceDataset(torch.from_numpy(sequences), torch.from_numpy(lengths),
+                                    torch.from_numpy(emotions))
+    model = EmotionGRU(7, 32, len(EMOTIONS))
+    return model, dataset, nn.MSELoss(), {}, 'val_loss', False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UnitMLP/EmotionGRU 구조적 가지치기")
+    add_training_arguments(parser, epochs=1000, samples=5000)
+    parser.add_argument('--model', choices=['mlp', 'gru'], default='mlp')
+    parser.add_argument('--weights', help="기준 모델 state_dict (.pt, 없으면 먼저 학습)")
+    parser.add_argument('--sparsity', type=float, nargs='+', default=[0.25, 0.5, 0.625, 0.75, 0.875],
+                        help="라운드별 목표 희소도 (제거할 은닉 뉴런 비율, 오름차순)")
+    parser.add_argument('--finetune-epochs', type=int, default=100, help="라운드마다 fine-tune 최대 에폭")
+    parser.add_argument('--sequence-length', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=300, help="지연 시간 측정 반복 수")
+    parser.add_argument('--output-dir', default='pruned')
+    parser.add_argument('--report', default=None, help="리포트 JSON (기본: output-dir/<model>_pruning.json)")
+    parser.add_argument('--no-plot', action='store_true', help="곡선 그래프 생략 (matplotlib 불필요)")
+    parser.set_defaults(batch_size=256)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        torch.manual_seed(args.seed)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    model, dataset, loss_fn, metrics, metric, higher_is_better = build_base(args.model, args)
+    train_loader, val_loader = build_loaders(dataset, args)
+
+    def train(model, epochs):
+        optimizer = torch.optim.Adam(model.parameters(), lr=args.lr)
+        fit(model, train_loader, loss_fn, optimizer, epochs, metrics, log_every=0, val_loader=val_loader,
+            patience=args.patience, min_delta=args.min_delta, time_budget=args.time_budget)
+        model.eval()
+
+    if args.weights:
+        model = load_model(args.model, args.weights)
+        print(f"기준 가중치 로드: {args.weights}")
+    else:
+        print("기준 모델 학습 중...")
+        train(model, args.epochs)
+    model.eval()
+
+    if args.model == 'mlp':
+        base_sizes = mlp_hidden_sizes(model)
+        prune = prune_mlp
+    else:
+        base_sizes = (model.gru.hidden_size,)
+        prune = lambda m, sizes: prune_gru(m, sizes[0])
+
+    rounds = []
+    for sparsity in [0.0] + sorted(args.sparsity):
+        sizes = target_sizes(base_sizes, sparsity)
+        if sparsity > 0:
+            model = prune(model, sizes)
+            before = evaluate(model, val_loader, loss_fn, metrics)
+            train(model, args.finetune_epochs)
+        else:
+            before = None
+        result = {'sparsity': sparsity, 'hidden_sizes': list(sizes)}
+        for name, value in evaluate(model, val_loader, loss_fn, metrics).items():
+            result['val_' + name] = value
+        if before is not None:
+            result[metric + '_before_finetune'] = before[metric[len('val_'):]]
+        result.update(measure_model(args.model, model, args.sequence_length, args.repeat))
+
+        path = os.path.join(args.output_dir, f"{args.model}_pruned_{int(round(sparsity * 1000)):03d}.onnx")
+        if args.model == 'mlp':
+            from MLP.mlp import export_onnx
+            export_onnx(model, path)
+        else:
+            from GRU.gru_enhanced import export_onnx
+            export_onnx(model, args.sequence_length, path)
+        torch.save(model.state_dict(), os.path.splitext(path)[0] + '.pt')
+        result['onnx_path'] = path
+        rounds.append(result)
+        print(f"희소도 {sparsity:5.3f} 은닉 {sizes}: {metric} {result[metric]:.6f}, "
+              f"파라미터 {result['parameters']:,}, torch {result['torch_p50_ms']:.4f} ms")
+
+    base = rounds[0]
+    print(f"\n=== {args.model} 가지치기 결과 ===")
+    print(f"{'sparsity':>8} {'hidden':>14} {metric:>13} {'params':>8} {'param KB':>9} {'onnx KB':>8} "
+          f"{'torch ms':>9} {'ORT ms':>8} {'speedup':>8}")
+    for r in rounds:
+        r['speedup'] = base['torch_p50_ms'] / r['torch_p50_ms']
+        r['memory_ratio'] = r['parameter_bytes'] / base['parameter_bytes']
+        print(f"{r['sparsity']:8.3f} {str(tuple(r['hidden_sizes'])):>14} {r[metric]:13.6f} {r['parameters']:8,} "
+              f"{r['parameter_bytes'] / 1024:9.1f} {r.get('onnx_bytes', float('nan')) / 1024:8.1f} "
+              f"{r['torch_p50_ms']:9.4f} {r.get('onnx_p50_ms', float('nan')):8.4f} {r['speedup']:7.2f}x")
+
+    report_path = args.report or os.path.join(args.output_dir, f"{args.model}_pruning.json")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump({'model': args.model, 'metric': metric, 'higher_is_better': higher_is_better,
+                   'rounds': rounds}, f, indent=2)
+    if not args.no_plot:
+        curve_path = os.path.join(args.output_dir, f"{args.model}_pruning_curve.png")
+        plot_curve(args.model, rounds, metric, curve_path)
+        print(f"\n곡선: {curve_path}")
+    print(f"리포트: {report_path}")
+
+
+if __name__ == '__main__':
+    main()
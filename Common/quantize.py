@@ -0,0 +1,299 @@
+"""
+UnitMLP / EmotionGRU ONNX 모델 int8 후처리 양자화(post-training quantization)
+
+- dynamic: 가중치만 int8로 저장하고 활성값은 실행 중에 양자화 (보정 데이터 불필요)
+- static: generate_sample_data_batch / generate_training_data_batch로 만든 보정 세트로
+  활성값 범위를 미리 측정해 QDQ 형식으로 양자화
+
+EmotionGRU: ONNX GRU 연산자는 onnxruntime 양자화 대상이 아니라(dynamic은 MatMul/LSTM 등, static도
+GRU 미지원) emotion_gru.onnx를 그대로 양자화하면 GRU 가중치는 float32로 남고 출력 층만 int8이 되어
+오히려 파일이 커집니다. 그래서 emotion_gru.pt 가중치로 시간 축을 펼친 MatMul 버전
+(emotion_gru_unrolled.onnx, GRU.gru_enhanced.export_unrolled_onnx)을 만들어 순환 가중치까지 양자화합니다.
+펼친 모델과 그 int8 모델(emotion_gru_unrolled.int8_*.onnx)은 시퀀스 길이가 --sequence-length로 고정됩니다.
+은닉 32의 기본 EmotionGRU는 가중치가 17.6KB -> 5.5KB(dynamic)로 줄지만 펼친 그래프 구조가 그만큼
+커서 파일 크기는 GRU 연산자 float 모델과 비슷하고, 노드 수가 많아 배치 1 지연 시간은 오히려 늘어납니다
+(리포트의 weights KB / 지연 시간 열로 확인, 은닉 크기가 클수록 양자화 이득이 커짐).
+
+각 모델에 대해 float 모델 대비 행동 일치율(MLP), 감정 MSE(GRU), 파일 크기,
+CPU 추론 지연 시간을 비교한 리포트를 --output-dir 안에 JSON으로 저장합니다.
+float32보다 파일이 크고 가장 작은 배치에서 느린 변형은 regression으로 표시하고 권장하지 않으며,
+변형마다 recommended 항목에 배포할 모델(regression이 아닌 것 중 파일이 가장 작은 것)을 표시합니다.
+
+실행 (저장소 루트에서, 먼저 python -m MLP.mlp / python -m GRU.gru_enhanced로 float 모델 생성):
+    python -m Common.quantize --mlp unit_action_mlp.onnx --gru emotion_gru.onnx --gru-weights emotion_gru.pt
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from Common.benchmarking import measure_latency
+
+
+def model_size_bytes(path):
+    """
+    ONNX 파일 크기 (외부 가중치 파일 path + '.data'가 있으면 포함)
+    """
+    size = os.path.getsize(path)
+    if os.path.exists(path + '.data'):
+        size += os.path.getsize(path + '.data')
+    return size
+
+
+def model_weight_bytes(path):
+    """
+    가중치(initializer) 바이트 수
+    - 파일 크기에는 그래프 구조도 포함되어, 작은 모델은 int8로 바꿔도 파일 크기가 거의 줄지 않음
+    """
+    import onnx
+    from onnx import numpy_helper
+
+    return sum(numpy_helper.to_array(tensor).nbytes for tensor in onnx.load(path).graph.initializer)
+
+
+def create_session(path, threads=1):
+    """
+    스레드 수를 고정한 CPU InferenceSession
+    """
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.log_severity_level = 3  # 경고 로그 생략 (오류만 출력)
+    return ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+
+
+def run_session(session, inputs, batch_size=4096):
+    """
+    입력 배열을 batch_size로 나눠 실행한 첫 번째 출력
+    """
+    name = session.get_inputs()[0].name
+    outputs = [
+        session.run(None, {name: inputs[start:start + batch_size]})[0]
+        for start in range(0, len(inputs), batch_size)
+    ]
+    return np.concatenate(outputs)
+
+
+class ArrayCalibrationReader:
+    """
+    onnxruntime CalibrationDataReader: 보정 배열을 배치 단위로 넘겨줌
+    """
+
+    def __init__(self, input_name, inputs, batch_size=64):
+        self.input_name = input_name
+        self.inputs = inputs
+        self.batch_size = batch_size
+        self._position = 0
+
+    def get_next(self):
+        if self._position >= len(self.inputs):
+            return None
+        batch = self.inputs[self._position:self._position + self.batch_size]
+        self._position += self.batch_size
+        return {self.input_name: batch}
+
+    def rewind(self):
+        self._position = 0
+
+
+def _load_inline(path, tmp_dir):
+    """
+    외부 가중치(.data)를 포함해 읽은 뒤 단일 파일로 다시 저장 (양자화 도구 입력용)
+    내보내기 도구가 남긴 중간 value_info는 양자화 도구의 shape 추론과 충돌할 수 있어 제거
+    """
+    import onnx
+
+    model = onnx.load(path)
+    del model.graph.value_info[:]
+    inline_path = os.path.join(tmp_dir, os.path.basename(path))
+    onnx.save(model, inline_path)
+    return inline_path
+
+
+def quantize_model(float_path, calibration, output_dir, per_channel=False, static_op_types=None):
+    """
+    float ONNX 하나를 dynamic/static int8로 양자화
+    - static_op_types: static에서 양자화할 연산자 (None이면 지원하는 전부)
+    반환값: {'dynamic': 경로, 'static': 경로}
+    """
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+    from onnxruntime import set_default_logger_severity
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    set_default_logger_severity(3)  # 보정 세션의 경고 로그 생략
+
+    stem = os.path.splitext(os.path.basename(float_path))[0]
+    paths = {
+        'dynamic': os.path.join(output_dir, f"{stem}.int8_dynamic.onnx"),
+        'static': os.path.join(output_dir, f"{stem}.int8_static.onnx"),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inline_path = _load_inline(float_path, tmp)
+        prepared_path = os.path.join(tmp, f"{stem}.prep.onnx")
+        quant_pre_process(inline_path, prepared_path, skip_symbolic_shape=True)
+
+        quantize_dynamic(prepared_path, paths['dynamic'], weight_type=QuantType.QInt8,
+                         per_channel=per_channel)
+
+        input_name = create_session(prepared_path).get_inputs()[0].name
+        quantize_static(
+            prepared_path,
+            paths['static'],
+            ArrayCalibrationReader(input_name, calibration),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=per_channel,
+            op_types_to_quantize=static_op_types,
+        )
+
+    return paths
+
+
+def compare_models(float_path, quantized_paths, inputs, labels, kind, threads=1,
+                   latency_batches=(1, 256), repeat=200):
+    """
+    float 모델 대비 양자화 모델 정확도/크기/지연 시간 비교
+    - kind='mlp': 행동(argmax) 일치율과 레이블 정확도
+    - kind='gru': float 출력 대비 감정 MSE와 레이블 대비 MSE
+    """
+    variants = {'float32': float_path, **quantized_paths}
+    sessions = {name: create_session(path, threads) for name, path in variants.items()}
+    outputs = {name: run_session(session, inputs) for name, session in sessions.items()}
+    reference = outputs['float32']
+
+    report = {}
+    for name, path in variants.items():
+        output = outputs[name]
+        entry = {'path': path, 'size_bytes': model_size_bytes(path), 'weight_bytes': model_weight_bytes(path)}
+        if kind == 'mlp':
+            actions = output.argmax(axis=1)
+            entry['action_agreement'] = float((actions == reference.argmax(axis=1)).mean())
+            entry['label_accuracy'] = float((actions == labels).mean())
+        else:
+            entry['emotion_mse_vs_float'] = float(((output - reference) ** 2).mean())
+            entry['emotion_mse_vs_label'] = float(((output - labels) ** 2).mean())
+        entry['max_abs_error_vs_float'] = float(np.abs(output - reference).max())
+
+        session = sessions[name]
+        input_name = session.get_inputs()[0].name
+        entry['latency'] = {}
+        for batch in latency_batches:
+            feed = {input_name: inputs[:batch]}
+            entry['latency'][str(batch)] = measure_latency(lambda: session.run(None, feed), repeat=repeat)
+        report[name] = entry
+
+    float_size = report['float32']['size_bytes']
+    for entry in report.values():
+        entry['size_ratio'] = entry['size_bytes'] / float_size
+    mark_regressions(report, str(latency_batches[0]))
+    return report
+
+
+def mark_regressions(report, batch):
+    """
+    float32보다 파일도 크고 batch 크기 p50 지연 시간도 느린 변형을 regression으로 표시
+    - batch는 게임의 유닛별 호출에 해당하는 가장 작은 배치 (보통 1)
+    - 'recommended'에는 regression이 아닌 변형 중 파일이 가장 작은 것 (없으면 float32)을 기록
+    """
+    reference = report['float32']
+    candidates = {'float32': reference['size_bytes']}
+    for name, entry in report.items():
+        if name == 'float32':
+            continue
+        entry['regression'] = (entry['size_bytes'] >= reference['size_bytes'] and
+                               entry['latency'][batch]['p50_ms'] >= reference['latency'][batch]['p50_ms'])
+        if not entry['regression']:
+            candidates[name] = entry['size_bytes']
+    recommended = min(candidates, key=candidates.get)
+    for name, entry in report.items():
+        entry['recommended'] = name == recommended
+
+
+def print_report(title, report, kind):
+    print(f"\n=== {title} ===")
+    metric, spec = ('action_agreement', '22.6f') if kind == 'mlp' else ('emotion_mse_vs_float', '22.3e')
+    batches = list(next(iter(report.values()))['latency'])
+    header = ''.join(f" {'p50 ms b=' + b:>12}" for b in batches)
+    print(f"{'variant':>16} {'size KB':>9} {'weights KB':>10} {metric:>22}{header}")
+    for name, entry in report.items():
+        latency = ''.join(f" {entry['latency'][b]['p50_ms']:12.4f}" for b in batches)
+        mark = ' 권장' if entry['recommended'] else ' ⚠️ regression' if entry.get('regression') else ''
+        print(f"{name:>16} {entry['size_bytes'] / 1024:9.1f} {entry['weight_bytes'] / 1024:10.1f} "
+              f"{entry[metric]:{spec}}{latency}{mark}")
+    regressed = [name for name, entry in report.items() if entry.get('regression')]
+    if regressed:
+        print(f"  ⚠️ {', '.join(regressed)}: float32보다 파일이 크고 배치 {batches[0]}에서 느려 배포하지 마세요")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UnitMLP/EmotionGRU int8 양자화 및 리포트")
+    parser.add_argument('--mlp', default='unit_action_mlp.onnx', help="float UnitMLP ONNX 경로")
+    parser.add_argument('--gru', default='emotion_gru.onnx', help="float EmotionGRU ONNX 경로 (비교 기준)")
+    parser.add_argument('--gru-weights', default='emotion_gru.pt',
+                        help="--gru와 같은 EmotionGRU state_dict (펼친 MatMul 모델을 만들어 양자화)")
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--report', default='quantization_report.json', help="리포트 파일 이름 (--output-dir 안에 저장)")
+    parser.add_argument('--calibration-samples', type=int, default=2048)
+    parser.add_argument('--eval-samples', type=int, default=20000)
+    parser.add_argument('--sequence-length', type=int, default=5)
+    parser.add_argument('--per-channel', action='store_true')
+    parser.add_argument('--threads', type=int, default=1, help="지연 시간 측정 스레드 수")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    calibration_rng = np.random.default_rng(args.seed)
+    eval_rng = np.random.default_rng(args.seed + 1)
+    report = {'threads': args.threads, 'models': {}}
+
+    if os.path.exists(args.mlp):
+        from MLP.mlp import generate_sample_data_batch
+
+        calibration, _ = generate_sample_data_batch(args.calibration_samples, calibration_rng)
+        states, actions = generate_sample_data_batch(args.eval_samples, eval_rng)
+        paths = quantize_model(args.mlp, calibration, args.output_dir, args.per_channel)
+        report['models']['unit_mlp'] = compare_models(args.mlp, paths, states, actions, 'mlp', args.threads)
+        print_report("UnitMLP", report['models']['unit_mlp'], 'mlp')
+    else:
+        print(f"{args.mlp} 없음: UnitMLP 양자화 생략 (python -m MLP.mlp로 먼저 생성)")
+
+    if os.path.exists(args.gru) and os.path.exists(args.gru_weights):
+        import warnings
+
+        from Common.models import load_model
+        from GRU.gru_enhanced import export_unrolled_onnx, generate_training_data_batch
+
+        t = args.sequence_length
+        calibration, _ = generate_training_data_batch(args.calibration_samples, t, calibration_rng)
+        sequences, emotions = generate_training_data_batch(args.eval_samples, t, eval_rng)
+        unrolled_path = os.path.join(args.output_dir, 'emotion_gru_unrolled.onnx')
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            export_unrolled_onnx(load_model('gru', args.gru_weights), t, unrolled_path)
+        paths = {'float32_unrolled': unrolled_path,
+                 **quantize_model(unrolled_path, calibration, args.output_dir, args.per_channel,
+                                  static_op_types=['MatMul', 'Gemm'])}
+        report['models']['emotion_gru'] = compare_models(args.gru, paths, sequences, emotions, 'gru', args.threads)
+        report['emotion_gru_unrolled'] = {'weights': args.gru_weights, 'sequence_length': t}
+        print_report(f"EmotionGRU (float32 = GRU 연산자, 나머지 = T={t} 고정 펼친 모델)",
+                     report['models']['emotion_gru'], 'gru')
+    else:
+        missing = args.gru if not os.path.exists(args.gru) else args.gru_weights
+        print(f"{missing} 없음: EmotionGRU 양자화 생략 (python -m GRU.gru_enhanced로 먼저 생성)")
+
+    report_path = os.path.join(args.output_dir, args.report)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n리포트 저장: {report_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+유닛 상태 / 전투 이벤트용 structured 레코드 헬퍼
+
+샘플마다 문자열 키 dict를 만드는 대신 필드 이름이 있는 numpy structured 배열
+(MLP.mlp.UNIT_STATE_DTYPE, GRU.gru_enhanced.BATTLE_EVENT_DTYPE)에 담습니다.
+- 레코드 하나가 필드 수 x 4바이트 (dict는 수백 바이트 + 필드마다 해시 조회)
+- record['hp_ratio']처럼 이름으로 접근하므로 create_state_vector 등 기존 함수에 그대로 전달 가능
+- 모든 필드가 float32라서 (N, 필드 수) 행렬 view로 복사 없이 원본 값 입력 모델에 전달
+"""
+
+import numpy as np
+from numpy.lib.recfunctions import structured_to_unstructured
+
+
+def records_from_dicts(dicts, dtype):
+    """
+    dict 목록 -> structured 배열 (dtype의 필드 이름으로 값 조회, 빠진 키는 KeyError)
+    """
+    names = dtype.names
+    return np.array([tuple(d[name] for name in names) for d in dicts], dtype=dtype)
+
+
+def records_to_dicts(records):
+    """
+    structured 배열 -> dict 목록 (디버그 출력/기존 코드 호환용)
+    """
+    names = records.dtype.names
+    return [dict(zip(names, row)) for row in records.tolist()]
+
+
+def records_from_columns(columns, dtype):
+    """
+    {필드 이름: 1D 배열} 열 딕셔너리 -> structured 배열
+    """
+    first = np.asarray(columns[dtype.names[0]])
+    records = np.empty(first.shape, dtype=dtype)
+    for name in dtype.names:
+        records[name] = columns[name]
+    return records
+
+
+def feature_matrix(records):
+    """
+    필드가 모두 같은 dtype인 structured 배열을 (..., 필드 수) 행렬 view로 반환
+    - 연속 메모리 배열이면 복사하지 않음 (np.shares_memory로 확인 가능)
+    """
+    return structured_to_unstructured(records, copy=False)
@@ -0,0 +1,325 @@
+"""
+전투 로그용 메모리 매핑 샤드 데이터셋
+
+디렉터리 구성:
+    index.json          스키마, 샤드 목록, 샤드별 확정(commit)된 레코드 수
+    shard-00000.bin     고정 크기 레코드를 이어 붙인 raw binary (little-endian)
+    shard-00001.bin     ...
+
+레코드 스키마 (numpy structured dtype, C#에서는 같은 순서의 Pack=1 구조체):
+    state: features float32[11] (create_state_vector 순서), action int64
+    event: features float32[T, 7] (create_event_vector 순서), emotion float32[3]
+
+index.json에 기록된 레코드만 읽기 대상이므로, 쓰는 도중 프로세스가 죽어도
+마지막 flush 이후의 미완성 꼬리 데이터는 다음 append 때 잘라냅니다.
+
+실행 예 (Unity가 파이프로 레코드를 계속 흘려보내는 경우):
+    python -m Common.shards append logs/states --schema state < unity_pipe
+    python -m Common.shards info logs/states
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+STATE_FEATURES = 11  # create_state_vector의 특성 개수
+EVENT_FEATURES = 7  # create_event_vector의 특성 개수
+EMOTION_COUNT = 3
+
+INDEX_FILE = 'index.json'
+INDEX_VERSION = 1
+
+# 스키마별 (특성 필드, 레이블 필드)
+LABEL_FIELDS = {
+    'state': 'action',
+    'event': 'emotion',
+}
+
+
+def record_dtype(schema, sequence_length=5):
+    """
+    스키마 이름으로 레코드 dtype 생성
+    """
+    if schema == 'state':
+        return np.dtype([
+            ('features', '<f4', (STATE_FEATURES,)),
+            ('action', '<i8'),
+        ])
+    if schema == 'event':
+        return np.dtype([
+            ('features', '<f4', (sequence_length, EVENT_FEATURES)),
+            ('emotion', '<f4', (EMOTION_COUNT,)),
+        ])
+    raise ValueError(f"알 수 없는 스키마: {schema!r} (state 또는 event)")
+
+
+def _shard_name(number):
+    return f"shard-{number:05d}.bin"
+
+
+def read_index(root):
+    with open(os.path.join(root, INDEX_FILE), encoding='utf-8') as f:
+        index = json.load(f)
+    if index.get('version') != INDEX_VERSION:
+        raise ValueError(f"지원하지 않는 인덱스 버전: {index.get('version')}")
+    return index
+
+
+def _write_index(root, index):
+    # 임시 파일에 쓴 뒤 교체해 읽는 쪽이 항상 완전한 인덱스를 보도록 함
+    path = os.path.join(root, INDEX_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ShardWriter:
+    """
+    레코드를 고정 dtype 샤드에 이어 쓰는 writer
+
+    - append=False: 새 데이터셋 생성 (이미 있으면 FileExistsError)
+    - append=True: 기존 데이터셋의 마지막 샤드부터 이어 쓰기 (스트리밍 모드)
+    - flush_every: 이 개수만큼 쓸 때마다 자동 flush (0이면 수동 flush/close 때만)
+
+    사용 예:
+        with ShardWriter('logs/states', 'state') as writer:
+            writer.write_columns(features=states, action=actions)
+    """
+
+    def __init__(self, root, schema, sequence_length=5, shard_records=1_000_000,
+                 append=False, flush_every=0):
+        self.root = root
+        self.dtype = record_dtype(schema, sequence_length)
+        self.flush_every = flush_every
+        self._pending = 0
+        self._file = None
+
+        index_path = os.path.join(root, INDEX_FILE)
+        if os.path.exists(index_path):
+            if not append:
+                raise FileExistsError(f"{root}에 이미 데이터셋이 있습니다 (append=True로 이어 쓰기)")
+            self.index = read_index(root)
+            if self.index['schema'] != schema or self.index['record_size'] != self.dtype.itemsize:
+                raise ValueError(
+                    f"스키마 불일치: 기존 {self.index['schema']}/{self.index['record_size']}B, "
+                    f"요청 {schema}/{self.dtype.itemsize}B"
+                )
+        else:
+            os.makedirs(root, exist_ok=True)
+            self.index = {
+                'version': INDEX_VERSION,
+                'schema': schema,
+                'sequence_length': sequence_length if schema == 'event' else None,
+                'record_size': self.dtype.itemsize,
+                'shard_records': shard_records,
+                'shards': [],
+            }
+            _write_index(root, self.index)
+
+        self.shard_records = self.index['shard_records']
+        if self.index['shards']:
+            self._open_shard(resume=True)
+
+    def _open_shard(self, resume=False):
+        if self._file is not None:
+            self._file.close()
+        if resume:
+            shard = self.index['shards'][-1]
+            path = os.path.join(self.root, shard['file'])
+            self._file = open(path, 'ab')
+            # 마지막 flush 이후의 미완성 데이터 제거
+            self._file.truncate(shard['records'] * self.dtype.itemsize)
+        else:
+            shard = {'file': _shard_name(len(self.index['shards'])), 'records': 0}
+            self.index['shards'].append(shard)
+            self._file = open(os.path.join(self.root, shard['file']), 'wb')
+
+    def write(self, records):
+        """
+        structured 배열(self.dtype) 레코드를 이어 쓰기
+        """
+        records = np.ascontiguousarray(records, dtype=self.dtype)
+        offset = 0
+        while offset < len(records):
+            if self._file is None or self.index['shards'][-1]['records'] >= self.shard_records:
+                self._open_shard()
+            shard = self.index['shards'][-1]
+            count = min(self.shard_records - shard['records'], len(records) - offset)
+            self._file.write(records[offset:offset + count].tobytes())
+            shard['records'] += count
+            offset += count
+
+        self._pending += len(records)
+        if self.flush_every and self._pending >= self.flush_every:
+            self.flush()
+
+    def write_columns(self, **columns):
+        """
+        필드별 배열로 레코드 쓰기 (예: features=(N, 11), action=(N,))
+        """
+        count = len(next(iter(columns.values())))
+        records = np.zeros(count, dtype=self.dtype)
+        for name, values in columns.items():
+            records[name] = values
+        self.write(records)
+
+    def write_raw(self, data):
+        """
+        C# 등에서 보낸 packed 레코드 바이트를 그대로 쓰기 (레코드 크기의 배수여야 함)
+        """
+        if len(data) % self.dtype.itemsize:
+            raise ValueError(f"레코드 크기({self.dtype.itemsize}B)의 배수가 아닙니다: {len(data)}B")
+        self.write(np.frombuffer(data, dtype=self.dtype))
+
+    def flush(self):
+        """
+        샤드 데이터를 디스크에 내리고 인덱스를 갱신 (이후 읽는 쪽에서 보임)
+        """
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        _write_index(self.root, self.index)
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return sum(shard['records'] for shard in self.index['shards'])
+
+
+class ShardedDataset(Dataset):
+    """
+    샤드를 np.memmap으로 열어 필요한 행만 읽는 Dataset
+
+    - dataset[i] -> (features, label) 텐서
+    - dataset[[i, j, ...]] -> 배치 텐서 (Common.training.make_loader의 BatchSampler 경로)
+    - 메모리 매핑은 프로세스마다 처음 접근할 때 열리므로 DataLoader 워커로 안전하게 전달됨
+    - refresh(): 스트리밍 writer가 flush한 새 레코드 반영
+    """
+
+    def __init__(self, root, schema=None):
+        self.root = root
+        self.refresh()
+        if schema is not None and schema != self.schema:
+            raise ValueError(f"{root}는 {self.schema} 스키마입니다 ({schema} 필요)")
+
+    def refresh(self):
+        self.index = read_index(self.root)
+        self.schema = self.index['schema']
+        self.label_field = LABEL_FIELDS[self.schema]
+        self.dtype = record_dtype(self.schema, self.index['sequence_length'] or 5)
+        self.counts = [shard['records'] for shard in self.index['shards'] if shard['records']]
+        self.files = [shard['file'] for shard in self.index['shards'] if shard['records']]
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts, dtype=np.int64)])
+        self._maps = None
+
+    def _shards(self):
+        if self._maps is None:
+            self._maps = [
+                np.memmap(os.path.join(self.root, name), dtype=self.dtype, mode='r', shape=(count,))
+                for name, count in zip(self.files, self.counts)
+            ]
+        return self._maps
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_maps'] = None
+        return state
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def records(self, index):
+        """
+        전역 인덱스(정수 또는 정수 배열)에 해당하는 structured 레코드 조회
+        """
+        maps = self._shards()
+        if np.isscalar(index):
+            index = int(index)
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError(index)
+            shard = int(np.searchsorted(self.offsets, index, side='right')) - 1
+            local = index - self.offsets[shard]
+            return maps[shard][local:local + 1].copy()[0]
+
+        index = np.asarray(index, dtype=np.int64)
+        shard_ids = np.searchsorted(self.offsets, index, side='right') - 1
+        result = np.empty(len(index), dtype=self.dtype)
+        for shard in np.unique(shard_ids):
+            mask = shard_ids == shard
+            result[mask] = maps[shard][index[mask] - self.offsets[shard]]
+        return result
+
+    def __getitem__(self, index):
+        records = self.records(index)
+        features = np.array(records['features'], order='C')
+        labels = np.array(records[self.label_field], order='C')
+        return torch.from_numpy(features), torch.from_numpy(labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전투 로그 샤드 데이터셋 도구")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    append = commands.add_parser('append', help="표준 입력(또는 파일)의 packed 레코드를 이어 쓰기")
+    append.add_argument('root')
+    append.add_argument('--schema', choices=sorted(LABEL_FIELDS), required=True)
+    append.add_argument('--sequence-length', type=int, default=5)
+    append.add_argument('--shard-records', type=int, default=1_000_000)
+    append.add_argument('--flush-every', type=int, default=4096, help="자동 flush 간격 (레코드 수)")
+    append.add_argument('--input', help="입력 파일 (기본: 표준 입력)")
+
+    info = commands.add_parser('info', help="데이터셋 요약 출력")
+    info.add_argument('root')
+
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        index = read_index(args.root)
+        total = sum(shard['records'] for shard in index['shards'])
+        print(f"스키마: {index['schema']} ({index['record_size']}B/레코드)")
+        print(f"샤드 수: {len(index['shards'])}, 레코드 수: {total:,}")
+        return
+
+    source = open(args.input, 'rb') if args.input else sys.stdin.buffer
+    with ShardWriter(args.root, args.schema, args.sequence_length, args.shard_records,
+                     append=True, flush_every=args.flush_every) as writer:
+        record_size = writer.dtype.itemsize
+        chunk_size = record_size * 1024
+        buffer = b''
+        while True:
+            data = source.read1(chunk_size) if hasattr(source, 'read1') else source.read(chunk_size)
+            if not data:
+                break
+            buffer += data
+            usable = len(buffer) - len(buffer) % record_size
+            if usable:
+                writer.write_raw(buffer[:usable])
+                buffer = buffer[usable:]
+        if buffer:
+            print(f"경고: 마지막 {len(buffer)}B는 완전한 레코드가 아니어서 버렸습니다", file=sys.stderr)
+    print(f"{args.root}: 총 {len(writer):,}개 레코드")
+
+
+if __name__ == '__main__':
+    main()
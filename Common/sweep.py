@@ -0,0 +1,353 @@
+"""
+UnitMLP / EmotionGRU / PPO 하이퍼파라미터 스윕
+
+- 탐색 공간(JSON 또는 YAML)의 모든 조합을 프로세스 풀에서 동시에 학습
+- 워커마다 torch 스레드 수를 고정해 (워커 수 x 스레드 수)가 CPU 코어 수를 넘지 않게 함
+- 시도(trial)마다 검증 손실/정확도, 학습 시간, 추론 지연 시간(배치 1 = 유닛 하나의 프레임 비용) 기록
+- 정확도(GRU는 검증 MSE) vs 지연 시간 Pareto front 출력, --latency-budget-ms 안에서 가장 좋은 모델 표시
+  (Pareto front와 예산 모두 배치 1 p99 지연 시간 기준)
+
+PPO(ML-Agents)는 Unity 환경이 있어야 학습되므로 Config/config.yaml에서 파생한 설정 파일과
+mlagents-learn 실행 명령만 생성합니다. mlp/gru 결과는 PPO 단계 전에 먼저 저장합니다.
+
+PyYAML(pip install pyyaml)은 선택 의존성으로 YAML 탐색 공간과 PPO 설정 생성에만 필요합니다.
+없거나 --ppo-config 파일이 없으면 PPO는 경고 후 생략합니다.
+
+탐색 공간 형식 (키는 모델 이름, 값 목록의 곱집합이 시도 목록):
+    mlp:
+      hidden_sizes: [[64, 64, 32], [32, 32], [128, 64]]
+      lr: [0.001, 0.003]
+    gru:
+      hidden_size: [16, 32, 64]
+    ppo:
+      hyperparameters.learning_rate: [3.0e-4, 1.0e-4]
+      network_settings.hidden_units: [64, 128]
+
+실행 (저장소 루트에서):
+    python -m Common.sweep --workers 4 --threads 1 --output sweep_results.json
+    python -m Common.sweep --space sweep_space.yaml --models mlp --latency-budget-ms 0.05
+"""
+
+import argparse
+import copy
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import torch
+import torch.nn as nn
+
+from Common.benchmarking import measure_latency
+
+try:
+    import yaml
+except ImportError:  # 선택 의존성: YAML 탐색 공간 / PPO 설정 생성에만 사용
+    yaml = None
+
+# --space를 지정하지 않았을 때의 기본 탐색 공간
+DEFAULT_SPACE = {
+    'mlp': {
+        'hidden_sizes': [[64, 64, 32], [32, 32], [16], [128, 64]],
+        'dropout': [0.2],
+        'lr': [0.001, 0.003],
+    },
+    'gru': {
+        'hidden_size': [8, 16, 32, 64],
+        'lr': [0.001, 0.003],
+    },
+    'ppo': {
+        'hyperparameters.learning_rate': [3.0e-4, 1.0e-4],
+        'network_settings.hidden_units': [64, 128],
+    },
+}
+
+# 모델별 Pareto 목표 (지표 이름, 클수록 좋은지)
+OBJECTIVES = {
+    'mlp': ('val_accuracy', True),
+    'gru': ('val_loss', False),
+}
+
+
+def load_space(path):
+    """
+    탐색 공간 파일 읽기 (.yaml/.yml은 PyYAML 필요, 그 외는 JSON)
+    """
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def expand_grid(space):
+    """
+    {파라미터: 값 목록} -> 모든 조합의 {파라미터: 값} 목록
+    """
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def _init_worker(threads):
+    # 워커 프로세스당 연산 스레드 수 고정 (초기화 직후라 inter-op 설정도 가능)
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+
+
+def _build_trial(kind, params, settings):
+    """
+    (모델, 데이터셋, 손실 함수, 지표, 지연 시간 측정용 입력 생성 함수)
+    """
+    from torch.utils.data import TensorDataset
+
+    if kind == 'mlp':
+        from Common.training import accuracy_count
+        from MLP.mlp import ACTIONS, UnitMLP, generate_sample_data_batch
+        import numpy as np
+
+        states, actions = generate_sample_data_batch(settings['samples'], np.random.default_rng(settings['seed']))
+        dataset = TensorDataset(torch.from_numpy(states), torch.from_numpy(actions))
+        model = UnitMLP(11, len(ACTIONS), tuple(params.get('hidden_sizes', (64, 64, 32))),
+                        params.get('dropout', 0.2))
+        return model, dataset, nn.CrossEntropyLoss(), {'accuracy': accuracy_count}, lambda b: torch.rand(b, 11)
+
+    from GRU.gru_enhanced import EMOTIONS, EmotionGRU, generate_training_data_batch
+    import numpy as np
+
+    t = settings['sequence_length']
+    sequences, emotions = generate_training_data_batch(settings['samples'], t, np.random.default_rng(settings['seed']))
+    dataset = TensorDataset(torch.from_numpy(sequences), torch.from_numpy(emotions))
+    model = EmotionGRU(7, params.get('hidden_size', 32), len(EMOTIONS))
+    return model, dataset, nn.MSELoss(), {}, lambda b: torch.rand(b, t, 7)
+
+
+def run_trial(trial_id, kind, params, settings):
+    """
+    시도 하나 학습 + 평가 (워커 프로세스에서 실행)
+    반환값: 설정, 검증 지표, 학습 시간, 에폭 수, 파라미터 수, 지연 시간
+    """
+    from Common.training import build_loaders, evaluate, fit
+
+    torch.manual_seed(settings['seed'])
+    model, dataset, loss_fn, metrics, make_input = _build_trial(kind, params, settings)
+    loader_args = argparse.Namespace(
+        val_fraction=settings['val_fraction'], seed=settings['seed'],
+        batch_size=params.get('batch_size', settings['batch_size']), shuffle=True,
+        num_workers=0, pin_memory=False,
+    )
+    train_loader, val_loader = build_loaders(dataset, loader_args)
+    optimizer = torch.optim.Adam(model.parameters(), lr=params.get('lr', 0.001))
+
+    start = time.perf_counter()
+    history = fit(model, train_loader, loss_fn, optimizer, settings['epochs'], metrics,
+                  log_every=0, val_loader=val_loader, patience=settings['patience'],
+                  time_budget=settings['time_budget'])
+    train_seconds = time.perf_counter() - start
+
+    result = {
+        'id': trial_id,
+        'model': kind,
+        'params': params,
+        'parameters': sum(p.numel() for p in model.parameters()),
+        'train_seconds': train_seconds,
+        'epochs': history['stopped_epoch'],
+        'stop_reason': history['stop_reason'],
+    }
+    for name, value in evaluate(model, val_loader, loss_fn, metrics).items():
+        result['val_' + name] = value
+
+    model.eval()
+    for batch in (1, settings['latency_batch']):
+        inputs = make_input(batch)
+        with torch.inference_mode():
+            stats = measure_latency(lambda: model(inputs), repeat=settings['latency_repeat'], warmup=20)
+        suffix = '' if batch == 1 else f"_b{batch}"
+        result['latency_p50_ms' + suffix] = stats['p50_ms']
+        result['latency_p99_ms' + suffix] = stats['p99_ms']
+    return result
+
+
+def pareto_front(trials, objective, maximize, cost='latency_p99_ms'):
+    """
+    objective(최대화 또는 최소화)와 cost(최소화)에서 다른 시도에 지배되지 않는 시도 id 목록
+    """
+    def score(trial):
+        value = trial[objective]
+        return (value if maximize else -value), -trial[cost]
+
+    front = []
+    for trial in trials:
+        mine = score(trial)
+        dominated = any(
+            all(o >= m for o, m in zip(score(other), mine)) and score(other) != mine
+            for other in trials if other is not trial
+        )
+        if not dominated:
+            front.append(trial['id'])
+    return front
+
+
+def set_dotted(config, dotted_key, value):
+    """
+    'hyperparameters.learning_rate' 같은 점 경로에 값 설정
+    """
+    *parents, last = dotted_key.split('.')
+    node = config
+    for key in parents:
+        node = node.setdefault(key, {})
+    node[last] = value
+
+
+def write_ppo_variants(base_path, grid, output_dir, behavior=None):
+    """
+    ML-Agents 설정 파일의 behaviors.<behavior> 아래 값을 바꾼 변형 파일들 생성
+    반환값: [{'id', 'params', 'config', 'command'}]
+    """
+    with open(base_path, encoding='utf-8') as f:
+        base = yaml.safe_load(f)
+    behavior = behavior or next(iter(base['behaviors']))
+    os.makedirs(output_dir, exist_ok=True)
+
+    variants = []
+    for index, params in enumerate(grid):
+        config = copy.deepcopy(base)
+        for key, value in params.items():
+            set_dotted(config['behaviors'][behavior], key, value)
+        path = os.path.join(output_dir, f"ppo_{index:03d}.yaml")
+        with open(path, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(config, f, sort_keys=False)
+        run_id = f"sweep_ppo_{index:03d}"
+        variants.append({
+            'id': f"ppo-{index:03d}",
+            'params': params,
+            'config': path,
+            'command': f"mlagents-learn {path} --run-id={run_id} --no-graphics",
+        })
+    return variants
+
+
+def write_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n결과 저장: {path}")
+
+
+def print_trials(kind, trials, front, budget_ms):
+    objective, maximize = OBJECTIVES[kind]
+    ordered = sorted(trials, key=lambda t: t[objective], reverse=maximize)
+    print(f"\n=== {kind} ({len(trials)}개 시도, * = Pareto front) ===")
+    print(f"  {'id':>9} {objective:>13} {'p50 ms':>9} {'p99 ms':>9} {'params':>8} {'train s':>8}  설정")
+    for trial in ordered:
+        mark = '*' if trial['id'] in front else ' '
+        print(f"{mark} {trial['id']:>9} {trial[objective]:13.6f} {trial['latency_p50_ms']:9.4f} "
+              f"{trial['latency_p99_ms']:9.4f} {trial['parameters']:8,} {trial['train_seconds']:8.1f}  "
+              f"{json.dumps(trial['params'])}")
+    if budget_ms is not None:
+        within = [t for t in ordered if t['latency_p99_ms'] <= budget_ms]
+        if within:
+            print(f"  p99 {budget_ms} ms 이내 최고: {within[0]['id']} {json.dumps(within[0]['params'])}")
+        else:
+            print(f"  p99 {budget_ms} ms 이내 시도 없음")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UnitMLP/EmotionGRU/PPO 하이퍼파라미터 스윕")
+    parser.add_argument('--space', help="탐색 공간 파일 (JSON/YAML, 기본: DEFAULT_SPACE)")
+    parser.add_argument('--models', nargs='+', choices=['mlp', 'gru', 'ppo'], default=['mlp', 'gru', 'ppo'])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--threads', type=int, default=1, help="워커당 torch 스레드 수")
+    parser.add_argument('--max-trials', type=int, default=0, help="모델별 무작위로 고를 최대 시도 수 (0이면 전체)")
+    parser.add_argument('--samples', type=int, default=5000)
+    parser.add_argument('--epochs', type=int, default=300)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--val-fraction', type=float, default=0.2)
+    parser.add_argument('--patience', type=int, default=30)
+    parser.add_argument('--time-budget', type=float, default=None, help="시도당 최대 학습 시간 (초)")
+    parser.add_argument('--sequence-length', type=int, default=5)
+    parser.add_argument('--latency-batch', type=int, default=256, help="틱 병합 추론 기준 배치 크기")
+    parser.add_argument('--latency-repeat', type=int, default=200)
+    parser.add_argument('--latency-budget-ms', type=float, default=None,
+                        help="프레임당 추론 예산 (배치 1 p99 기준, Pareto front와 같은 지표)")
+    parser.add_argument('--ppo-config', default=os.path.join('Config', 'config.yaml'))
+    parser.add_argument('--ppo-output', default='sweep_ppo_configs')
+    parser.add_argument('--output', default='sweep_results.json')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if yaml is None and args.space and args.space.endswith(('.yaml', '.yml')):
+        parser.error("YAML 탐색 공간에는 PyYAML이 필요합니다 (pip install pyyaml, 또는 JSON 파일 사용)")
+    if 'ppo' in args.models:
+        # 긴 mlp/gru 스윕이 끝난 뒤 PPO 단계에서 실패하지 않도록 미리 확인
+        if yaml is None or not os.path.exists(args.ppo_config):
+            reason = "PyYAML이 설치되어 있지 않음" if yaml is None else f"{args.ppo_config} 없음"
+            print(f"⚠️ {reason}: PPO 설정 생성 생략")
+            args.models = [kind for kind in args.models if kind != 'ppo']
+
+    space = load_space(args.space) if args.space else DEFAULT_SPACE
+    settings = {
+        'samples': args.samples,
+        'epochs': args.epochs,
+        'batch_size': args.batch_size,
+        'val_fraction': args.val_fraction,
+        'patience': args.patience,
+        'time_budget': args.time_budget,
+        'sequence_length': args.sequence_length,
+        'latency_batch': args.latency_batch,
+        'latency_repeat': args.latency_repeat,
+        'seed': args.seed,
+    }
+
+    sampler = random.Random(args.seed)
+    jobs = []
+    for kind in ('mlp', 'gru'):
+        if kind not in args.models or kind not in space:
+            continue
+        grid = expand_grid(space[kind])
+        if args.max_trials and len(grid) > args.max_trials:
+            grid = sampler.sample(grid, args.max_trials)
+        jobs += [(f"{kind}-{index:03d}", kind, params) for index, params in enumerate(grid)]
+
+    report = {'settings': settings, 'workers': args.workers, 'threads': args.threads,
+              'trials': [], 'pareto': {}, 'ppo': []}
+
+    if jobs:
+        print(f"{len(jobs)}개 시도, 워커 {args.workers}개 x 스레드 {args.threads}개")
+        start = time.perf_counter()
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(args.workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(args.threads,)) as pool:
+            futures = [pool.submit(run_trial, trial_id, kind, params, settings) for trial_id, kind, params in jobs]
+            for future in futures:
+                result = future.result()
+                report['trials'].append(result)
+                print(f"  {result['id']} 완료 ({result['train_seconds']:.1f}s, {result['epochs']} 에폭)")
+        report['wall_seconds'] = time.perf_counter() - start
+        print(f"전체 {report['wall_seconds']:.1f}s")
+
+        for kind, (objective, maximize) in OBJECTIVES.items():
+            trials = [t for t in report['trials'] if t['model'] == kind]
+            if trials:
+                report['pareto'][kind] = pareto_front(trials, objective, maximize)
+                print_trials(kind, trials, report['pareto'][kind], args.latency_budget_ms)
+
+    # PPO 단계에서 문제가 생겨도 mlp/gru 결과는 남도록 먼저 저장
+    write_report(report, args.output)
+
+    if 'ppo' in args.models and 'ppo' in space:
+        grid = expand_grid(space['ppo'])
+        if args.max_trials and len(grid) > args.max_trials:
+            grid = sampler.sample(grid, args.max_trials)
+        report['ppo'] = write_ppo_variants(args.ppo_config, grid, args.ppo_output)
+        print(f"\n=== ppo: {len(report['ppo'])}개 설정 생성 ({args.ppo_output}) ===")
+        print("  ML-Agents 학습은 Unity 환경이 필요하므로 아래 명령으로 실행:")
+        for variant in report['ppo']:
+            print(f"  {variant['command']}  # {json.dumps(variant['params'])}")
+        write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,442 @@
+"""
+UnitMLP / EmotionGRU 공용 학습 루프
+- batch_size=0: 전체 데이터를 한 배치로 학습 (기존 방식)
+- batch_size>0: 셔플/워커/pinned 버퍼를 쓰는 미니배치 DataLoader 학습
+- 검증 세트 분리, patience 기반 조기 종료, 최고 성능 가중치 복원, 학습 시간 제한
+- 주기적 체크포인트와 재개 (Common.checkpoint)
+- 가변 길이 시퀀스: PaddedSequenceDataset + 길이별 버킷 배치 (입력이 (x, lengths) 튜플)
+"""
+
+import argparse
+import copy
+import time
+
+import torch
+from torch.utils.data import BatchSampler, DataLoader, Dataset, RandomSampler, Sampler, SequentialSampler, Subset
+
+from Common.checkpoint import capture_rng_state, restore_rng_state
+from Common.profiling import NULL_PROFILER
+
+
+def add_training_arguments(parser, epochs=1000, samples=1000):
+    """
+    두 학습 스크립트가 공유하는 명령행 옵션
+    """
+    group = parser.add_argument_group('학습')
+    group.add_argument('--epochs', type=int, default=epochs)
+    group.add_argument('--samples', type=int, default=samples, help="생성할 훈련 샘플 수")
+    group.add_argument('--data', help="샤드 데이터셋 디렉터리 (지정하면 합성 데이터 대신 사용, Common.shards)")
+    group.add_argument('--gen-workers', type=int, default=1,
+                       help="합성 데이터 생성 프로세스 수 (Common.parallel_gen, 같은 시드/워커 수면 같은 데이터)")
+    group.add_argument('--generator', choices=['random', 'sim'], default='random',
+                       help="합성 데이터 생성 방식 (random: 독립 난수, sim: Common.battle_sim 전투 시뮬레이터)")
+    group.add_argument('--cache-dir', help="생성한 데이터셋 캐시 디렉터리 (Common.dataset_cache, --seed 필요)")
+    group.add_argument('--cache-max-gb', type=float, default=None, help="데이터셋 캐시 최대 용량 (GB, 초과 시 LRU 삭제)")
+    group.add_argument('--lr', type=float, default=0.001)
+    group.add_argument('--batch-size', type=int, default=0,
+                       help="미니배치 크기 (0이면 전체 배치 학습)")
+    group.add_argument('--shuffle', action=argparse.BooleanOptionalAction, default=True,
+                       help="미니배치 모드에서 에폭마다 셔플")
+    group.add_argument('--num-workers', type=int, default=0, help="DataLoader 워커 프로세스 수")
+    group.add_argument('--pin-memory', action='store_true', help="pinned 메모리 버퍼 사용")
+    group.add_argument('--device', default='cpu')
+    group.add_argument('--seed', type=int, default=None)
+    group.add_argument('--log-every', type=int, default=100, help="로그 출력 간격 (에폭)")
+
+    group = parser.add_argument_group('검증 / 조기 종료')
+    group.add_argument('--val-fraction', type=float, default=0.1,
+                       help="검증 세트 비율 (0이면 검증 없이 학습 손실로 수렴 판단)")
+    group.add_argument('--patience', type=int, default=50,
+                       help="개선이 없을 때 기다릴 에폭 수 (0이면 조기 종료 끔)")
+    group.add_argument('--min-delta', type=float, default=1e-3,
+                       help="개선으로 인정할 최소 상대 감소율 (1e-3 = 0.1%%)")
+    group.add_argument('--time-budget', type=float, default=None, help="이번 실행의 최대 학습 시간 (초)")
+
+    group = parser.add_argument_group('체크포인트 (Common.checkpoint)')
+    group.add_argument('--checkpoint-dir', help="체크포인트 저장 디렉터리 (지정하지 않으면 저장 안 함)")
+    group.add_argument('--checkpoint-every', type=int, default=50, help="체크포인트 저장 간격 (에폭)")
+    group.add_argument('--keep-checkpoints', type=int, default=5, help="유지할 최근 체크포인트 수 (0이면 모두)")
+    group.add_argument('--resume', nargs='?', const='latest',
+                       help="체크포인트에서 재개 (경로 생략 시 --checkpoint-dir의 가장 최근 파일)")
+
+    group = parser.add_argument_group('프로파일링 (Common.profiling)')
+    group.add_argument('--profile', metavar='PREFIX',
+                       help="단계별 시간/처리량/최대 RSS를 PREFIX.json, PREFIX.csv로 저장")
+    group.add_argument('--torch-trace', metavar='PATH', help="첫 에폭의 torch.profiler Chrome trace 저장 경로")
+    return group
+
+
+def split_train_val(dataset, val_fraction, seed=None):
+    """
+    dataset을 무작위로 (학습, 검증) Subset으로 분리
+    val_fraction이 0이면 (dataset, None)
+    """
+    val_size = int(len(dataset) * val_fraction)
+    if val_size == 0:
+        return dataset, None
+    generator = torch.Generator()
+    if seed is not None:
+        generator.manual_seed(seed)
+    order = torch.randperm(len(dataset), generator=generator).tolist()
+    return Subset(dataset, order[val_size:]), Subset(dataset, order[:val_size])
+
+
+def build_loaders(dataset, args):
+    """
+    add_training_arguments 옵션으로 (학습 DataLoader, 검증 DataLoader 또는 None) 생성
+    """
+    train_set, val_set = split_train_val(dataset, args.val_fraction, args.seed)
+    train_loader = make_loader(
+        train_set,
+        batch_size=args.batch_size,
+        shuffle=args.shuffle and args.batch_size > 0,
+        num_workers=args.num_workers,
+        pin_memory=args.pin_memory,
+        seed=args.seed,
+    )
+    val_loader = None
+    if val_set is not None:
+        val_loader = make_loader(val_set, batch_size=args.batch_size, num_workers=args.num_workers,
+                                 pin_memory=args.pin_memory)
+    return train_loader, val_loader
+
+
+class PaddedSequenceDataset(Dataset):
+    """
+    길이가 다른 시퀀스를 0으로 채운 (N, T_max, F) 텐서와 실제 길이로 보관하는 Dataset
+    - dataset[indices] -> ((x, lengths), y), x는 배치 안 최대 길이까지만 잘라서 반환
+    - make_loader는 lengths 속성을 보고 길이별 버킷 배치를 구성
+    """
+
+    def __init__(self, sequences, lengths, targets):
+        self.sequences = sequences
+        self.lengths = lengths
+        self.targets = targets
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __getitem__(self, index):
+        lengths = self.lengths[index]
+        longest = int(lengths.max())
+        return (self.sequences[index, :longest], lengths), self.targets[index]
+
+
+class LengthBucketSampler(Sampler):
+    """
+    길이가 비슷한 샘플끼리 묶는 batch sampler
+    - 길이순으로 정렬(같은 길이 안에서는 무작위)한 뒤 batch_size씩 자르고, shuffle이면 배치 순서를 섞음
+    - 배치 안 패딩이 최소가 되어 없는 이벤트에 쓰는 계산이 줄어듦
+    """
+
+    def __init__(self, lengths, batch_size, shuffle=False, seed=None):
+        self.lengths = torch.as_tensor(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.generator = torch.Generator()
+        if seed is not None:
+            self.generator.manual_seed(seed)
+        else:
+            self.generator.seed()
+
+    def __len__(self):
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self):
+        if self.shuffle:
+            order = torch.randperm(len(self.lengths), generator=self.generator)
+            order = order[torch.argsort(self.lengths[order], stable=True)]
+        else:
+            order = torch.argsort(self.lengths, stable=True)
+        batches = list(torch.split(order, self.batch_size))
+        if self.shuffle:
+            batches = [batches[i] for i in torch.randperm(len(batches), generator=self.generator)]
+        for batch in batches:
+            yield batch.tolist()
+
+
+def sequence_lengths(dataset):
+    """
+    dataset(또는 그 Subset)의 샘플별 길이, 길이 정보가 없으면 None
+    """
+    if isinstance(dataset, Subset):
+        lengths = sequence_lengths(dataset.dataset)
+        return None if lengths is None else lengths[dataset.indices]
+    return getattr(dataset, 'lengths', None)
+
+
+def make_loader(dataset, batch_size=0, shuffle=False, num_workers=0, pin_memory=False, seed=None):
+    """
+    dataset에서 배치를 뽑는 DataLoader 생성
+    - BatchSampler가 인덱스 묶음을 통째로 넘기므로 dataset[indices]로 배치를 한 번에 조회
+      (샘플 단위 collate 비용이 없음, TensorDataset 및 ShardedDataset 모두 지원)
+    - batch_size=0이면 전체 데이터를 한 배치로 사용
+    - dataset에 lengths가 있으면(PaddedSequenceDataset) LengthBucketSampler로 길이별 배치 구성
+    """
+    batch_size = batch_size or len(dataset)
+    lengths = sequence_lengths(dataset)
+    if lengths is not None:
+        batch_sampler = LengthBucketSampler(lengths, batch_size, shuffle, seed)
+    else:
+        if shuffle:
+            generator = torch.Generator()
+            if seed is not None:
+                generator.manual_seed(seed)
+            sampler = RandomSampler(dataset, generator=generator)
+        else:
+            sampler = SequentialSampler(dataset)
+        batch_sampler = BatchSampler(sampler, batch_size, drop_last=False)
+
+    return DataLoader(
+        dataset,
+        sampler=batch_sampler,
+        batch_size=None,
+        num_workers=num_workers,
+        pin_memory=pin_memory,
+        persistent_workers=num_workers > 0,
+    )
+
+
+def _to_device(inputs, device):
+    if isinstance(inputs, (tuple, list)):
+        return tuple(t.to(device, non_blocking=True) for t in inputs)
+    return inputs.to(device, non_blocking=True)
+
+
+def _forward(model, inputs):
+    # (x, lengths) 같은 튜플 입력은 model(x, lengths)로 호출
+    if isinstance(inputs, (tuple, list)):
+        return model(*inputs)
+    return model(inputs)
+
+
+def train_epoch(model, loader, loss_fn, optimizer, metrics=None, device=None, profiler=None):
+    """
+    한 에폭 학습
+    - 손실/지표는 텐서로 누적하고 에폭 끝에서 한 번만 .item()으로 동기화
+    - metrics: {이름: fn(pred, y) -> 배치 합계 텐서}
+    - profiler(Common.profiling.Profiler): data/forward/backward/optimizer/metrics 구간 시간 기록
+    - 반환값: {'loss', 지표 이름..., 'samples', 'seconds', 'samples_per_sec'}
+    """
+    metrics = metrics or {}
+    phase = (profiler or NULL_PROFILER).phase
+    model.train()
+
+    total_loss = torch.zeros(())
+    totals = {name: torch.zeros(()) for name in metrics}
+    seen = 0
+    start = time.perf_counter()
+
+    batches = iter(loader)
+    while True:
+        with phase('data'):
+            batch = next(batches, None)
+            if batch is not None and device is not None:
+                batch = (_to_device(batch[0], device), batch[1].to(device, non_blocking=True))
+        if batch is None:
+            break
+        xb, yb = batch
+
+        with phase('forward'):
+            pred = _forward(model, xb)
+            loss = loss_fn(pred, yb)
+
+        with phase('metrics'), torch.no_grad():
+            batch = len(yb)
+            total_loss += loss.detach().cpu() * batch
+            for name, fn in metrics.items():
+                totals[name] += fn(pred, yb).detach().cpu()
+
+        with phase('backward'):
+            optimizer.zero_grad()
+            loss.backward()
+        with phase('optimizer'):
+            optimizer.step()
+        seen += batch
+
+    seconds = time.perf_counter() - start
+    result = {'loss': (total_loss / seen).item()}
+    for name, total in totals.items():
+        result[name] = (total / seen).item()
+    result['samples'] = seen
+    result['seconds'] = seconds
+    result['samples_per_sec'] = seen / seconds if seconds > 0 else float('inf')
+    if profiler is not None:
+        profiler.add_samples('train_epoch', seen)
+    return result
+
+
+def evaluate(model, loader, loss_fn, metrics=None, device=None):
+    """
+    학습 없이 loader 전체의 평균 손실/지표 계산 (model.eval 상태, 끝나면 train으로 복귀)
+    """
+    metrics = metrics or {}
+    model.eval()
+    total_loss = torch.zeros(())
+    totals = {name: torch.zeros(()) for name in metrics}
+    seen = 0
+
+    with torch.no_grad():
+        for xb, yb in loader:
+            if device is not None:
+                xb = _to_device(xb, device)
+                yb = yb.to(device, non_blocking=True)
+            pred = _forward(model, xb)
+            batch = len(yb)
+            total_loss += loss_fn(pred, yb).cpu() * batch
+            for name, fn in metrics.items():
+                totals[name] += fn(pred, yb).cpu()
+            seen += batch
+
+    model.train()
+    result = {'loss': (total_loss / seen).item()}
+    for name, total in totals.items():
+        result[name] = (total / seen).item()
+    return result
+
+
+class EarlyStopping:
+    """
+    patience 기반 조기 종료
+    - 손실이 best * (1 - min_delta)보다 낮아지면 개선으로 보고 카운터 초기화
+      (MLP의 교차 엔트로피와 GRU의 MSE처럼 손실 크기가 달라도 같은 기준이 되도록 상대값 사용)
+    - patience 에폭 연속 개선이 없으면 should_stop
+    """
+
+    def __init__(self, patience=50, min_delta=1e-3):
+        self.patience = patience
+        self.min_delta = min_delta
+        self.best = float('inf')
+        self.best_epoch = -1
+        self.bad_epochs = 0
+
+    def step(self, value, epoch):
+        """
+        이번 에폭 값 기록, 개선되었으면 True
+        """
+        if value < self.best * (1.0 - self.min_delta):
+            self.best = value
+            self.best_epoch = epoch
+            self.bad_epochs = 0
+            return True
+        self.bad_epochs += 1
+        return False
+
+    @property
+    def should_stop(self):
+        return self.patience > 0 and self.bad_epochs >= self.patience
+
+
+def fit(model, loader, loss_fn, optimizer, epochs, metrics=None, device=None, log_every=100,
+        val_loader=None, patience=0, min_delta=1e-3, time_budget=None, checkpoint=None, resume=None,
+        profiler=None):
+    """
+    최대 epochs만큼 train_epoch를 반복하고 에폭별 기록을 반환
+
+    - val_loader가 있으면 매 에폭 검증 손실로, 없으면 학습 손실로 수렴 여부 판단
+    - patience > 0이면 개선 없이 patience 에폭이 지나면 중단
+    - time_budget(초)을 넘기면 중단 (재개한 경우 이번 실행 시간 기준)
+    - checkpoint(CheckpointManager)가 있으면 checkpoint.every 에폭마다와 학습이 끝날 때 저장
+    - resume(load_checkpoint 결과)이 있으면 그 에폭 다음부터 같은 난수 흐름으로 이어서 학습
+    - profiler(Common.profiling.Profiler)가 있으면 train_epoch 구간과 validation/checkpoint 시간 기록,
+      profiler.trace_path가 있으면 첫 에폭을 torch.profiler trace로 저장
+    - 끝나면 판단 기준 손실이 가장 낮았던 에폭의 가중치로 복원
+
+    반환값: {'loss': [...], 지표 이름: [...], 'samples_per_sec': [...],
+             'val_loss': [...], 'val_' + 지표 이름: [...] (검증 시),
+             'best_epoch': int, 'stopped_epoch': int, 'stop_reason': str}
+    """
+    metrics = metrics or {}
+    history = {'loss': [], 'samples_per_sec': []}
+    for name in metrics:
+        history[name] = []
+    if val_loader is not None:
+        history['val_loss'] = []
+        for name in metrics:
+            history['val_' + name] = []
+
+    stopper = EarlyStopping(patience, min_delta)
+    best_state = None
+    stop_reason = 'max_epochs'
+    start_epoch = 0
+    phase = (profiler or NULL_PROFILER).phase
+
+    if resume is not None:
+        model.load_state_dict(resume['model'])
+        optimizer.load_state_dict(resume['optimizer'])
+        history = {name: list(values) for name, values in resume['history'].items()}
+        stopper.best, stopper.best_epoch, stopper.bad_epochs = resume['stopper']
+        best_state = resume['best_state']
+        restore_rng_state(resume['rng'], loader)
+        start_epoch = resume['epoch']
+
+    def training_state(completed):
+        return {
+            'epoch': completed,
+            'model': model.state_dict(),
+            'optimizer': optimizer.state_dict(),
+            'history': history,
+            'stopper': (stopper.best, stopper.best_epoch, stopper.bad_epochs),
+            'best_state': best_state,
+            'rng': capture_rng_state(loader),
+        }
+
+    start = time.perf_counter()
+    epoch = start_epoch
+    if stopper.should_stop:
+        stop_reason = 'early_stopping'  # 이미 조기 종료된 체크포인트
+    else:
+        while epoch < epochs:
+            with phase('train_epoch'):
+                if profiler is not None and profiler.trace_path and epoch == start_epoch:
+                    with profiler.torch_trace():
+                        result = train_epoch(model, loader, loss_fn, optimizer, metrics, device, profiler)
+                else:
+                    result = train_epoch(model, loader, loss_fn, optimizer, metrics, device, profiler)
+            if val_loader is not None:
+                with phase('validation'):
+                    for name, value in evaluate(model, val_loader, loss_fn, metrics, device).items():
+                        result['val_' + name] = value
+            for name in history:
+                history[name].append(result[name])
+            epoch += 1
+
+            monitored = result['val_loss'] if val_loader is not None else result['loss']
+            if stopper.step(monitored, epoch - 1):
+                best_state = copy.deepcopy(model.state_dict())
+
+            if log_every and epoch % log_every == 0:
+                extra = ''.join(f", {name.capitalize()}: {result[name]:.4f}" for name in metrics)
+                if val_loader is not None:
+                    extra += f", Val Loss: {result['val_loss']:.6f}"
+                    extra += ''.join(f", Val {name.capitalize()}: {result['val_' + name]:.4f}" for name in metrics)
+                print(f"Epoch {epoch}/{epochs}, Loss: {result['loss']:.6f}{extra}, "
+                      f"{result['samples_per_sec']:,.0f} samples/s")
+
+            if stopper.should_stop:
+                stop_reason = 'early_stopping'
+            elif time_budget is not None and time.perf_counter() - start >= time_budget:
+                stop_reason = 'time_budget'
+            finished = stop_reason != 'max_epochs' or epoch == epochs
+            if checkpoint is not None and (finished or checkpoint.due(epoch)):
+                with phase('checkpoint'):
+                    checkpoint.save(training_state(epoch))
+            if stop_reason != 'max_epochs':
+                break
+
+    if best_state is not None:
+        model.load_state_dict(best_state)
+
+    history['best_epoch'] = stopper.best_epoch + 1
+    history['stopped_epoch'] = epoch
+    history['stop_reason'] = stop_reason
+    print(f"학습 종료: {stop_reason}, {epoch} 에폭 ({time.perf_counter() - start:.1f}s), "
+          f"최고 성능 에폭 {stopper.best_epoch + 1} 가중치로 복원 (손실 {stopper.best:.6f})")
+    return history
+
+
+def accuracy_count(pred, y):
+    """
+    분류 정확도 지표 (배치 내 정답 개수)
+    """
+    return (torch.argmax(pred, dim=1) == y).float().sum()
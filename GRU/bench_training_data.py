@@ -0,0 +1,101 @@
+"""
+generate_training_data (시퀀스별 루프) vs generate_training_data_batch (벡터화) 비교
+
+실행 (저장소 루트에서):
+    python -m GRU.bench_training_data
+    python -m GRU.bench_training_data --sizes 100000 10000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from GRU.gru_enhanced import (
+    DAMAGE_RANGE,
+    DISTANCE_CHANGE_RANGE,
+    EMOTION_LABEL_TABLE,
+    EVENT_FEATURE_SCALES,
+    SCENARIOS,
+    create_emotion_label,
+    generate_battle_sequence,
+    generate_battle_sequences_batch,
+    generate_training_data,
+    generate_training_data_batch,
+)
+
+
+def check_consistency(num_samples=20000, sequence_length=5, seed=0):
+    """
+    벡터화 결과가 기존 시퀀스 규칙을 따르는지 확인
+    - 결정적인 열(주변 적 수, 승패 결과)은 기존 루프 결과와 시나리오별로 완전히 일치
+    - current_hp는 기존 루프식 max(0.1, hp - damage / 100)을 따름
+    - 확률 열(피해, 거리 변화)은 시나리오별 범위 안에 있음
+    """
+    events, scenario_ids = generate_battle_sequences_batch(
+        num_samples, sequence_length, np.random.default_rng(seed))
+    assert events.shape == (num_samples, sequence_length, 7) and events.dtype == np.float32
+
+    np.random.seed(seed)
+    reference = {}
+    while len(reference) < len(SCENARIOS):
+        sequence, scenario = generate_battle_sequence(sequence_length)
+        reference.setdefault(scenario, sequence)
+
+    for index, scenario in enumerate(SCENARIOS):
+        rows = events[scenario_ids == index].astype(np.float64)
+        expected = reference[scenario]
+        for column in (5, 6):
+            assert np.array_equal(rows[:, :, column], np.broadcast_to(expected[:, column], rows[:, :, column].shape))
+        low, high = DAMAGE_RANGE[index] / EVENT_FEATURE_SCALES[1]
+        assert rows[:, :, 1].min() >= np.float32(low) and rows[:, :, 1].max() <= np.float32(high)
+        low, high = DISTANCE_CHANGE_RANGE[index] / EVENT_FEATURE_SCALES[4]
+        assert rows[:, :, 4].min() >= np.float32(low) and rows[:, :, 4].max() <= np.float32(high)
+        assert np.array_equal(EMOTION_LABEL_TABLE[index], create_emotion_label(scenario))
+
+    # 기존 루프식으로 hp를 다시 누적해 비교 (피해 열이 float32로 저장되므로 허용 오차 사용)
+    hp = np.ones(num_samples)
+    for step in range(sequence_length):
+        hp = np.maximum(0.1, hp - events[:, step, 1].astype(np.float64))
+        assert np.allclose(events[:, step, 0], hp, atol=1e-6)
+
+    print(f"일관성 확인: {num_samples}개 시퀀스가 기존 시나리오 규칙과 일치")
+
+
+def measure(fn, num_samples, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(num_samples)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GRU 훈련 데이터 생성 처리량 비교")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--sequence-length', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--loop-limit', type=int, default=100000,
+                        help="이 크기를 넘으면 기존 루프는 측정하지 않음")
+    args = parser.parse_args()
+
+    check_consistency(sequence_length=args.sequence_length)
+
+    rng = np.random.default_rng(0)
+    t = args.sequence_length
+    print(f"\n{'samples':>10} {'loop (s)':>10} {'batch (s)':>10} {'batch seq/s':>14} {'speedup':>8}")
+    for size in args.sizes:
+        batch_time = measure(lambda n: generate_training_data_batch(n, t, rng), size, args.repeat)
+        if size <= args.loop_limit:
+            loop_time = measure(lambda n: generate_training_data(n, t), size, args.repeat)
+            loop_text = f"{loop_time:10.4f}"
+            speedup_text = f"{loop_time / batch_time:7.1f}x"
+        else:
+            loop_text = f"{'-':>10}"
+            speedup_text = f"{'-':>8}"
+        print(f"{size:>10} {loop_text} {batch_time:10.4f} {size / batch_time:14,.0f} {speedup_text}")
+
+
+if __name__ == '__main__':
+    main()
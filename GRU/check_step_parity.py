@@ -0,0 +1,123 @@
+"""
+EmotionGRU 단일 스텝(stateful) 추론 vs 윈도우(T=5) 추론 동일성 확인
+
+확인 항목:
+1. 0 상태에서 시작하면 k번째 스텝 출력 == forward(처음 k개 이벤트) (k <= T)
+2. emotion_gru_step.onnx (h_in/h_out) == PyTorch step
+3. T개를 넘는 긴 이벤트 흐름에서 stateful 출력과 슬라이딩 윈도우 출력의 차이
+
+리셋 정책:
+  윈도우 모델은 항상 0 상태에서 최근 T개 이벤트만 봅니다. stateful 모드는 전투 시작
+  (또는 유닛 생성) 시 h를 0으로 초기화하면 처음 T개 이벤트까지는 윈도우 모델과
+  정확히 같고, 그 이후에는 T개보다 오래된 이벤트도 GRU 게이트를 통해 감쇠된 채로
+  반영합니다. 이 구간은 윈도우 모델과 정확히 같을 수 없으므로, 3번 항목에서
+  '리셋 없음'과 'T개마다 리셋' 두 정책의 차이를 비교해 Unity 쪽 정책을 정합니다.
+  기본 정책은 전투 시작 시에만 h를 초기화하는 것입니다.
+
+실행 (저장소 루트에서):
+    python -m GRU.check_step_parity
+"""
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.utils.data import TensorDataset
+
+from Common.training import fit, make_loader
+from GRU.gru_enhanced import EMOTIONS, EmotionGRU, export_step_onnx, generate_training_data_batch
+
+
+def stream(model, events, reset_interval=0):
+    """
+    (batch, steps, features) 이벤트를 한 스텝씩 넣은 출력 (batch, steps, 3)
+    reset_interval > 0이면 그 간격마다 h를 0으로 초기화
+    """
+    outputs = []
+    h = None
+    for step in range(events.shape[1]):
+        if reset_interval and step % reset_interval == 0:
+            h = None
+        emotion, h = model.step(events[:, step], h)
+        outputs.append(emotion)
+    return torch.stack(outputs, dim=1)
+
+
+def sliding_window(model, events, window):
+    """
+    각 스텝에서 최근 window개 이벤트로 forward한 출력 (Unity의 Queue 방식)
+    """
+    outputs = []
+    for step in range(events.shape[1]):
+        start = max(0, step + 1 - window)
+        outputs.append(model(events[:, start:step + 1]))
+    return torch.stack(outputs, dim=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GRU 단일 스텝 추론 동일성 확인")
+    parser.add_argument('--samples', type=int, default=2000)
+    parser.add_argument('--sequence-length', type=int, default=5)
+    parser.add_argument('--train-epochs', type=int, default=200,
+                        help="드리프트 측정을 위해 먼저 학습할 에폭 수 (0이면 무작위 가중치)")
+    parser.add_argument('--stream-windows', type=int, default=4,
+                        help="긴 흐름 테스트에서 이어 붙일 시퀀스 수")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    torch.manual_seed(args.seed)
+    rng = np.random.default_rng(args.seed)
+    t = args.sequence_length
+
+    sequences, emotions = generate_training_data_batch(args.samples, t, rng)
+    x = torch.from_numpy(sequences)
+    model = EmotionGRU(7, 32, len(EMOTIONS))
+    if args.train_epochs:
+        optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
+        loader = make_loader(TensorDataset(x, torch.from_numpy(emotions)))
+        fit(model, loader, nn.MSELoss(), optimizer, args.train_epochs, log_every=0)
+    model.eval()
+
+    with torch.no_grad():
+        # 1. 처음 T개 이벤트까지는 윈도우 모델과 동일
+        stepped = stream(model, x)
+        prefix = torch.stack([model(x[:, :k + 1]) for k in range(t)], dim=1)
+        prefix_error = (stepped - prefix).abs().max().item()
+        print(f"[1] 0 상태 시작, 처음 {t}개 이벤트: 최대 오차 {prefix_error:.2e}")
+        assert prefix_error < 1e-5, "step 출력이 윈도우 출력과 다릅니다"
+
+        # 2. ONNX 단일 스텝 모델
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            print("[2] onnxruntime 미설치: ONNX 비교 생략")
+        else:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'emotion_gru_step.onnx')
+                export_step_onnx(model, path)
+                session = ort.InferenceSession(path, providers=['CPUExecutionProvider'])
+                h = np.zeros((1, len(x), model.gru.hidden_size), dtype=np.float32)
+                onnx_error = 0.0
+                for step in range(t):
+                    emotion, h = session.run(None, {'event': sequences[:, step], 'h_in': h})
+                    onnx_error = max(onnx_error, np.abs(emotion - stepped[:, step].numpy()).max())
+            print(f"[2] ONNX(h_in/h_out) vs PyTorch step: 최대 오차 {onnx_error:.2e}")
+            assert onnx_error < 1e-5, "ONNX step 출력이 PyTorch와 다릅니다"
+
+        # 3. 긴 흐름: stateful vs 슬라이딩 윈도우
+        streams = min(64, len(x) // args.stream_windows)
+        long_events = x[:streams * args.stream_windows].reshape(streams, t * args.stream_windows, 7)
+        window = sliding_window(model, long_events, t)
+        print(f"[3] {long_events.shape[1]}개 이벤트 흐름, 슬라이딩 윈도우(T={t}) 대비 차이:")
+        for label, reset in (("리셋 없음", 0), (f"{t}개마다 리셋", t)):
+            diff = (stream(model, long_events, reset) - window).abs()
+            tail = diff[:, t:]
+            print(f"    {label:>10}: 평균 {tail.mean().item():.4f}, 최대 {tail.max().item():.4f} "
+                  f"(처음 {t}개 이후)")
+
+
+if __name__ == '__main__':
+    main()
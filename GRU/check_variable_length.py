@@ -0,0 +1,107 @@
+"""
+EmotionGRU 가변 길이(packed) 실행 확인 및 처리량 비교
+
+확인 항목:
+1. forward(x, lengths) == 시퀀스마다 앞쪽 L개 이벤트만 넣은 forward (패딩이 결과에 영향 없음)
+2. 시퀀스 길이 축이 동적인 ONNX 모델이 길이 1~T 입력을 그대로 처리
+3. 한 에폭 학습 시간: 고정 길이(T로 패딩) vs 길이별 버킷 + packed 실행
+
+실행 (저장소 루트에서):
+    python -m GRU.check_variable_length --samples 20000 --batch-size 256
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.utils.data import TensorDataset
+
+from Common.training import PaddedSequenceDataset, make_loader, train_epoch
+from GRU.gru_enhanced import EMOTIONS, EmotionGRU, export_onnx, generate_variable_length_data_batch
+
+
+def epoch_seconds(model, dataset, batch_size, epochs, seed):
+    """
+    같은 데이터로 epochs번 학습한 에폭당 평균 시간과 처리량
+    """
+    loader = make_loader(dataset, batch_size=batch_size, shuffle=True, seed=seed)
+    optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
+    train_epoch(model, loader, nn.MSELoss(), optimizer)  # 워밍업
+    start = time.perf_counter()
+    for _ in range(epochs):
+        train_epoch(model, loader, nn.MSELoss(), optimizer)
+    seconds = (time.perf_counter() - start) / epochs
+    return seconds, len(dataset) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GRU 가변 길이 실행 확인")
+    parser.add_argument('--samples', type=int, default=20000)
+    parser.add_argument('--max-length', type=int, default=5)
+    parser.add_argument('--min-length', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--epochs', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    torch.manual_seed(args.seed)
+    rng = np.random.default_rng(args.seed)
+    t = args.max_length
+    sequences, lengths, emotions = generate_variable_length_data_batch(
+        args.samples, t, args.min_length, rng)
+    x = torch.from_numpy(sequences)
+    lengths_t = torch.from_numpy(lengths)
+    model = EmotionGRU(7, 32, len(EMOTIONS)).eval()
+
+    with torch.no_grad():
+        # 1. packed 실행 == 길이별로 잘라서 실행
+        check = slice(0, min(2000, len(x)))
+        packed = model(x[check], lengths_t[check])
+        trimmed = torch.empty_like(packed)
+        for length in range(args.min_length, t + 1):
+            rows = (lengths_t[check] == length).nonzero().squeeze(1)
+            if len(rows):
+                trimmed[rows] = model(x[check][rows, :length])
+        error = (packed - trimmed).abs().max().item()
+        print(f"[1] packed vs 길이별 잘라서 실행: 최대 오차 {error:.2e}")
+        assert error < 1e-5, "packed 출력이 잘라서 실행한 출력과 다릅니다"
+
+        # 2. 동적 시퀀스 길이 ONNX
+        try:
+            from Common.quantize import create_session
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'emotion_gru.onnx')
+                export_onnx(model, t, path)
+                session = create_session(path)
+                onnx_error = 0.0
+                for length in range(1, t + 1):
+                    output = session.run(None, {'event_sequence': sequences[:4, :length]})[0]
+                    expected = model(x[:4, :length]).numpy()
+                    onnx_error = max(onnx_error, float(np.abs(output - expected).max()))
+            print(f"[2] ONNX 길이 1~{t} 입력: 최대 오차 {onnx_error:.2e}")
+            assert onnx_error < 1e-5, "ONNX 출력이 PyTorch와 다릅니다"
+        except ImportError:
+            print("[2] onnxruntime 미설치: ONNX 비교 생략")
+
+    # 3. 학습 처리량: 패딩 포함 고정 길이 vs 버킷 + packed
+    y = torch.from_numpy(emotions)
+    padded = TensorDataset(x, y)
+    bucketed = PaddedSequenceDataset(x, lengths_t, y)
+    print(f"[3] 한 에폭 학습 ({args.samples:,}개, 배치 {args.batch_size}, "
+          f"실제 이벤트 비율 {lengths.sum() / (len(lengths) * t):.0%}):")
+    results = {}
+    for label, dataset in (("고정 길이 패딩", padded), ("버킷 + packed", bucketed)):
+        torch.manual_seed(args.seed)
+        model = EmotionGRU(7, 32, len(EMOTIONS))
+        seconds, rate = epoch_seconds(model, dataset, args.batch_size, args.epochs, args.seed)
+        results[label] = seconds
+        print(f"    {label:>12}: {seconds:.3f}s/epoch, {rate:,.0f} samples/s")
+    print(f"    속도 향상: {results['고정 길이 패딩'] / results['버킷 + packed']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
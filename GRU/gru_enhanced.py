@@ -2,12 +2,26 @@
 GRU를 이용한 유닛 감정/상태 분석
 - 최근 전투 이벤트 시퀀스를 입력으로 받아 유닛의 감정 상태를 예측
 - 연속된 피해, 아군 손실 등의 시간적 패턴을 학습
+
+실행: 저장소 루트에서 python -m GRU.gru_enhanced [--batch-size 256 ...]
 """
 
+import argparse
+import os
+
 import torch
 import torch.nn as nn
-import matplotlib.pyplot as plt
+from torch.nn.utils.rnn import pack_padded_sequence
 import numpy as np
+from torch.utils.data import TensorDataset
+
+from Common.checkpoint import checkpoint_from_args
+from Common.normalization import FeatureScale, RawInputModel
+from Common.onnx_export import export_onnx_model
+from Common.dataset_cache import generate_cached
+from Common.profiling import NULL_PROFILER, Profiler
+from Common.shards import ShardedDataset
+from Common.training import PaddedSequenceDataset, add_training_arguments, build_loaders, fit
 
 # 감정 상태 정의
 # 이 값들은 유닛의 행동에 영향을 주는 modifier로 사용됩니다
@@ -17,6 +31,23 @@ EMOTIONS = {
     'CONFIDENCE': 2   # 자신감 (방어력 보너스)
 }
 
+# create_event_vector의 특성 순서와 정규화 스케일 (정규화 값 = 원본 값 / 스케일)
+EVENT_FEATURES = (
+    'hp_ratio',
+    'damage_taken',
+    'ally_died',
+    'enemy_died',
+    'distance_change',
+    'nearby_enemies',
+    'battle_outcome',
+)
+EVENT_FEATURE_SCALES = np.array([1.0, 100.0, 1.0, 1.0, 50.0, 10.0, 1.0])
+
+# 원본 전투 이벤트 레코드 (필드 순서 = EVENT_FEATURES, 모두 float32 -> 28바이트/이벤트)
+# 사망 여부는 0/1로 저장, (N, T) 배열이면 유닛별 이벤트 이력 테이블
+BATTLE_EVENT_DTYPE = np.dtype([(name, '<f4') for name in EVENT_FEATURES])
+
+
 class EmotionGRU(nn.Module):
     def __init__(self, input_size, hidden_size, output_size):
         super().__init__()
@@ -32,12 +63,68 @@ class EmotionGRU(nn.Module):
             nn.Sigmoid()  # 0~1 범위로 제한
         )
 
-    def forward(self, x):
+    def forward(self, x, lengths=None):
         # x: (batch, sequence, features)
+        # lengths: (batch,) 실제 이벤트 수 (None이면 모든 시퀀스가 x.shape[1] 길이)
+        if lengths is not None and bool((lengths < x.shape[1]).any()):
+            # 0으로 채운 뒤쪽 패딩은 계산하지 않고 시퀀스마다 실제 마지막 이벤트의 은닉 상태 사용
+            packed = pack_padded_sequence(x, lengths.cpu(), batch_first=True, enforce_sorted=False)
+            _, h = self.gru(packed)
+            return self.fc(h[-1])
         out, h = self.gru(x)
         last = out[:, -1, :]  # 마지막 타임스텝만 사용
         return self.fc(last)
 
+    def step(self, event, h_prev=None):
+        """
+        이벤트 하나만 처리하는 상태 유지(stateful) 추론
+        - event: (batch, features), h_prev: (1, batch, hidden) 또는 None(0 상태)
+        - 반환값: (감정 (batch, 3), h_next (1, batch, hidden))
+        - 0 상태에서 이벤트 e1..eT를 차례로 넣으면 forward(e1..eT)와 같은 결과
+        """
+        out, h_next = self.gru(event.unsqueeze(1), h_prev)
+        return self.fc(out[:, -1, :]), h_next
+
+
+class EmotionGRUStep(nn.Module):
+    """
+    ONNX 내보내기용 단일 스텝 래퍼 (입력: event, h_in / 출력: emotion_state, h_out)
+    - scales를 주면 event를 원본 값으로 받아 그래프 안에서 정규화
+    """
+
+    def __init__(self, model, scales=None):
+        super().__init__()
+        self.model = model
+        self.normalize = FeatureScale(scales) if scales is not None else nn.Identity()
+
+    def forward(self, event, h_in):
+        return self.model.step(self.normalize(event), h_in)
+
+
+def export_step_onnx(model, path="emotion_gru_step.onnx", raw_inputs=False):
+    """
+    은닉 상태를 입출력으로 노출한 단일 스텝 GRU를 ONNX로 내보내기
+    - event: (batch, 7), h_in/h_out: (1, batch, hidden)
+    - 이벤트마다 GRU 셀 한 스텝만 계산하므로 T개 이벤트를 매번 다시 인코딩할 필요가 없음
+    - raw_inputs=True면 EVENT_FEATURE_SCALES 정규화 층을 포함 (event에 원본 값 입력)
+    """
+    # 배치 크기 1은 트레이서가 상수로 고정할 수 있어 더미 입력은 배치 2로 사용
+    event = torch.zeros(2, model.gru.input_size)
+    h_in = torch.zeros(1, 2, model.gru.hidden_size)
+    export_onnx_model(
+        EmotionGRUStep(model, EVENT_FEATURE_SCALES if raw_inputs else None).eval(),
+        (event, h_in),
+        path,
+        input_names=["event", "h_in"],
+        output_names=["emotion_state", "h_out"],
+        dynamic_axes={
+            'event': {0: 'batch_size'},
+            'h_in': {1: 'batch_size'},
+            'emotion_state': {0: 'batch_size'},
+            'h_out': {1: 'batch_size'}
+        }
+    )
+
 
 def create_event_vector(event_data):
     """
@@ -52,15 +139,117 @@ def create_event_vector(event_data):
     - 현재 주변 적군 수 (정규화)
     - 승리/패배 전투 여부 (1: 승리, -1: 패배, 0: 진행중)
     """
-    return np.array([
-        event_data['hp_ratio'],
-        event_data['damage_taken'] / 100.0,  # 최대 100 피해 기준
-        1.0 if event_data['ally_died'] else 0.0,
-        1.0 if event_data['enemy_died'] else 0.0,
-        event_data['distance_change'] / 50.0,  # -50~50 범위
-        event_data['nearby_enemies'] / 10.0,
-        event_data['battle_outcome']  # -1, 0, 1
-    ], dtype=np.float32)
+    # 스케일은 EVENT_FEATURE_SCALES 한 곳에만 정의 (raw_ ONNX 입력 정규화와 항상 같은 값)
+    # 사망 여부(bool)는 float로 바꾸면 0/1
+    values = np.array([float(event_data[name]) for name in EVENT_FEATURES], dtype=np.float64)
+    return (values / EVENT_FEATURE_SCALES).astype(np.float32)
+
+
+def create_event_vectors(events):
+    """
+    create_event_vector의 배열 버전
+    - events: EVENT_FEATURES 이름의 필드를 가진 structured 배열(BATTLE_EVENT_DTYPE) 또는 같은 키의 열 딕셔너리
+    - 필드 shape이 (N,)이면 (N, 7), (N, T)이면 (N, T, 7) float32 반환
+    """
+    first = np.asarray(events[EVENT_FEATURES[0]])
+    vectors = np.empty(first.shape + (len(EVENT_FEATURES),), dtype=np.float32)
+    for i, name in enumerate(EVENT_FEATURES):
+        vectors[..., i] = events[name] / EVENT_FEATURE_SCALES[i]
+    return vectors
+
+
+def export_onnx(model, sequence_length=5, path="emotion_gru.onnx"):
+    """
+    정규화된 이벤트 시퀀스(event_sequence)를 입력받는 윈도우 ONNX 내보내기
+    - event_sequence: (batch, 1~T, 7), 시퀀스 길이 축도 동적이라 실제 이벤트 수만큼 입력
+    """
+    # 배치 1 더미는 축이 고정될 수 있어 배치 2로 내보냄
+    export_onnx_model(
+        model.eval(),
+        torch.zeros(2, sequence_length, model.gru.input_size),
+        path,
+        input_names=["event_sequence"],
+        output_names=["emotion_state"],
+        dynamic_axes={
+            'event_sequence': {0: 'batch_size', 1: 'sequence_length'},
+            'emotion_state': {0: 'batch_size'}
+        }
+    )
+
+
+def export_raw_onnx(model, sequence_length=5, path="emotion_gru_raw.onnx"):
+    """
+    정규화 층을 포함해 원본 이벤트 값(raw_event_sequence)을 바로 입력받는 ONNX 내보내기
+    - raw_event_sequence: (batch, 1~T, 7) EVENT_FEATURES 순서의 원본 값 (피해량 0~100, ...)
+    """
+    export_onnx_model(
+        RawInputModel(model, EVENT_FEATURE_SCALES).eval(),
+        torch.zeros(2, sequence_length, len(EVENT_FEATURES)),
+        path,
+        input_names=["raw_event_sequence"],
+        output_names=["emotion_state"],
+        dynamic_axes={
+            'raw_event_sequence': {0: 'batch_size', 1: 'sequence_length'},
+            'emotion_state': {0: 'batch_size'}
+        }
+    )
+
+
+def _matmul_linear(x, weight, bias):
+    # F.linear는 2D 입력에서 Gemm으로 내보내지는데, onnxruntime 동적 양자화는 MatMul만 int8로 바꿈
+    return torch.matmul(x, weight.t()) + bias
+
+
+class UnrolledEmotionGRU(nn.Module):
+    """
+    int8 양자화용: EmotionGRU의 GRU를 시간 축으로 펼쳐 MatMul/Add/Sigmoid/Tanh로만 계산
+    - ONNX GRU 연산자는 onnxruntime 양자화 대상이 아니라 그대로 두면 순환 가중치가 float32로 남음
+    - 같은 가중치(model.gru, model.fc)를 그대로 사용, 시퀀스 길이는 sequence_length로 고정
+    """
+
+    def __init__(self, model, sequence_length):
+        super().__init__()
+        self.gru = model.gru
+        self.fc = model.fc
+        self.sequence_length = sequence_length
+
+    def forward(self, x):
+        hidden = self.gru.hidden_size
+        # 입력 투영은 모든 타임스텝을 한 번에, 순환 투영만 스텝마다 (게이트 순서 r, z, n)
+        # split(고정 크기)은 ONNX Split 하나로 내보내짐 (chunk는 Shape/Div/Slice로 풀려 그래프가 커짐)
+        gates_x = _matmul_linear(x, self.gru.weight_ih_l0, self.gru.bias_ih_l0)
+        h = None
+        for gx in gates_x.unbind(1)[:self.sequence_length]:
+            x_r, x_z, x_n = gx.split(hidden, dim=-1)
+            if h is None:  # 초기 은닉 상태 0 -> 순환 투영은 편향만
+                h_r, h_z, h_n = self.gru.bias_hh_l0.split(hidden)
+            else:
+                h_r, h_z, h_n = _matmul_linear(h, self.gru.weight_hh_l0, self.gru.bias_hh_l0).split(hidden, dim=-1)
+            r = torch.sigmoid(x_r + h_r)
+            z = torch.sigmoid(x_z + h_z)
+            n = torch.tanh(x_n + r * h_n)
+            h = (1 - z) * n if h is None else (1 - z) * n + z * h
+        for layer in self.fc:
+            h = _matmul_linear(h, layer.weight, layer.bias) if isinstance(layer, nn.Linear) else layer(h)
+        return h
+
+
+def export_unrolled_onnx(model, sequence_length=5, path="emotion_gru_unrolled.onnx"):
+    """
+    UnrolledEmotionGRU를 ONNX로 내보내기 (Common.quantize의 int8 양자화 입력)
+    - event_sequence: (batch, T, 7), T = sequence_length 고정 (짧은 이력은 emotion_gru.onnx 사용)
+    """
+    export_onnx_model(
+        UnrolledEmotionGRU(model, sequence_length).eval(),
+        torch.zeros(2, sequence_length, model.gru.input_size),
+        path,
+        input_names=["event_sequence"],
+        output_names=["emotion_state"],
+        dynamic_axes={
+            'event_sequence': {0: 'batch_size'},
+            'emotion_state': {0: 'batch_size'}
+        }
+    )
 
 
 def generate_battle_sequence(sequence_length=5):
@@ -146,210 +335,342 @@ def generate_training_data(num_samples=2000, sequence_length=5):
     return np.array(sequences), np.array(emotions)
 
 
-# 학습 설정
-print("=" * 60)
-print("GRU 기반 유닛 감정 분석 모델 학습")
-print("=" * 60)
-
-sequence_length = 5  # 최근 5개 이벤트
-input_size = 7  # 이벤트 벡터 크기
-hidden_size = 32  # GRU hidden size
-output_size = len(EMOTIONS)  # 감정 개수
-
-# 데이터 생성
-print("\n훈련 데이터 생성 중...")
-sequences, emotions = generate_training_data(3000, sequence_length)
-
-x = torch.FloatTensor(sequences)
-y = torch.FloatTensor(emotions)
-
-print(f"시퀀스 길이: {sequence_length}")
-print(f"이벤트 특성 수: {input_size}")
-print(f"GRU Hidden Size: {hidden_size}")
-print(f"출력 감정 수: {output_size}")
-print(f"감정 종류: {list(EMOTIONS.keys())}")
-print(f"훈련 샘플 수: {len(x)}")
-print(f"입력 shape: {x.shape} (batch, sequence, features)")
-print(f"출력 shape: {y.shape} (batch, emotions)\n")
-
-# 모델 생성
-model = EmotionGRU(input_size, hidden_size, output_size)
-loss_fn = nn.MSELoss()
-optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
-
-# 학습
-losses = []
-print("학습 시작...\n")
-
-for epoch in range(1000):
-    pred = model(x)
-    loss = loss_fn(pred, y)
-    
-    optimizer.zero_grad()
-    loss.backward()
-    optimizer.step()
-    
-    losses.append(loss.item())
-    if (epoch + 1) % 100 == 0:
-        print(f"Epoch {epoch + 1}/1000, Loss: {loss.item():.6f}")
-
-# 학습 결과 시각화
-plt.figure(figsize=(12, 5))
-
-plt.subplot(1, 2, 1)
-plt.plot(losses)
-plt.xlabel('Epoch')
-plt.ylabel('Loss (MSE)')
-plt.title('Training Loss Over Time')
-plt.grid(True)
-
-# 예측 vs 실제 비교
-with torch.no_grad():
-    final_pred = model(x[:100]).numpy()
-    final_true = y[:100].numpy()
-
-plt.subplot(1, 2, 2)
-x_pos = np.arange(len(EMOTIONS))
-pred_mean = final_pred.mean(axis=0)
-true_mean = final_true.mean(axis=0)
-
-width = 0.35
-plt.bar(x_pos - width/2, true_mean, width, label='Ground Truth', alpha=0.8)
-plt.bar(x_pos + width/2, pred_mean, width, label='Predicted', alpha=0.8)
-plt.xlabel('Emotions')
-plt.ylabel('Average Value')
-plt.title('Average Emotion Values (First 100 samples)')
-plt.xticks(x_pos, EMOTIONS.keys(), rotation=45)
-plt.legend()
-plt.grid(True, axis='y')
-
-plt.tight_layout()
-plt.savefig('gru_training_results.png')
-plt.show()
-print("\n학습 완료! gru_training_results.png 파일이 생성되었습니다.")
-
-
-# 테스트 예제
-print("\n" + "=" * 60)
-print("테스트 시나리오")
-print("=" * 60)
-
-model.eval()
-
-# 테스트 시나리오 1: 연속 피격 (패배 중)
-print("\n📉 시나리오 1: 연속으로 큰 피해를 받는 상황")
-test_seq_1 = []
-hp = 1.0
-for i in range(5):
-    damage = 30 + i * 5  # 점점 증가하는 피해
-    hp = max(0.2, hp - damage / 100.0)
-    event = create_event_vector({
-        'hp_ratio': hp,
-        'damage_taken': damage,
-        'ally_died': i >= 2,
-        'enemy_died': False,
-        'distance_change': -20,  # 적이 계속 접근
-        'nearby_enemies': 6 + i,
-        'battle_outcome': 0 if i < 4 else -1
-    })
-    test_seq_1.append(event)
-    print(f"  이벤트 {i+1}: HP {hp:.2f}, 피해 {damage}, 적 접근 중, 주변 적 {6+i}명")
-
-test_tensor_1 = torch.FloatTensor(np.array(test_seq_1)).unsqueeze(0)
-with torch.no_grad():
-    emotion_1 = model(test_tensor_1)[0].numpy()
-print(f"\n  예측된 감정:")
-print(f"    공포(FEAR): {emotion_1[EMOTIONS['FEAR']]:.3f}")
-print(f"    공격성(AGGRESSION): {emotion_1[EMOTIONS['AGGRESSION']]:.3f}")
-print(f"    자신감(CONFIDENCE): {emotion_1[EMOTIONS['CONFIDENCE']]:.3f}")
-
-
-# 테스트 시나리오 2: 연속 승리 (우세)
-print("\n📈 시나리오 2: 적을 계속 격파하는 상황")
-test_seq_2 = []
-hp = 0.95
-for i in range(5):
-    damage = 5 + np.random.uniform(-3, 3)  # 작은 피해
-    hp = max(0.7, hp - damage / 100.0)
-    event = create_event_vector({
-        'hp_ratio': hp,
-        'damage_taken': damage,
-        'ally_died': False,
-        'enemy_died': True,  # 매번 적 격파
-        'distance_change': 15,  # 적들이 후퇴
-        'nearby_enemies': max(1, 5 - i),
-        'battle_outcome': 0 if i < 4 else 1
-    })
-    test_seq_2.append(event)
-    print(f"  이벤트 {i+1}: HP {hp:.2f}, 적 격파!, 적 후퇴, 주변 적 {max(1, 5-i)}명")
-
-test_tensor_2 = torch.FloatTensor(np.array(test_seq_2)).unsqueeze(0)
-with torch.no_grad():
-    emotion_2 = model(test_tensor_2)[0].numpy()
-print(f"\n  예측된 감정:")
-print(f"    공포(FEAR): {emotion_2[EMOTIONS['FEAR']]:.3f}")
-print(f"    공격성(AGGRESSION): {emotion_2[EMOTIONS['AGGRESSION']]:.3f}")
-print(f"    자신감(CONFIDENCE): {emotion_2[EMOTIONS['CONFIDENCE']]:.3f}")
-
-
-# 테스트 시나리오 3: 팽팽한 전투
-print("\n⚖️  시나리오 3: 팽팽한 교전 상황")
-test_seq_3 = []
-hp = 0.8
-for i in range(5):
-    damage = 15 + np.random.uniform(-5, 5)
-    hp = max(0.5, hp - damage / 100.0)
-    event = create_event_vector({
-        'hp_ratio': hp,
+# 생성 데이터 버전 (Common.dataset_cache 키에 포함, 이 모듈 밖의 변경으로 생성 결과가 바뀌면 올림)
+DATASET_VERSION = 1
+
+# 벡터화 생성용 시나리오 테이블 (generate_battle_sequence의 분기와 같은 값)
+SCENARIOS = ('winning', 'losing', 'even')
+DAMAGE_RANGE = np.array([[0, 15], [20, 50], [10, 30]], dtype=np.float64)
+ALLY_DEATH_PROB = np.array([0.05, 0.3, 0.15])
+ENEMY_DEATH_PROB = np.array([0.3, 0.05, 0.15])
+DISTANCE_CHANGE_RANGE = np.array([[10, 30], [-30, -10], [-15, 15]], dtype=np.float64)
+FINAL_OUTCOME = np.array([1.0, -1.0, 0.0])
+EMOTION_LABEL_TABLE = np.stack([create_emotion_label(s) for s in SCENARIOS])
+
+
+def generate_battle_sequences_batch(num_samples, sequence_length=5, rng=None):
+    """
+    generate_battle_sequence의 벡터화 버전
+    - 행마다 시나리오를 하나 뽑고 모든 타임스텝을 브로드캐스팅으로 한 번에 계산
+    - 반환값: events (N, T, 7) float32, scenario_ids (N,) int64 (SCENARIOS 인덱스)
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    n, t = num_samples, sequence_length
+
+    scenario_ids = rng.integers(0, len(SCENARIOS), n)
+    step = np.arange(t)
+
+    def uniform(ranges):
+        low = ranges[scenario_ids, 0][:, None]
+        high = ranges[scenario_ids, 1][:, None]
+        return low + (high - low) * rng.random((n, t))
+
+    damage = uniform(DAMAGE_RANGE)
+    ally_died = rng.random((n, t)) < ALLY_DEATH_PROB[scenario_ids][:, None]
+    enemy_died = rng.random((n, t)) < ENEMY_DEATH_PROB[scenario_ids][:, None]
+    distance_change = uniform(DISTANCE_CHANGE_RANGE)
+
+    # 주변 적 수: 승리 max(0, 5 - i), 패배 min(10, 3 + i), 팽팽 5
+    nearby_table = np.stack([
+        np.maximum(0, 5 - step),
+        np.minimum(10, 3 + step),
+        np.full(t, 5),
+    ])
+    nearby_enemies = nearby_table[scenario_ids]
+
+    # 마지막 이벤트에만 승패 결과 기록
+    outcome = np.zeros((n, t))
+    outcome[:, -1] = FINAL_OUTCOME[scenario_ids]
+
+    # current_hp = max(0.1, current_hp - damage / 100) 의 누적 계산
+    # 피해는 항상 0 이상이므로 한 번 0.1에 닿으면 계속 0.1에 머무름 -> 누적 차감 후 clip과 동일
+    hp_steps = np.concatenate([np.ones((n, 1)), damage / 100.0], axis=1)
+    current_hp = np.maximum(0.1, np.subtract.accumulate(hp_steps, axis=1)[:, 1:])
+
+    events = create_event_vectors({
+        'hp_ratio': current_hp,
         'damage_taken': damage,
-        'ally_died': i == 2,
-        'enemy_died': i == 3,
-        'distance_change': np.random.uniform(-10, 10),
-        'nearby_enemies': 5,
-        'battle_outcome': 0
+        'ally_died': ally_died,
+        'enemy_died': enemy_died,
+        'distance_change': distance_change,
+        'nearby_enemies': nearby_enemies,
+        'battle_outcome': outcome,
     })
-    test_seq_3.append(event)
-    died_msg = "아군 사망!" if i == 2 else ("적 격파!" if i == 3 else "교전 중")
-    print(f"  이벤트 {i+1}: HP {hp:.2f}, 피해 {damage:.1f}, {died_msg}")
-
-test_tensor_3 = torch.FloatTensor(np.array(test_seq_3)).unsqueeze(0)
-with torch.no_grad():
-    emotion_3 = model(test_tensor_3)[0].numpy()
-print(f"\n  예측된 감정:")
-print(f"    공포(FEAR): {emotion_3[EMOTIONS['FEAR']]:.3f}")
-print(f"    공격성(AGGRESSION): {emotion_3[EMOTIONS['AGGRESSION']]:.3f}")
-print(f"    자신감(CONFIDENCE): {emotion_3[EMOTIONS['CONFIDENCE']]:.3f}")
-
-
-# ONNX 변환
-print("\n" + "=" * 60)
-print("ONNX 모델 변환")
-print("=" * 60)
-
-dummy_input = torch.randn(1, sequence_length, input_size)
-
-torch.onnx.export(
-    model,
-    dummy_input,
-    "emotion_gru.onnx",
-    input_names=["event_sequence"],
-    output_names=["emotion_state"],
-    opset_version=13,
-    do_constant_folding=True,
-    dynamic_axes={
-        'event_sequence': {0: 'batch_size'},
-        'emotion_state': {0: 'batch_size'}
-    }
-)
-print("\n✅ ONNX 모델이 emotion_gru.onnx 파일로 저장되었습니다.")
+    return events, scenario_ids
+
+
+def generate_training_data_batch(num_samples=2000, sequence_length=5, rng=None, chunk_size=1_000_000):
+    """
+    generate_training_data의 벡터화 버전
+    - chunk_size 단위로 나눠 생성해 중간 배열(float64) 메모리를 제한
+    - 감정 레이블은 시나리오 인덱스로 EMOTION_LABEL_TABLE에서 조회
+    - 반환값: sequences (N, T, 7) float32, emotions (N, 3) float32
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    sequences = np.empty((num_samples, sequence_length, 7), dtype=np.float32)
+    emotions = np.empty((num_samples, len(EMOTIONS)), dtype=np.float32)
+
+    for start in range(0, num_samples, chunk_size):
+        stop = min(start + chunk_size, num_samples)
+        events, scenario_ids = generate_battle_sequences_batch(stop - start, sequence_length, rng)
+        sequences[start:stop] = events
+        emotions[start:stop] = EMOTION_LABEL_TABLE[scenario_ids]
+
+    return sequences, emotions
+
+
+def generate_variable_length_data_batch(num_samples=2000, max_length=5, min_length=1, rng=None):
+    """
+    길이가 min_length~max_length인 가변 길이 훈련 데이터 생성 (전투 초반 유닛용)
+    - max_length 길이 시퀀스를 만든 뒤 앞쪽 L개 이벤트만 남기고 나머지는 0으로 채움
+      (승패 결과는 마지막 이벤트에만 있으므로 잘린 시퀀스는 '진행 중' 전투가 됨)
+    - 감정 레이블은 시나리오 기준 그대로
+    - 반환값: sequences (N, T_max, 7) float32, lengths (N,) int64, emotions (N, 3) float32
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    sequences, emotions = generate_training_data_batch(num_samples, max_length, rng)
+    lengths = rng.integers(min_length, max_length + 1, num_samples)
+    sequences[np.arange(max_length) >= lengths[:, None]] = 0.0
+    return sequences, lengths, emotions
+
+
+def build_dataset(args, sequence_length=5):
+    """
+    학습 데이터셋 준비
+    - args.data가 있으면 기록된 게임 로그 샤드, 없으면 합성 데이터 args.samples개
+    - args.min_length < sequence_length면 가변 길이 PaddedSequenceDataset
+    - args.generator == 'sim'이면 전투 시뮬레이터(Common.battle_sim)로 생성
+    - args.cache_dir가 있으면 같은 조건으로 만든 데이터를 디스크 캐시에서 재사용
+    - 반환: (dataset, 최대 시퀀스 길이)
+    """
+    if args.data:
+        print(f"\n샤드 데이터셋 사용: {args.data}")
+        dataset = ShardedDataset(args.data, schema='event')
+        return dataset, dataset.index['sequence_length']
+    print("\n훈련 데이터 생성 중...")
+    variable_generator, fixed_generator = generate_variable_length_data_batch, generate_training_data_batch
+    if args.generator == 'sim':
+        from Common.battle_sim import simulate_training_data as fixed_generator
+        from Common.battle_sim import simulate_variable_length_data as variable_generator
+    if args.min_length < sequence_length:
+        sequences, lengths, emotions = generate_cached(
+            args, variable_generator, max_length=sequence_length, min_length=args.min_length)
+        dataset = PaddedSequenceDataset(torch.from_numpy(sequences), torch.from_numpy(lengths),
+                                        torch.from_numpy(emotions))
+    else:
+        sequences, emotions = generate_cached(args, fixed_generator, sequence_length=sequence_length)
+        dataset = TensorDataset(torch.from_numpy(sequences), torch.from_numpy(emotions))
+    return dataset, sequence_length
 
 
-# Unity Sentis 사용 예제
-print("\n" + "=" * 60)
-print("Unity Sentis 연동 가이드")
-print("=" * 60)
+def train_model(dataset, args, hidden_size=32, profiler=None):
+    """
+    EmotionGRU를 만들어 dataset으로 학습
+    - --checkpoint-dir / --resume이 있으면 주기적으로 저장하고 마지막 체크포인트에서 재개
+    - profiler(Common.profiling.Profiler)가 있으면 배치 구간별 시간 기록
+    - 반환: (CPU로 옮긴 모델, fit history)
+    """
+    # 첫 옵티마이저 생성은 torch._dynamo import(수 초)를 포함하므로 setup 구간으로 따로 기록
+    with (profiler or NULL_PROFILER).phase('setup'):
+        model = EmotionGRU(7, hidden_size, len(EMOTIONS)).to(args.device)
+        loss_fn = nn.MSELoss()
+        optimizer = torch.optim.Adam(model.parameters(), lr=args.lr)
+        train_loader, val_loader = build_loaders(dataset, args)
+        checkpoint, resume = checkpoint_from_args(args)
+    history = fit(
+        model, train_loader, loss_fn, optimizer, args.epochs,
+        device=args.device,
+        log_every=args.log_every,
+        val_loader=val_loader,
+        patience=args.patience,
+        min_delta=args.min_delta,
+        time_budget=args.time_budget,
+        checkpoint=checkpoint,
+        resume=resume,
+        profiler=profiler,
+    )
+    return model.to('cpu'), history
+
+
+def plot_history(model, history, dataset, path='gru_training_results.png', show=True):
+    """
+    학습 손실 곡선과 앞쪽 100개 샘플의 감정별 평균(예측 vs 실제)을 path에 저장
+    - matplotlib은 여기서만 import, show=False면 Agg 백엔드 (헤드리스 서버용)
+    """
+    import matplotlib
+    if not show:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
 
-unity_code = """
+    # 시각화용 앞쪽 100개 샘플 (가변 길이 데이터셋은 (x, lengths) 튜플)
+    x, y = dataset[list(range(min(100, len(dataset))))]
+    x = x if isinstance(x, tuple) else (x,)
+
+    fig = plt.figure(figsize=(12, 5))
+
+    plt.subplot(1, 2, 1)
+    plt.plot(history['loss'], label='Train')
+    if 'val_loss' in history:
+        plt.plot(history['val_loss'], label='Validation')
+        plt.legend()
+    plt.xlabel('Epoch')
+    plt.ylabel('Loss (MSE)')
+    plt.title('Training Loss Over Time')
+    plt.grid(True)
+
+    # 예측 vs 실제 비교
+    model.eval()
+    with torch.no_grad():
+        final_pred = model(*x).numpy()
+        final_true = y.numpy()
+
+    plt.subplot(1, 2, 2)
+    x_pos = np.arange(len(EMOTIONS))
+    pred_mean = final_pred.mean(axis=0)
+    true_mean = final_true.mean(axis=0)
+
+    width = 0.35
+    plt.bar(x_pos - width/2, true_mean, width, label='Ground Truth', alpha=0.8)
+    plt.bar(x_pos + width/2, pred_mean, width, label='Predicted', alpha=0.8)
+    plt.xlabel('Emotions')
+    plt.ylabel('Average Value')
+    plt.title('Average Emotion Values (First 100 samples)')
+    plt.xticks(x_pos, EMOTIONS.keys(), rotation=45)
+    plt.legend()
+    plt.grid(True, axis='y')
+
+    plt.tight_layout()
+    plt.savefig(path)
+    if show:
+        plt.show()
+    plt.close(fig)
+
+
+def print_test_scenarios(model):
+    """
+    손으로 만든 전투 시나리오 4개에 대한 감정 예측 출력
+    """
+    print("\n" + "=" * 60)
+    print("테스트 시나리오")
+    print("=" * 60)
+
+    model.eval()
+
+    # 테스트 시나리오 1: 연속 피격 (패배 중)
+    print("\n📉 시나리오 1: 연속으로 큰 피해를 받는 상황")
+    test_seq_1 = []
+    hp = 1.0
+    for i in range(5):
+        damage = 30 + i * 5  # 점점 증가하는 피해
+        hp = max(0.2, hp - damage / 100.0)
+        event = create_event_vector({
+            'hp_ratio': hp,
+            'damage_taken': damage,
+            'ally_died': i >= 2,
+            'enemy_died': False,
+            'distance_change': -20,  # 적이 계속 접근
+            'nearby_enemies': 6 + i,
+            'battle_outcome': 0 if i < 4 else -1
+        })
+        test_seq_1.append(event)
+        print(f"  이벤트 {i+1}: HP {hp:.2f}, 피해 {damage}, 적 접근 중, 주변 적 {6+i}명")
+
+    test_tensor_1 = torch.FloatTensor(np.array(test_seq_1)).unsqueeze(0)
+    with torch.no_grad():
+        emotion_1 = model(test_tensor_1)[0].numpy()
+    print(f"\n  예측된 감정:")
+    print(f"    공포(FEAR): {emotion_1[EMOTIONS['FEAR']]:.3f}")
+    print(f"    공격성(AGGRESSION): {emotion_1[EMOTIONS['AGGRESSION']]:.3f}")
+    print(f"    자신감(CONFIDENCE): {emotion_1[EMOTIONS['CONFIDENCE']]:.3f}")
+
+
+    # 테스트 시나리오 2: 연속 승리 (우세)
+    print("\n📈 시나리오 2: 적을 계속 격파하는 상황")
+    test_seq_2 = []
+    hp = 0.95
+    for i in range(5):
+        damage = 5 + np.random.uniform(-3, 3)  # 작은 피해
+        hp = max(0.7, hp - damage / 100.0)
+        event = create_event_vector({
+            'hp_ratio': hp,
+            'damage_taken': damage,
+            'ally_died': False,
+            'enemy_died': True,  # 매번 적 격파
+            'distance_change': 15,  # 적들이 후퇴
+            'nearby_enemies': max(1, 5 - i),
+            'battle_outcome': 0 if i < 4 else 1
+        })
+        test_seq_2.append(event)
+        print(f"  이벤트 {i+1}: HP {hp:.2f}, 적 격파!, 적 후퇴, 주변 적 {max(1, 5-i)}명")
+
+    test_tensor_2 = torch.FloatTensor(np.array(test_seq_2)).unsqueeze(0)
+    with torch.no_grad():
+        emotion_2 = model(test_tensor_2)[0].numpy()
+    print(f"\n  예측된 감정:")
+    print(f"    공포(FEAR): {emotion_2[EMOTIONS['FEAR']]:.3f}")
+    print(f"    공격성(AGGRESSION): {emotion_2[EMOTIONS['AGGRESSION']]:.3f}")
+    print(f"    자신감(CONFIDENCE): {emotion_2[EMOTIONS['CONFIDENCE']]:.3f}")
+
+
+    # 테스트 시나리오 3: 팽팽한 전투
+    print("\n⚖️  시나리오 3: 팽팽한 교전 상황")
+    test_seq_3 = []
+    hp = 0.8
+    for i in range(5):
+        damage = 15 + np.random.uniform(-5, 5)
+        hp = max(0.5, hp - damage / 100.0)
+        event = create_event_vector({
+            'hp_ratio': hp,
+            'damage_taken': damage,
+            'ally_died': i == 2,
+            'enemy_died': i == 3,
+            'distance_change': np.random.uniform(-10, 10),
+            'nearby_enemies': 5,
+            'battle_outcome': 0
+        })
+        test_seq_3.append(event)
+        died_msg = "아군 사망!" if i == 2 else ("적 격파!" if i == 3 else "교전 중")
+        print(f"  이벤트 {i+1}: HP {hp:.2f}, 피해 {damage:.1f}, {died_msg}")
+
+    test_tensor_3 = torch.FloatTensor(np.array(test_seq_3)).unsqueeze(0)
+    with torch.no_grad():
+        emotion_3 = model(test_tensor_3)[0].numpy()
+    print(f"\n  예측된 감정:")
+    print(f"    공포(FEAR): {emotion_3[EMOTIONS['FEAR']]:.3f}")
+    print(f"    공격성(AGGRESSION): {emotion_3[EMOTIONS['AGGRESSION']]:.3f}")
+    print(f"    자신감(CONFIDENCE): {emotion_3[EMOTIONS['CONFIDENCE']]:.3f}")
+
+
+    # 테스트 시나리오 4: 전투 초반 (이벤트 2개뿐)
+    print("\n🕐 시나리오 4: 시나리오 1의 처음 2개 이벤트만 있는 전투 초반")
+    with torch.no_grad():
+        emotion_4 = model(test_tensor_1[:, :2])[0].numpy()
+    print(f"\n  예측된 감정:")
+    print(f"    공포(FEAR): {emotion_4[EMOTIONS['FEAR']]:.3f}")
+    print(f"    공격성(AGGRESSION): {emotion_4[EMOTIONS['AGGRESSION']]:.3f}")
+    print(f"    자신감(CONFIDENCE): {emotion_4[EMOTIONS['CONFIDENCE']]:.3f}")
+
+
+def export_models(model, sequence_length=5, output_dir='.'):
+    """
+    학습된 모델을 output_dir에 저장
+    - emotion_gru.onnx / emotion_gru_raw.onnx (시퀀스 입력), emotion_gru.pt (가중치)
+    - emotion_gru_step.onnx / emotion_gru_step_raw.onnx (단일 스텝 h_in/h_out)
+    - 반환: 저장한 파일 경로 리스트
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = [os.path.join(output_dir, name) for name in (
+        'emotion_gru.onnx', 'emotion_gru.pt', 'emotion_gru_step.onnx',
+        'emotion_gru_raw.onnx', 'emotion_gru_step_raw.onnx')]
+    export_onnx(model, sequence_length, paths[0])
+    torch.save(model.state_dict(), paths[1])
+    export_step_onnx(model, paths[2])
+    export_raw_onnx(model, sequence_length, paths[3])
+    export_step_onnx(model, paths[4], raw_inputs=True)
+    return paths
+
+
+UNITY_CSHARP_EXAMPLE = """
 // ==========================================
 // Unity C# 코드 예제
 // ==========================================
@@ -360,7 +681,7 @@ using System.Collections.Generic;
 
 public class UnitEmotionController : MonoBehaviour
 {
-    [SerializeField] private ModelAsset emotionModelAsset;
+    [SerializeField] private ModelAsset emotionModelAsset;  // emotion_gru_raw.onnx (정규화 층 포함)
     
     private Model model;
     private IWorker worker;
@@ -410,9 +731,10 @@ public class UnitEmotionController : MonoBehaviour
     // 감정 상태 예측
     public EmotionState PredictEmotion()
     {
-        if (eventHistory.Count < SEQUENCE_LENGTH)
+        int length = eventHistory.Count;  // 1~5개 (시퀀스 길이 축이 동적인 모델, 짧은 이력은 --min-length 1로 학습한 모델 필요)
+        if (length == 0)
         {
-            // 이벤트가 충분하지 않으면 중립 상태 반환
+            // 이벤트가 없으면 중립 상태 반환
             return new EmotionState 
             { 
                 Fear = 0.5f, 
@@ -421,24 +743,24 @@ public class UnitEmotionController : MonoBehaviour
             };
         }
         
-        // 1. 시퀀스 데이터를 1D 배열로 변환
-        float[] sequenceData = new float[SEQUENCE_LENGTH * EVENT_FEATURES];
+        // 1. 시퀀스 데이터를 1D 배열로 변환 (원본 값, 정규화는 모델 그래프 안에서 수행)
+        float[] sequenceData = new float[length * EVENT_FEATURES];
         int index = 0;
         
         foreach (var evt in eventHistory)
         {
             sequenceData[index++] = evt.hpRatio;
-            sequenceData[index++] = evt.damageTaken / 100f;
+            sequenceData[index++] = evt.damageTaken;
             sequenceData[index++] = evt.allyDied ? 1f : 0f;
             sequenceData[index++] = evt.enemyDied ? 1f : 0f;
-            sequenceData[index++] = evt.distanceChange / 50f;
-            sequenceData[index++] = evt.nearbyEnemies / 10f;
+            sequenceData[index++] = evt.distanceChange;
+            sequenceData[index++] = evt.nearbyEnemies;
             sequenceData[index++] = evt.battleOutcome;
         }
         
-        // 2. 텐서 생성 (1, 5, 7) - batch=1, sequence=5, features=7
+        // 2. 텐서 생성 (1, length, 7) - batch=1, sequence=실제 이벤트 수, features=7
         TensorFloat input = new TensorFloat(
-            new TensorShape(1, SEQUENCE_LENGTH, EVENT_FEATURES),
+            new TensorShape(1, length, EVENT_FEATURES),
             sequenceData
         );
         
@@ -489,6 +811,81 @@ public class UnitEmotionController : MonoBehaviour
     }
 }
 
+// ==========================================
+// 단일 스텝(stateful) 버전: emotion_gru_step.onnx
+// 이벤트마다 GRU 셀 한 스텝만 실행하고 은닉 상태를 유닛이 보관
+// ==========================================
+
+public class UnitEmotionStepController : MonoBehaviour
+{
+    [SerializeField] private ModelAsset emotionStepModelAsset;  // emotion_gru_step_raw.onnx
+    
+    private const int HIDDEN_SIZE = 32;
+    private const int EVENT_FEATURES = 7;
+    
+    private Model model;
+    private IWorker worker;
+    private float[] hiddenState = new float[HIDDEN_SIZE];  // h_in/h_out (1, 1, 32)
+    
+    public UnitEmotionController.EmotionState Current { get; private set; }
+    
+    void Awake()
+    {
+        model = ModelLoader.Load(emotionStepModelAsset);
+        worker = WorkerFactory.CreateWorker(BackendType.CPU, model);
+    }
+    
+    // 전투 시작(또는 유닛 생성) 시 은닉 상태 초기화
+    public void ResetState()
+    {
+        System.Array.Clear(hiddenState, 0, HIDDEN_SIZE);
+    }
+    
+    // 이벤트가 들어올 때마다 한 스텝 실행 -> 첫 이벤트부터 바로 감정 예측 가능
+    public UnitEmotionController.EmotionState RecordEvent(UnitEmotionController.BattleEvent evt)
+    {
+        // 원본 값 (정규화는 모델 그래프 안에서 수행)
+        float[] eventData = new float[EVENT_FEATURES]
+        {
+            evt.hpRatio,
+            evt.damageTaken,
+            evt.allyDied ? 1f : 0f,
+            evt.enemyDied ? 1f : 0f,
+            evt.distanceChange,
+            evt.nearbyEnemies,
+            evt.battleOutcome
+        };
+        
+        using var eventTensor = new TensorFloat(new TensorShape(1, EVENT_FEATURES), eventData);
+        using var hiddenTensor = new TensorFloat(new TensorShape(1, 1, HIDDEN_SIZE), hiddenState);
+        
+        worker.Execute(new Dictionary<string, Tensor>
+        {
+            { "event", eventTensor },
+            { "h_in", hiddenTensor }
+        });
+        
+        var emotion = worker.PeekOutput("emotion_state") as TensorFloat;
+        var hOut = worker.PeekOutput("h_out") as TensorFloat;
+        emotion.MakeReadable();
+        hOut.MakeReadable();
+        
+        hOut.ToReadOnlyArray().CopyTo(hiddenState, 0);
+        Current = new UnitEmotionController.EmotionState
+        {
+            Fear = emotion[0],
+            Aggression = emotion[1],
+            Confidence = emotion[2]
+        };
+        return Current;
+    }
+    
+    void OnDestroy()
+    {
+        worker?.Dispose();
+    }
+}
+
 // ==========================================
 // 사용 예제
 // ==========================================
@@ -536,5 +933,93 @@ public class UnitCombatManager : MonoBehaviour
 }
 """
 
-print(unity_code)
-print("\n" + "=" * 60)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="EmotionGRU 감정 분석 모델 학습")
+    add_training_arguments(parser, epochs=1000, samples=3000)
+    parser.add_argument('--min-length', type=int, default=5,
+                        help="합성 시퀀스 최소 이벤트 수 (기본 5: 기존 고정 길이, 1이면 1~5 가변 길이로 학습)")
+    group = parser.add_argument_group('출력')
+    group.add_argument('--output-dir', default='.', help="ONNX/가중치/그래프 저장 디렉터리")
+    group.add_argument('--headless', action='store_true',
+                       help="창을 띄우지 않고 Unity 예제 코드도 출력하지 않음 (배치 서버용)")
+    group.add_argument('--no-plot', action='store_true', help="학습 결과 그래프 생략 (matplotlib 불필요)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.seed is not None:
+        torch.manual_seed(args.seed)
+    profiler = Profiler(enabled=bool(args.profile or args.torch_trace), trace_path=args.torch_trace)
+
+    # 학습 설정
+    print("=" * 60)
+    print("GRU 기반 유닛 감정 분석 모델 학습")
+    print("=" * 60)
+
+    hidden_size = 32  # GRU hidden size
+
+    # 데이터 생성 (또는 기록된 게임 로그 샤드 사용), 최근 5개 이벤트 (최대 길이)
+    with profiler.phase('data_generation'):
+        dataset, sequence_length = build_dataset(args, sequence_length=5)
+
+    if isinstance(dataset, PaddedSequenceDataset):
+        print(f"시퀀스 길이: {args.min_length}~{sequence_length} (가변, 길이별 버킷 배치)")
+    else:
+        print(f"시퀀스 길이: {sequence_length}")
+    print("이벤트 특성 수: 7")
+    print(f"GRU Hidden Size: {hidden_size}")
+    print(f"출력 감정 수: {len(EMOTIONS)}")
+    print(f"감정 종류: {list(EMOTIONS.keys())}")
+    print(f"훈련 샘플 수: {len(dataset)}")
+    print(f"배치 크기: {args.batch_size or '전체'}")
+    print(f"입력 shape: {(len(dataset), sequence_length, 7)} (batch, sequence, features)")
+    print(f"출력 shape: {(len(dataset), len(EMOTIONS))} (batch, emotions)\n")
+
+    # 학습
+    print("학습 시작...\n")
+    with profiler.phase('training'):
+        model, history = train_model(dataset, args, hidden_size, profiler)
+
+    # 학습 결과 시각화
+    if not args.no_plot:
+        plot_path = os.path.join(args.output_dir, 'gru_training_results.png')
+        os.makedirs(args.output_dir, exist_ok=True)
+        with profiler.phase('plot'):
+            plot_history(model, history, dataset, plot_path, show=not args.headless)
+        print(f"\n학습 완료! {plot_path} 파일이 생성되었습니다.")
+
+    with profiler.phase('inference'):
+        print_test_scenarios(model)
+
+    # ONNX 변환
+    print("\n" + "=" * 60)
+    print("ONNX 모델 변환")
+    print("=" * 60)
+
+    with profiler.phase('export'):
+        onnx_path, weights_path, step_path, raw_path, step_raw_path = export_models(
+            model, sequence_length, args.output_dir)
+    print(f"\n✅ ONNX 모델이 {onnx_path} 파일로 저장되었습니다.")
+    print(f"✅ PyTorch 가중치가 {weights_path} 파일로 저장되었습니다.")
+    print(f"✅ 단일 스텝(h_in/h_out) 모델이 {step_path} 파일로 저장되었습니다.")
+    print(f"✅ 정규화 층을 포함한 원본 값 입력 모델이 {raw_path} / "
+          f"{step_raw_path} 파일로 저장되었습니다.")
+
+    # Unity Sentis 사용 예제
+    if not args.headless:
+        print("\n" + "=" * 60)
+        print("Unity Sentis 연동 가이드")
+        print("=" * 60)
+        print(UNITY_CSHARP_EXAMPLE)
+        print("\n" + "=" * 60)
+
+    if args.profile:
+        profiler.print_summary()
+        print("프로파일 저장: " + ", ".join(profiler.save(args.profile)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+UnitMLP 다중 유닛 배치 추론
+
+Unity의 UnitAIController.DecideAction은 유닛마다 (1, 11) 추론을 한 번씩 실행합니다.
+유닛이 수백 개가 되면 실제 계산보다 호출 오버헤드가 커지므로, 한 틱 동안 들어온
+요청을 미리 할당한 (N, 11) 버퍼에 모아 한 번에 추론하고 유닛 ID별로 결과를 돌려줍니다.
+
+사용 예:
+    engine = BatchedActionEngine(model, max_units=1024)
+    for unit_id, state in units:
+        engine.submit(unit_id, state)   # create_state_vector 결과
+    actions = engine.flush()            # {unit_id: action}
+"""
+
+import numpy as np
+import torch
+
+from MLP.mlp import generate_sample_data_batch
+
+STATE_SIZE = 11  # create_state_vector의 특성 개수
+
+
+class BatchedActionEngine:
+    """
+    틱 단위 요청 병합(coalescing) 추론 엔진
+    - submit/submit_batch로 상태 벡터를 버퍼에 쌓고 flush에서 한 번만 forward
+    - 버퍼는 torch 텐서와 numpy 뷰가 메모리를 공유하므로 복사 없이 모델 입력이 됨
+    - 한 틱의 유닛 수가 max_units를 넘으면 버퍼를 두 배로 늘림
+    """
+
+    def __init__(self, model, max_units=1024):
+        self.model = model.eval()
+        self._count = 0
+        self._allocate(max_units)
+
+    def _allocate(self, capacity):
+        buffer = torch.zeros(capacity, STATE_SIZE)
+        unit_ids = np.zeros(capacity, dtype=np.int64)
+        if self._count:
+            buffer[:self._count] = self._buffer[:self._count]
+            unit_ids[:self._count] = self._unit_ids[:self._count]
+        self._buffer = buffer
+        self._states = buffer.numpy()  # 같은 메모리를 가리키는 numpy 뷰
+        self._unit_ids = unit_ids
+
+    @property
+    def capacity(self):
+        return len(self._unit_ids)
+
+    def __len__(self):
+        return self._count
+
+    def submit(self, unit_id, state_vector):
+        """
+        유닛 하나의 상태 벡터 (11,) 등록
+        """
+        if self._count == self.capacity:
+            self._allocate(self.capacity * 2)
+        self._states[self._count] = state_vector
+        self._unit_ids[self._count] = unit_id
+        self._count += 1
+
+    def submit_batch(self, unit_ids, state_vectors):
+        """
+        여러 유닛의 상태 벡터 (n, 11)를 한 번에 등록
+        """
+        n = len(unit_ids)
+        while self._count + n > self.capacity:
+            self._allocate(self.capacity * 2)
+        self._states[self._count:self._count + n] = state_vectors
+        self._unit_ids[self._count:self._count + n] = unit_ids
+        self._count += n
+
+    def run(self):
+        """
+        쌓인 요청을 한 번에 추론하고 버퍼를 비움
+        반환값: (unit_ids (n,), actions (n,)) 배열
+        """
+        n = self._count
+        self._count = 0
+        if n == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        with torch.inference_mode():
+            actions = torch.argmax(self.model(self._buffer[:n]), dim=1).numpy()
+        return self._unit_ids[:n].copy(), actions
+
+    def flush(self, out=None):
+        """
+        run() 결과를 유닛 ID별로 분배
+        - out이 없으면 {unit_id: action} 딕셔너리 반환
+        - out 배열(유닛 ID로 인덱싱)을 주면 out[unit_id] = action으로 채워서 반환
+        """
+        unit_ids, actions = self.run()
+        if out is not None:
+            out[unit_ids] = actions
+            return out
+        return dict(zip(unit_ids.tolist(), actions.tolist()))
+
+
+class SimulatedBattlefield:
+    """
+    게임 루프 대역(stand-in)
+    - 유닛 N개의 원본 상태를 열 배열로 들고 있다가 틱마다 조금씩 변화시킴
+    - state_vector(i)는 DecideAction처럼 유닛 하나의 벡터, state_vectors()는 전체 (N, 11)
+    """
+
+    def __init__(self, num_units, rng=None):
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.unit_ids = np.arange(num_units, dtype=np.int64)
+        self.states, _ = generate_sample_data_batch(num_units, self.rng)
+
+    def tick(self):
+        # HP 감소, 적과의 거리/위치 변화 (정규화된 값 기준)
+        n = len(self.unit_ids)
+        self.states[:, 0] = np.clip(self.states[:, 0] - self.rng.uniform(0, 0.02, n), 0.1, 1.0)
+        self.states[:, 3] = np.clip(self.states[:, 3] + self.rng.normal(0, 0.02, n), 0.05, 1.0)
+        self.states[:, 8:10] = np.clip(self.states[:, 8:10] + self.rng.normal(0, 0.01, (n, 2)), 0, 1)
+
+    def state_vector(self, index):
+        return self.states[index]
+
+    def state_vectors(self):
+        return self.states
+
+
+def decide_per_unit(model, field):
+    """
+    기존 방식: 유닛마다 (1, 11) 추론 (UnitAIController.DecideAction과 동일한 호출 패턴)
+    - 반환값: field.unit_ids 순서의 행동 배열 (유닛 ID가 0~N-1이 아니어도 됨)
+    """
+    actions = np.empty(len(field.unit_ids), dtype=np.int64)
+    with torch.inference_mode():
+        for i in range(len(field.unit_ids)):
+            state = torch.from_numpy(field.state_vector(i)).unsqueeze(0)
+            actions[i] = torch.argmax(model(state), dim=1).item()
+    return actions
+
+
+def decide_batched(engine, field, out):
+    """
+    병합 방식: 유닛마다 submit 후 틱 끝에서 한 번에 추론
+    """
+    for i, unit_id in enumerate(field.unit_ids):
+        engine.submit(unit_id, field.state_vector(i))
+    return engine.flush(out)
+
+
+def decide_batched_columns(engine, field, out):
+    """
+    병합 방식 + 게임 쪽에서 상태를 이미 (N, 11) 배열로 갖고 있는 경우
+    """
+    engine.submit_batch(field.unit_ids, field.state_vectors())
+    return engine.flush(out)
+
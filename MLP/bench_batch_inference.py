@@ -0,0 +1,70 @@
+"""
+유닛별 추론 vs 틱 단위 배치 추론 지연 시간/처리량 비교
+
+실행 (저장소 루트에서):
+    python -m MLP.bench_batch_inference
+    python -m MLP.bench_batch_inference --units 1 10 100 1000 10000 --threads 1
+"""
+
+import argparse
+
+import numpy as np
+import torch
+
+from Common.benchmarking import measure_latency
+from MLP.batch_inference import (
+    BatchedActionEngine,
+    SimulatedBattlefield,
+    decide_batched,
+    decide_batched_columns,
+    decide_per_unit,
+)
+from MLP.mlp import ACTIONS, UnitMLP
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UnitMLP 배치 추론 벤치마크")
+    parser.add_argument('--units', type=int, nargs='+', default=[1, 10, 100, 1000, 10000])
+    parser.add_argument('--threads', type=int, default=1, help="torch intra-op 스레드 수")
+    parser.add_argument('--repeat', type=int, default=20, help="틱 반복 횟수")
+    parser.add_argument('--per-unit-limit', type=int, default=10000,
+                        help="이 유닛 수를 넘으면 유닛별 추론은 측정하지 않음")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    torch.manual_seed(args.seed)
+    model = UnitMLP(11, len(ACTIONS)).eval()
+
+    print(f"torch 스레드: {torch.get_num_threads()}")
+    print(f"{'units':>6} {'mode':>16} {'p50 ms/tick':>12} {'p99 ms/tick':>12} {'units/s':>14} {'speedup':>8}")
+    for num_units in args.units:
+        field = SimulatedBattlefield(num_units, np.random.default_rng(args.seed))
+        engine = BatchedActionEngine(model, max_units=num_units)
+        out = np.empty(num_units, dtype=np.int64)
+
+        # 결과 동일성 확인 (decide_per_unit은 field.unit_ids 순서, out은 유닛 ID로 인덱싱)
+        expected = decide_per_unit(model, field)
+        assert np.array_equal(decide_batched(engine, field, out.copy())[field.unit_ids], expected)
+        assert np.array_equal(decide_batched_columns(engine, field, out.copy())[field.unit_ids], expected)
+
+        modes = {
+            'batched(submit)': lambda: decide_batched(engine, field, out),
+            'batched(columns)': lambda: decide_batched_columns(engine, field, out),
+        }
+        if num_units <= args.per_unit_limit:
+            modes = {'per-unit': lambda: decide_per_unit(model, field), **modes}
+
+        baseline = None
+        for name, fn in modes.items():
+            repeat = max(3, min(args.repeat, 2000 // max(1, num_units // 10)))
+            # 틱 진행(시뮬레이션)은 측정 밖에서 하고 추론 호출만 측정
+            stats = measure_latency(fn, repeat=repeat, warmup=2, setup=field.tick)
+            units_per_sec = num_units / (stats['p50_ms'] / 1000.0)
+            baseline = baseline or stats['p50_ms']
+            print(f"{num_units:>6} {name:>16} {stats['p50_ms']:12.3f} {stats['p99_ms']:12.3f} "
+                  f"{units_per_sec:14,.0f} {baseline / stats['p50_ms']:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+DecisionCache 정확도 / 처리량 벤치마크
+
+워크로드: 분대(squad) 단위로 움직이는 전장
+- 분대원은 분대 기준 상태에 작은 개인 차이(jitter)만 있는 거의 같은 상태
+- 일부 유닛은 후방 대기 (HP 가득, 주변 적 없음, 적이 멂)
+- 틱마다 분대 기준 상태가 조금씩 변함 (SimulatedBattlefield.tick)
+
+측정 (해상도별):
+- 정확도: 캐시 결과 행동 vs 캐시 없이 정확한 상태로 추론한 행동 일치율, 확률 최대 오차
+- 적중률과 틱당 지연 시간: 유닛별 호출(DecideAction 패턴) / 틱 배치 호출, 캐시 유무
+
+실행 (저장소 루트에서):
+    python -m MLP.bench_decision_cache
+    python -m MLP.bench_decision_cache --units 2000 --squad-size 10 --resolution 10 20 40 --weights unit_action_mlp.pt
+"""
+
+import argparse
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.utils.data import TensorDataset
+
+from Common.benchmarking import measure_latency
+from Common.models import load_model
+from Common.training import accuracy_count, fit, make_loader
+from MLP.batch_inference import SimulatedBattlefield
+from MLP.decision_cache import DEFAULT_RESOLUTION, DecisionCache
+from MLP.mlp import ACTIONS, UnitMLP, generate_sample_data_batch
+
+
+class SquadBattlefield:
+    """
+    분대 단위 전장 (유닛 상태 = 분대 기준 상태 + 고정된 개인 차이)
+    """
+
+    def __init__(self, num_units, squad_size=8, jitter=0.005, idle_fraction=0.3, rng=None):
+        self.rng = np.random.default_rng() if rng is None else rng
+        num_idle = int(num_units * idle_fraction)
+        num_active = num_units - num_idle
+        self.squads = SimulatedBattlefield(max(1, -(-num_active // squad_size)), self.rng)
+        self.squad_of = np.arange(num_active) // squad_size
+        self.jitter = self.rng.normal(0, jitter, (num_active, 11)).astype(np.float32)
+        self.jitter[:, 4:6] = 0.0  # 주변 유닛 수는 정수 개수라 개인 차이 없음
+
+        # 후방 대기 유닛: HP 가득, 주변 적 없음, 적이 멂 (공격력/방어력/위치만 조금씩 다름)
+        idle, _ = generate_sample_data_batch(num_idle, self.rng)
+        idle[:, [0, 3, 5, 6, 7]] = [1.0, 1.0, 0.0, 1.0, 0.0]
+        idle[:, 1:3] = np.round(idle[:, 1:3], 1)
+        idle[:, 8:10] = np.round(idle[:, 8:10], 1)
+        self.idle = idle
+        self.states = np.empty((num_units, 11), dtype=np.float32)
+        self._update()
+
+    def _update(self):
+        active = len(self.squad_of)
+        self.states[:active] = np.clip(self.squads.states[self.squad_of] + self.jitter, 0.0, None)
+        self.states[active:] = self.idle
+
+    def tick(self):
+        self.squads.tick()
+        self._update()
+
+
+def train_model(seed, epochs):
+    model = UnitMLP(11, len(ACTIONS))
+    states, actions = generate_sample_data_batch(5000, np.random.default_rng(seed))
+    loader = make_loader(TensorDataset(torch.from_numpy(states), torch.from_numpy(actions)),
+                         batch_size=256, shuffle=True, seed=seed)
+    fit(model, loader, nn.CrossEntropyLoss(), torch.optim.Adam(model.parameters(), lr=0.003), epochs,
+        metrics={'accuracy': accuracy_count}, log_every=0)
+    return model.eval()
+
+
+def per_unit(model, states, out):
+    with torch.inference_mode():
+        for i in range(len(states)):
+            out[i] = torch.argmax(model(torch.from_numpy(states[i]).unsqueeze(0)), dim=1).item()
+    return out
+
+
+def per_unit_cached(cache, states, out):
+    for i in range(len(states)):
+        out[i] = cache.decide(states[i])[0]
+    return out
+
+
+def batched(model, states):
+    with torch.inference_mode():
+        return torch.argmax(model(torch.from_numpy(states)), dim=1).numpy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DecisionCache 정확도/처리량 벤치마크")
+    parser.add_argument('--units', type=int, default=2000)
+    parser.add_argument('--squad-size', type=int, default=8)
+    parser.add_argument('--jitter', type=float, default=0.005, help="분대원 개인 차이 표준편차 (정규화 값)")
+    parser.add_argument('--idle-fraction', type=float, default=0.3)
+    parser.add_argument('--resolution', type=float, nargs='+', default=[0, 10, 40],
+                        help="격자 칸 수 (0이면 DEFAULT_RESOLUTION)")
+    parser.add_argument('--capacity', type=int, default=4096)
+    parser.add_argument('--ticks', type=int, default=50, help="정확도/적중률 측정 틱 수")
+    parser.add_argument('--repeat', type=int, default=20, help="지연 시간 측정 틱 수")
+    parser.add_argument('--weights', help="UnitMLP state_dict (.pt, 없으면 짧게 학습)")
+    parser.add_argument('--train-epochs', type=int, default=100)
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    torch.manual_seed(args.seed)
+    if args.weights:
+        model = load_model('mlp', args.weights)
+    else:
+        model = train_model(args.seed, args.train_epochs)
+
+    print(f"유닛 {args.units:,}명, 분대 {args.squad_size}명, 대기 비율 {args.idle_fraction:.0%}, "
+          f"캐시 용량 {args.capacity:,}, torch 스레드 {torch.get_num_threads()}\n")
+    print(f"{'resolution':>10} {'agree':>8} {'max |dp|':>9} {'hit rate':>9} {'evict':>7} "
+          f"{'unit ms':>9} {'unit+cache':>11} {'batch ms':>9} {'batch+cache':>12}")
+
+    out = np.empty(args.units, dtype=np.int64)
+    for value in args.resolution:
+        resolution = DEFAULT_RESOLUTION if value == 0 else value
+        field = SquadBattlefield(args.units, args.squad_size, args.jitter, args.idle_fraction,
+                                 np.random.default_rng(args.seed))
+        cache = DecisionCache(model, resolution, args.capacity)
+
+        # 캐시 자체는 값을 바꾸지 않음: 작은 캐시(잦은 제거)에서도 격자 중심 값 직접 추론과 동일
+        small = DecisionCache(model, resolution, capacity=max(1, args.units // 10))
+        for _ in range(3):
+            actions, probabilities = small.decide_batch(field.states)
+            with torch.inference_mode():
+                centers = torch.from_numpy(small.quantize(field.states) / small.resolution)
+                expected = torch.softmax(model(centers), dim=1).numpy()
+            assert np.abs(probabilities - expected).max() < 1e-6, "캐시 결과가 격자 중심 추론과 다릅니다"
+            assert all(small.decide(field.states[i])[0] == actions[i] for i in range(0, args.units, 17))
+            field.tick()
+
+        # 정확도와 적중률: 캐시 없는 정확한 상태 추론과 틱마다 비교
+        agree = 0
+        max_error = 0.0
+        for _ in range(args.ticks):
+            actions, probabilities = cache.decide_batch(field.states)
+            with torch.inference_mode():
+                expected = torch.softmax(model(torch.from_numpy(field.states)), dim=1).numpy()
+            agree += int((actions == expected.argmax(axis=1)).sum())
+            max_error = max(max_error, float(np.abs(probabilities - expected).max()))
+            field.tick()
+        stats = cache.stats()
+        accuracy = agree / (args.ticks * args.units)
+
+        # 정상 상태(워밍업된 캐시)에서 틱당 지연 시간
+        def timed(fn):
+            def tick():
+                field.tick()
+                fn()
+            return measure_latency(tick, repeat=args.repeat, warmup=2)['p50_ms']
+
+        tick_only = measure_latency(field.tick, repeat=args.repeat, warmup=2)['p50_ms']
+        unit_ms = timed(lambda: per_unit(model, field.states, out)) - tick_only
+        unit_cached_ms = timed(lambda: per_unit_cached(cache, field.states, out)) - tick_only
+        batch_ms = timed(lambda: batched(model, field.states)) - tick_only
+        batch_cached_ms = timed(lambda: cache.decide_batch(field.states)) - tick_only
+
+        label = 'default' if value == 0 else f"{value:g}"
+        print(f"{label:>10} {accuracy:8.4f} {max_error:9.4f} {stats['hit_rate']:9.3f} {stats['evictions']:7,} "
+              f"{unit_ms:9.3f} {unit_cached_ms:11.3f} {batch_ms:9.3f} {batch_cached_ms:12.3f}")
+
+    print("\nunit: 유닛마다 (1, 11) 호출 (UnitAIController.DecideAction 패턴), batch: 틱 전체 (N, 11) 한 번")
+    print("ms는 틱당 p50 (전장 갱신 시간 제외), agree/hit rate는 캐시 워밍업 틱 포함")
+
+
+if __name__ == '__main__':
+    main()
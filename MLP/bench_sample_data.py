@@ -0,0 +1,93 @@
+"""
+generate_sample_data (샘플별 루프) vs generate_sample_data_batch (벡터화) 비교
+
+실행 (저장소 루트에서):
+    python -m MLP.bench_sample_data
+    python -m MLP.bench_sample_data --sizes 10000 100000 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from MLP.mlp import (
+    create_state_vector,
+    draw_sample_columns,
+    generate_sample_data,
+    generate_sample_data_batch,
+    label_action,
+    label_actions,
+)
+
+
+def check_parity(num_samples=20000, seed=0):
+    """
+    같은 난수 열(column)에 대해 기존 규칙(label_action/create_state_vector)과
+    벡터화 경로(label_actions/generate_sample_data_batch)가 완전히 같은지 확인
+    """
+    columns = draw_sample_columns(num_samples, np.random.default_rng(seed))
+    states, actions = generate_sample_data_batch(num_samples, np.random.default_rng(seed))
+
+    expected_actions = np.array([
+        label_action(
+            columns['hp_ratio'][i],
+            columns['distance_to_nearest_enemy'][i],
+            columns['nearby_allies'][i],
+            columns['nearby_enemies'][i],
+        )
+        for i in range(num_samples)
+    ])
+    expected_states = np.array([
+        create_state_vector({name: values[i] for name, values in columns.items()})
+        for i in range(num_samples)
+    ])
+
+    vector_actions = label_actions(
+        columns['hp_ratio'],
+        columns['distance_to_nearest_enemy'],
+        columns['nearby_allies'],
+        columns['nearby_enemies'],
+    )
+    assert np.array_equal(vector_actions, expected_actions), "label_actions 결과가 다릅니다"
+    assert np.array_equal(actions, expected_actions), "레이블이 다릅니다"
+    assert np.array_equal(states, expected_states), "상태 벡터가 다릅니다"
+    assert states.dtype == np.float32 and actions.dtype == np.int64
+    print(f"동일성 확인: {num_samples}개 샘플의 상태 벡터/레이블이 모두 일치")
+
+
+def measure(fn, num_samples, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(num_samples)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="샘플 데이터 생성 처리량 비교")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--loop-limit', type=int, default=100000,
+                        help="이 크기를 넘으면 기존 루프는 측정하지 않음")
+    args = parser.parse_args()
+
+    check_parity()
+
+    rng = np.random.default_rng(0)
+    print(f"\n{'samples':>10} {'loop (s)':>10} {'batch (s)':>10} {'batch samples/s':>16} {'speedup':>8}")
+    for size in args.sizes:
+        batch_time = measure(lambda n: generate_sample_data_batch(n, rng), size, args.repeat)
+        if size <= args.loop_limit:
+            loop_time = measure(generate_sample_data, size, args.repeat)
+            loop_text = f"{loop_time:10.4f}"
+            speedup_text = f"{loop_time / batch_time:7.1f}x"
+        else:
+            loop_text = f"{'-':>10}"
+            speedup_text = f"{'-':>8}"
+        print(f"{size:>10} {loop_text} {batch_time:10.4f} {size / batch_time:16,.0f} {speedup_text}")
+
+
+if __name__ == '__main__':
+    main()
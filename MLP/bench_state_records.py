@@ -0,0 +1,77 @@
+"""
+유닛 상태 표현 비교: 샘플별 dict vs UNIT_STATE_DTYPE structured 배열
+
+- 메모리: tracemalloc으로 측정한 N개 상태 보관 비용 (바이트/유닛)
+- 정규화: dict마다 create_state_vector vs create_state_vectors(structured 배열)
+- 복사 없는 입력: feature_matrix view를 원본 값 입력 모델(RawInputModel)에 그대로 전달
+
+실행 (저장소 루트에서):
+    python -m MLP.bench_state_records --units 100000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import torch
+
+from Common.normalization import RawInputModel
+from Common.records import feature_matrix, records_from_dicts, records_to_dicts
+from MLP.mlp import (ACTIONS, STATE_FEATURE_SCALES, UNIT_STATE_DTYPE, UnitMLP, create_state_vector,
+                     create_state_vectors, draw_unit_states)
+
+
+def measure_allocation(build):
+    """
+    build()가 만든 객체가 차지하는 메모리 (바이트)와 객체
+    """
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="dict vs structured 배열 유닛 상태 비교")
+    parser.add_argument('--units', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    source = draw_unit_states(args.units, rng)
+
+    dict_bytes, dicts = measure_allocation(lambda: records_to_dicts(source))
+    record_bytes, records = measure_allocation(lambda: records_from_dicts(dicts, UNIT_STATE_DTYPE))
+    print(f"유닛 {args.units:,}개 보관 메모리")
+    print(f"    dict 목록:        {dict_bytes / args.units:8.1f} B/유닛 ({dict_bytes / 2**20:8.2f} MiB)")
+    print(f"    structured 배열:  {record_bytes / args.units:8.1f} B/유닛 ({record_bytes / 2**20:8.2f} MiB)")
+
+    start = time.perf_counter()
+    per_dict = np.stack([create_state_vector(d) for d in dicts])
+    dict_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    columnar = create_state_vectors(records)
+    record_seconds = time.perf_counter() - start
+    print(f"정규화 (N, 11) 생성")
+    print(f"    dict마다 create_state_vector:  {dict_seconds * 1000:9.2f} ms")
+    print(f"    create_state_vectors(배열):    {record_seconds * 1000:9.2f} ms "
+          f"({dict_seconds / record_seconds:.0f}x)")
+    assert np.array_equal(per_dict, columnar), "두 경로의 상태 벡터가 다릅니다"
+
+    matrix = feature_matrix(records)
+    print(f"feature_matrix view 메모리 공유: {np.shares_memory(matrix, records)} {matrix.shape}")
+
+    model = UnitMLP(len(UNIT_STATE_DTYPE.names), len(ACTIONS)).eval()
+    raw_model = RawInputModel(model, STATE_FEATURE_SCALES).eval()
+    with torch.no_grad():
+        raw = raw_model(torch.from_numpy(matrix))
+        normalized = model(torch.from_numpy(columnar))
+    print(f"원본 값 입력 모델 vs 정규화 후 입력: 최대 오차 {(raw - normalized).abs().max().item():.2e}")
+
+
+if __name__ == '__main__':
+    main()
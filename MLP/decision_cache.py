@@ -0,0 +1,177 @@
+"""
+양자화된 상태 키로 UnitMLP 결정을 재사용하는 LRU 캐시
+
+한 틱에 많은 유닛이 거의 같은 상태 벡터(예: HP 가득, 주변 적 없음)를 가지므로
+정규화된 11개 특성을 격자(grid)로 양자화한 키로 결과(행동, 행동 확률)를 캐시합니다.
+
+- 특성 i의 키 값 = round(x_i * resolution_i), 캐시 미스 때는 격자 중심 값(키 / resolution)으로 추론
+  -> 같은 칸의 상태는 들어온 순서와 상관없이 항상 같은 결과 (캐시 적중/미스가 결과를 바꾸지 않음)
+- 주변 아군/적군 수는 /10 정규화 값이라 resolution 10이면 정수 개수가 그대로 키가 됨
+- capacity를 넘으면 가장 오래 안 쓴 키부터 제거 (OrderedDict LRU)
+- 결과는 미리 할당한 (capacity, 행동 수) 배열의 슬롯에 저장하고 키 -> 슬롯만 딕셔너리로 관리
+  (배치 조회가 슬롯 인덱스 배열 한 번의 gather로 끝남, 제거된 키의 슬롯은 재사용)
+- hits / misses / evictions / hit_rate 지표, 모델 재로드 시 invalidate(model)
+
+효과가 큰 곳은 유닛마다 (1, 11) 추론을 호출하는 경로(UnitAIController.DecideAction 패턴)입니다.
+이미 틱 전체를 한 번에 추론하는 경우(BatchedActionEngine) 작은 UnitMLP는 forward가 조회보다
+싸므로 캐시 이득이 없습니다 (MLP.bench_decision_cache 참고).
+
+사용 예:
+    cache = DecisionCache(model, capacity=4096)
+    action, probabilities = cache.decide(state_vector)          # 유닛 하나 (11,)
+    actions, probabilities = cache.decide_batch(state_vectors)  # 틱 전체 (N, 11)
+    print(cache.stats())
+    cache.invalidate(new_model)                                 # 가중치 교체 후
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import torch
+
+STATE_SIZE = 11  # create_state_vector의 특성 개수
+
+# 특성별 격자 칸 수 (정규화 값 1.0당), 주변 아군/적군 수(인덱스 4, 5)는 정수 개수 단위
+DEFAULT_RESOLUTION = np.array([20, 20, 20, 20, 10, 10, 20, 20, 20, 20, 20], dtype=np.float32)
+
+
+class DecisionCache:
+    """
+    UnitMLP 앞단의 양자화 상태 LRU 캐시
+    - resolution: 스칼라(모든 특성 동일) 또는 특성별 (11,) 배열, 클수록 정확하고 적중률은 낮아짐
+    - capacity: 최대 키 수 (키 하나당 행동 + 확률 5개)
+    """
+
+    def __init__(self, model, resolution=DEFAULT_RESOLUTION, capacity=4096):
+        self.model = model.eval()
+        self.resolution = np.broadcast_to(np.asarray(resolution, dtype=np.float32), (STATE_SIZE,)).copy()
+        self.capacity = capacity
+        self._slots = OrderedDict()  # 키 -> 슬롯 (LRU 순서)
+        self._actions = np.zeros(capacity, dtype=np.int64)
+        self._probabilities = None  # 첫 추론에서 행동 수를 보고 할당
+        self.reset_stats()
+
+    def __len__(self):
+        return len(self._slots)
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate,
+            'size': len(self._slots),
+            'capacity': self.capacity,
+        }
+
+    def invalidate(self, model=None):
+        """
+        캐시 비우기 (모델을 다시 로드했거나 가중치를 바꾼 뒤 호출), model을 주면 교체
+        """
+        if model is not None:
+            self.model = model.eval()
+        self._slots.clear()
+        self._probabilities = None
+
+    def quantize(self, states):
+        """
+        (..., 11) 정규화 상태 -> 같은 shape의 int16 격자 좌표
+        """
+        return np.rint(np.asarray(states, dtype=np.float32) * self.resolution).astype(np.int16)
+
+    def _fill(self, keys, cells):
+        """
+        캐시에 없는 키들을 격자 중심 값으로 한 번에 추론해 슬롯에 저장, 슬롯 리스트 반환
+        """
+        centers = torch.from_numpy(cells.astype(np.float32) / self.resolution)
+        with torch.inference_mode():
+            probabilities = torch.softmax(self.model(centers), dim=1).numpy()
+        if self._probabilities is None:
+            self._probabilities = np.zeros((self.capacity, probabilities.shape[1]), dtype=np.float32)
+
+        slots = []
+        for key in keys:
+            if len(self._slots) < self.capacity:
+                slot = len(self._slots)
+            else:
+                _, slot = self._slots.popitem(last=False)
+                self.evictions += 1
+            self._slots[key] = slot
+            slots.append(slot)
+        # 한 번에 capacity보다 많은 키가 들어오면 앞쪽 키의 슬롯이 재사용되므로 마지막 값이 남음
+        self._probabilities[slots] = probabilities
+        self._actions[slots] = probabilities.argmax(axis=1)
+        return slots, probabilities
+
+    def decide(self, state):
+        """
+        유닛 하나 (11,) -> (행동, 행동 확률 (행동 수,))
+        """
+        cell = self.quantize(state)
+        key = cell.tobytes()
+        slot = self._slots.get(key)
+        if slot is not None:
+            self._slots.move_to_end(key)
+            self.hits += 1
+            return int(self._actions[slot]), self._probabilities[slot].copy()
+        self.misses += 1
+        _, probabilities = self._fill([key], cell[None])
+        return int(probabilities[0].argmax()), probabilities[0]
+
+    def decide_batch(self, states):
+        """
+        틱 전체 (N, 11) -> (행동 (N,), 행동 확률 (N, 행동 수))
+        - 같은 칸의 유닛들을 먼저 묶어 칸마다 한 번만 캐시 조회
+        - 캐시에 없는 칸은 한 번의 forward로 계산해 캐시에 추가
+        - 같은 틱 안에서 반복된 칸은 적중으로 셈
+        """
+        cells = np.ascontiguousarray(self.quantize(states))
+        # 행 하나(int16 11개)를 22바이트 void 값으로 보면 .tolist()가 바로 bytes 키를 줌
+        row_keys = cells.view(np.dtype((np.void, cells.itemsize * STATE_SIZE))).ravel().tolist()
+        unique = {}
+        inverse = np.fromiter((unique.setdefault(key, len(unique)) for key in row_keys),
+                              dtype=np.int64, count=len(row_keys))
+        if not unique:
+            return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32)
+
+        slots = self._slots
+        found = np.empty(len(unique), dtype=np.int64)
+        missing = []
+        for i, key in enumerate(unique):
+            slot = slots.get(key)
+            if slot is None:
+                missing.append(i)
+            else:
+                slots.move_to_end(key)
+                found[i] = slot
+        self.misses += len(missing)
+        self.hits += len(row_keys) - len(missing)
+
+        if missing:
+            keys = list(unique)
+            first_rows = np.unique(inverse, return_index=True)[1][missing]
+            if len(unique) > self.capacity:
+                # 한 틱의 칸 수가 캐시보다 많으면 새 칸을 넣다가 이번 틱에 적중한 슬롯까지 덮어쓰므로
+                # 적중 결과를 먼저 복사해 두고 조합 (캐시에는 마지막 capacity개 키만 남음)
+                hit = np.setdiff1d(np.arange(len(unique)), missing)
+                hit_probabilities = self._probabilities[found[hit]] if len(hit) else None
+                _, probabilities = self._fill([keys[i] for i in missing], cells[first_rows])
+                result = np.empty((len(unique), probabilities.shape[1]), dtype=np.float32)
+                result[missing] = probabilities
+                if len(hit):
+                    result[hit] = hit_probabilities
+                return result.argmax(axis=1)[inverse], result[inverse]
+            found[missing], _ = self._fill([keys[i] for i in missing], cells[first_rows])
+
+        rows = found[inverse]
+        return self._actions[rows], self._probabilities[rows]
@@ -0,0 +1,223 @@
+"""
+UnitMLP 지식 증류(knowledge distillation): 교사(11-64-64-32-5) -> 작은 학생(기본 11-16-5)
+
+- 교사 logits를 온도 T로 부드럽게 만든 분포를 학생이 따라가도록 학습 (KL x T^2)
+- alpha < 1이면 교사 argmax 행동에 대한 교차 엔트로피를 섞음
+- 교사가 레이블을 만들어 주므로 규칙 레이블 없이도 전이(transfer) 데이터를 얼마든지 생성 가능
+- 학생은 unit_action_mlp.onnx와 같은 입출력 이름으로 내보내 그대로 교체 가능
+- 학생 가중치(.pt)도 --output 옆에 저장해 Common.onnx_parity 검사나 가지치기에 사용
+- 교사는 구조를 가중치 shape에서 복원하므로 가지치기한 UnitMLP도 교사로 사용 가능
+
+리포트: 별도 평가 세트에서 교사 대비 행동 일치율, 규칙 레이블 정확도,
+PyTorch/ONNX Runtime 배치 1 지연 시간과 속도 향상
+
+실행 (저장소 루트에서):
+    python -m MLP.mlp                                   # 교사 학습, unit_action_mlp.pt 저장
+    python -m MLP.distill --teacher unit_action_mlp.pt --student-hidden 16
+    python -m MLP.distill                               # 교사를 이 스크립트에서 바로 학습
+    python -m Common.onnx_parity --models mlp --mlp-weights unit_action_mlp_student.pt \\
+        --mlp-onnx unit_action_mlp_student.onnx unit_action_mlp_student_raw.onnx
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from torch.utils.data import TensorDataset
+
+from Common.benchmarking import measure_latency
+from Common.checkpoint import checkpoint_from_args
+from Common.models import load_model
+from Common.training import accuracy_count, add_training_arguments, build_loaders, fit
+from MLP.mlp import ACTIONS, UnitMLP, export_onnx, export_raw_onnx, generate_sample_data_batch
+
+
+class DistillationLoss(nn.Module):
+    """
+    학생 logits와 교사 logits 사이의 증류 손실
+    - alpha * T^2 * KL(softmax(teacher / T) || softmax(student / T))
+      + (1 - alpha) * CE(student, argmax(teacher))
+    """
+
+    def __init__(self, temperature=4.0, alpha=0.9):
+        super().__init__()
+        self.temperature = temperature
+        self.alpha = alpha
+
+    def forward(self, student_logits, teacher_logits):
+        t = self.temperature
+        soft = F.kl_div(
+            F.log_softmax(student_logits / t, dim=1),
+            F.log_softmax(teacher_logits / t, dim=1),
+            reduction='batchmean',
+            log_target=True,
+        ) * (t * t)
+        if self.alpha >= 1.0:
+            return soft
+        hard = F.cross_entropy(student_logits, teacher_logits.argmax(dim=1))
+        return self.alpha * soft + (1.0 - self.alpha) * hard
+
+
+def agreement_count(pred, teacher_logits):
+    """
+    교사와 같은 행동을 고른 샘플 수 (fit 지표용)
+    """
+    return (pred.argmax(dim=1) == teacher_logits.argmax(dim=1)).float().sum()
+
+
+def teacher_logits(teacher, states, batch_size=65536):
+    """
+    교사 logits를 배치로 나눠 계산 (eval 모드, 기울기 없음)
+    """
+    teacher.eval()
+    with torch.inference_mode():
+        return torch.cat([teacher(states[i:i + batch_size]) for i in range(0, len(states), batch_size)])
+
+
+def onnx_latency(model, repeat):
+    """
+    모델을 임시 ONNX로 내보내 ORT 배치 1 지연 시간 측정 (onnxruntime 없으면 None)
+    """
+    try:
+        from Common.quantize import create_session, model_size_bytes
+    except ImportError:
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.onnx')
+        export_onnx(model, path)
+        try:
+            session = create_session(path)
+        except ImportError:
+            return None
+        feed = {'state': np.random.default_rng(0).random((1, 11), dtype=np.float32)}
+        stats = measure_latency(lambda: session.run(None, feed), repeat=repeat, warmup=20)
+        stats['size_bytes'] = model_size_bytes(path)
+    return stats
+
+
+def torch_latency(model, batch, repeat):
+    model.eval()
+    inputs = torch.rand(batch, 11)
+    with torch.inference_mode():
+        return measure_latency(lambda: model(inputs), repeat=repeat, warmup=20)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UnitMLP 지식 증류")
+    add_training_arguments(parser, epochs=500, samples=20000)
+    parser.add_argument('--teacher', help="교사 state_dict (.pt, 없으면 이 스크립트에서 학습)")
+    parser.add_argument('--teacher-epochs', type=int, default=1000)
+    parser.add_argument('--teacher-lr', type=float, default=0.001)
+    parser.add_argument('--student-hidden', type=int, nargs='+', default=[16], help="학생 은닉층 크기")
+    parser.add_argument('--temperature', type=float, default=4.0)
+    parser.add_argument('--alpha', type=float, default=0.9, help="soft 손실 비중 (나머지는 교사 argmax CE)")
+    parser.add_argument('--eval-samples', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=500, help="지연 시간 측정 반복 수")
+    parser.add_argument('--output', default='unit_action_mlp_student.onnx',
+                        help="학생 ONNX 경로 (같은 이름의 _raw.onnx, .pt도 함께 저장)")
+    parser.add_argument('--report', default='distillation_report.json')
+    # 작은 학생은 soft 타깃이 매끄러워 큰 학습률에서 빨리 수렴
+    parser.set_defaults(lr=0.01, batch_size=256)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        torch.manual_seed(args.seed)
+    seed = 0 if args.seed is None else args.seed
+
+    # 교사 준비
+    if args.teacher:
+        teacher = load_model('mlp', args.teacher)
+        print(f"교사 가중치 로드: {args.teacher}")
+    else:
+        teacher = UnitMLP(11, len(ACTIONS))
+        print("교사 학습 중...")
+        states, actions = generate_sample_data_batch(5000, np.random.default_rng(seed))
+        train_loader, val_loader = build_loaders(
+            TensorDataset(torch.from_numpy(states), torch.from_numpy(actions)), args)
+        fit(teacher, train_loader, nn.CrossEntropyLoss(), torch.optim.Adam(teacher.parameters(), lr=args.teacher_lr),
+            args.teacher_epochs, metrics={'accuracy': accuracy_count}, log_every=0, val_loader=val_loader,
+            patience=args.patience, min_delta=args.min_delta)
+    teacher.eval()
+
+    # 전이 데이터: 교사 logits가 타깃 (규칙 레이블은 평가에만 사용)
+    states, _ = generate_sample_data_batch(args.samples, np.random.default_rng(seed + 1))
+    states = torch.from_numpy(states)
+    dataset = TensorDataset(states, teacher_logits(teacher, states))
+
+    student = UnitMLP(11, len(ACTIONS), tuple(args.student_hidden), dropout=0.0)
+    print(f"\n학생 {tuple(args.student_hidden)} 증류 중 (T={args.temperature}, alpha={args.alpha})...")
+    train_loader, val_loader = build_loaders(dataset, args)
+    checkpoint, resume = checkpoint_from_args(args)
+    history = fit(
+        student, train_loader, DistillationLoss(args.temperature, args.alpha),
+        torch.optim.Adam(student.parameters(), lr=args.lr), args.epochs,
+        metrics={'agreement': agreement_count},
+        log_every=args.log_every,
+        val_loader=val_loader,
+        patience=args.patience,
+        min_delta=args.min_delta,
+        time_budget=args.time_budget,
+        checkpoint=checkpoint,
+        resume=resume,
+    )
+    student.eval()
+
+    # 평가: 새 데이터에서 교사 일치율과 규칙 레이블 정확도
+    eval_states, eval_actions = generate_sample_data_batch(args.eval_samples, np.random.default_rng(seed + 2))
+    eval_states = torch.from_numpy(eval_states)
+    eval_actions = torch.from_numpy(eval_actions)
+    with torch.inference_mode():
+        teacher_actions = teacher(eval_states).argmax(dim=1)
+        student_actions = student(eval_states).argmax(dim=1)
+
+    report = {
+        'student_hidden': args.student_hidden,
+        'temperature': args.temperature,
+        'alpha': args.alpha,
+        'epochs': history['stopped_epoch'],
+        'agreement': (student_actions == teacher_actions).float().mean().item(),
+        'models': {},
+    }
+    for name, model, actions in (('teacher', teacher, teacher_actions), ('student', student, student_actions)):
+        report['models'][name] = {
+            'parameters': sum(p.numel() for p in model.parameters()),
+            'label_accuracy': (actions == eval_actions).float().mean().item(),
+            'torch_b1': torch_latency(model, 1, args.repeat),
+            'torch_b256': torch_latency(model, 256, args.repeat),
+            'onnxruntime_b1': onnx_latency(model, args.repeat),
+        }
+
+    print("\n=== 증류 결과 ===")
+    print(f"교사 대비 행동 일치율: {report['agreement']:.4f} ({args.eval_samples:,}개 평가 샘플)")
+    print(f"{'':>8} {'params':>8} {'label acc':>10} {'torch b1 ms':>12} {'torch b256 ms':>14} {'ORT b1 ms':>10}")
+    for name, entry in report['models'].items():
+        ort = entry['onnxruntime_b1']
+        print(f"{name:>8} {entry['parameters']:8,} {entry['label_accuracy']:10.4f} "
+              f"{entry['torch_b1']['p50_ms']:12.4f} {entry['torch_b256']['p50_ms']:14.4f} "
+              f"{ort['p50_ms'] if ort else float('nan'):10.4f}")
+    teacher_entry, student_entry = report['models']['teacher'], report['models']['student']
+    report['speedup'] = {
+        key: teacher_entry[key]['p50_ms'] / student_entry[key]['p50_ms']
+        for key in ('torch_b1', 'torch_b256', 'onnxruntime_b1') if teacher_entry[key] and student_entry[key]
+    }
+    print("속도 향상 (p50): " + ", ".join(f"{key} {value:.2f}x" for key, value in report['speedup'].items()))
+
+    export_onnx(student, args.output)
+    raw_output = os.path.splitext(args.output)[0] + '_raw.onnx'
+    export_raw_onnx(student, raw_output)
+    weights_output = os.path.splitext(args.output)[0] + '.pt'
+    torch.save(student.state_dict(), weights_output)
+    print(f"\n학생 모델 저장: {args.output} (state 입력), {raw_output} (raw_state 입력), {weights_output} (가중치)")
+
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"리포트 저장: {args.report}")
+
+
+if __name__ == '__main__':
+    main()
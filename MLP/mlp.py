@@ -1,7 +1,19 @@
+import argparse
+import os
+
 import torch
 import torch.nn as nn
-import matplotlib.pyplot as plt
 import numpy as np
+from torch.utils.data import TensorDataset
+
+from Common.checkpoint import checkpoint_from_args
+from Common.normalization import RawInputModel
+from Common.onnx_export import export_onnx_model
+from Common.dataset_cache import generate_cached
+from Common.profiling import NULL_PROFILER, Profiler
+from Common.records import records_from_columns, records_from_dicts
+from Common.shards import ShardedDataset
+from Common.training import accuracy_count, add_training_arguments, build_loaders, fit
 
 # 행동 정의
 ACTIONS = {
@@ -12,20 +24,41 @@ ACTIONS = {
     'MOVE_FORWARD': 4
 }
 
+# create_state_vector의 특성 순서와 정규화 스케일 (정규화 값 = 원본 값 / 스케일)
+STATE_FEATURES = (
+    'hp_ratio',
+    'attack',
+    'defense',
+    'distance_to_nearest_enemy',
+    'nearby_allies',
+    'nearby_enemies',
+    'allies_avg_hp',
+    'enemies_avg_hp',
+    'position_x',
+    'position_y',
+    'distance_to_objective',
+)
+STATE_FEATURE_SCALES = np.array([1.0, 100.0, 100.0, 100.0, 10.0, 10.0, 1.0, 1.0, 100.0, 100.0, 100.0])
+
+# 원본 유닛 상태 레코드 (필드 순서 = STATE_FEATURES, 모두 float32 -> 44바이트/유닛)
+# C#에서는 같은 순서의 float 필드 11개짜리 Pack=1 구조체, 정수 필드(주변 유닛 수)도 float로 저장
+UNIT_STATE_DTYPE = np.dtype([(name, '<f4') for name in STATE_FEATURES])
+
+
 class UnitMLP(nn.Module):
-    def __init__(self, input_size, output_size):
+    def __init__(self, input_size, output_size, hidden_sizes=(64, 64, 32), dropout=0.2):
         super().__init__()
-        self.net = nn.Sequential(
-            nn.Linear(input_size, 64),
-            nn.ReLU(),
-            nn.Dropout(0.2),
-            nn.Linear(64, 64),
-            nn.ReLU(),
-            nn.Dropout(0.2),
-            nn.Linear(64, 32),
-            nn.ReLU(),
-            nn.Linear(32, output_size)
-        )
+        # 은닉층마다 Linear + ReLU, 마지막 은닉층을 제외하고 Dropout
+        # (기본값이면 기존 64/64/32 구조와 같은 레이어 순서라 저장된 state_dict를 그대로 읽음)
+        layers = []
+        size = input_size
+        for i, hidden in enumerate(hidden_sizes):
+            layers += [nn.Linear(size, hidden), nn.ReLU()]
+            if i < len(hidden_sizes) - 1:
+                layers.append(nn.Dropout(dropout))
+            size = hidden
+        layers.append(nn.Linear(size, output_size))
+        self.net = nn.Sequential(*layers)
 
     def forward(self, x):
         return self.net(x)
@@ -46,19 +79,92 @@ def create_state_vector(unit_data):
     - 현재 위치 (x, y 정규화)
     - 목표 위치까지의 거리 (정규화)
     """
-    return np.array([
-        unit_data['hp_ratio'],
-        unit_data['attack'] / 100.0,
-        unit_data['defense'] / 100.0,
-        unit_data['distance_to_nearest_enemy'] / 100.0,
-        unit_data['nearby_allies'] / 10.0,
-        unit_data['nearby_enemies'] / 10.0,
-        unit_data['allies_avg_hp'],
-        unit_data['enemies_avg_hp'],
-        unit_data['position_x'] / 100.0,
-        unit_data['position_y'] / 100.0,
-        unit_data['distance_to_objective'] / 100.0
-    ], dtype=np.float32)
+    # 스케일은 STATE_FEATURE_SCALES 한 곳에만 정의 (raw_ ONNX 입력 정규화와 항상 같은 값)
+    values = np.array([unit_data[name] for name in STATE_FEATURES], dtype=np.float64)
+    return (values / STATE_FEATURE_SCALES).astype(np.float32)
+
+
+def create_state_vectors(units):
+    """
+    create_state_vector의 배열 버전
+    - units: STATE_FEATURES 이름의 필드를 가진 structured 배열(UNIT_STATE_DTYPE) 또는 같은 키의 열 딕셔너리
+    - 필드 이름으로 열 전체를 한 번에 정규화 (float64로 계산 후 float32로 변환)
+    - 반환값: (N, 11) float32
+    """
+    first = np.asarray(units[STATE_FEATURES[0]])
+    states = np.empty(first.shape + (len(STATE_FEATURES),), dtype=np.float32)
+    for i, name in enumerate(STATE_FEATURES):
+        states[..., i] = units[name] / STATE_FEATURE_SCALES[i]
+    return states
+
+
+def export_onnx(model, path="unit_action_mlp.onnx"):
+    """
+    정규화된 상태 벡터(state)를 입력받는 ONNX 내보내기
+    - state: (batch, 11) create_state_vector 결과, action_logits: (batch, 5)
+    """
+    # 배치 크기 1은 트레이서가 상수로 고정할 수 있어 더미 입력은 배치 2로 사용
+    export_onnx_model(
+        model.eval(),
+        torch.zeros(2, len(STATE_FEATURES)),
+        path,
+        input_names=["state"],
+        output_names=["action_logits"],
+        dynamic_axes={'state': {0: 'batch_size'}, 'action_logits': {0: 'batch_size'}}
+    )
+
+
+def export_raw_onnx(model, path="unit_action_mlp_raw.onnx"):
+    """
+    정규화 층을 포함해 원본 게임 값(raw_state)을 바로 입력받는 ONNX 내보내기
+    - raw_state: (batch, 11) STATE_FEATURES 순서의 원본 값 (HP 비율, 공격력 0~100, ...)
+    """
+    # 배치 크기 1은 트레이서가 상수로 고정할 수 있어 더미 입력은 배치 2로 사용
+    export_onnx_model(
+        RawInputModel(model, STATE_FEATURE_SCALES).eval(),
+        torch.zeros(2, len(STATE_FEATURES)),
+        path,
+        input_names=["raw_state"],
+        output_names=["action_logits"],
+        dynamic_axes={'raw_state': {0: 'batch_size'}, 'action_logits': {0: 'batch_size'}}
+    )
+
+
+def label_action(hp_ratio, distance_to_enemy, nearby_allies, nearby_enemies):
+    """
+    간단한 규칙 기반 레이블링 (실제로는 전문가 데이터 필요)
+    """
+    if hp_ratio < 0.3 or (nearby_enemies > nearby_allies + 2):
+        return ACTIONS['RETREAT']  # 후퇴
+    elif distance_to_enemy < 15 and hp_ratio > 0.6:
+        return ACTIONS['ATTACK']  # 공격
+    elif nearby_enemies > 0 and hp_ratio > 0.4:
+        return ACTIONS['DEFEND']  # 방어
+    elif distance_to_enemy > 30:
+        return ACTIONS['MOVE_FORWARD']  # 전진
+    else:
+        return ACTIONS['WAIT']  # 대기
+
+
+def label_actions(hp_ratio, distance_to_enemy, nearby_allies, nearby_enemies):
+    """
+    label_action의 배열 버전
+    - 각 인자는 같은 길이의 1D 배열
+    - np.select는 첫 번째로 참인 조건을 고르므로 if/elif 순서와 동일한 결과
+    """
+    conditions = [
+        (hp_ratio < 0.3) | (nearby_enemies > nearby_allies + 2),
+        (distance_to_enemy < 15) & (hp_ratio > 0.6),
+        (nearby_enemies > 0) & (hp_ratio > 0.4),
+        distance_to_enemy > 30,
+    ]
+    choices = [
+        ACTIONS['RETREAT'],
+        ACTIONS['ATTACK'],
+        ACTIONS['DEFEND'],
+        ACTIONS['MOVE_FORWARD'],
+    ]
+    return np.select(conditions, choices, default=ACTIONS['WAIT']).astype(np.int64)
 
 
 # 예제 훈련 데이터 생성 (실제로는 게임 플레이 데이터 수집 필요)
@@ -99,17 +205,7 @@ def generate_sample_data(num_samples=1000):
             'distance_to_objective': dist_objective
         })
         
-        # 간단한 규칙 기반 레이블링 (실제로는 전문가 데이터 필요)
-        if hp_ratio < 0.3 or (nearby_enemies > nearby_allies + 2):
-            action = ACTIONS['RETREAT']  # 후퇴
-        elif distance_to_enemy < 15 and hp_ratio > 0.6:
-            action = ACTIONS['ATTACK']  # 공격
-        elif nearby_enemies > 0 and hp_ratio > 0.4:
-            action = ACTIONS['DEFEND']  # 방어
-        elif distance_to_enemy > 30:
-            action = ACTIONS['MOVE_FORWARD']  # 전진
-        else:
-            action = ACTIONS['WAIT']  # 대기
+        action = label_action(hp_ratio, distance_to_enemy, nearby_allies, nearby_enemies)
         
         states.append(state)
         actions.append(action)
@@ -117,69 +213,57 @@ def generate_sample_data(num_samples=1000):
     return np.array(states), np.array(actions)
 
 
-# 학습 설정
-input_size = 11  # create_state_vector의 특성 개수
-output_size = len(ACTIONS)  # 행동 개수
+# 생성 데이터 버전 (Common.dataset_cache 키에 포함, 이 모듈 밖의 변경으로 생성 결과가 바뀌면 올림)
+DATASET_VERSION = 1
 
-# 데이터 생성
-print("훈련 데이터 생성 중...")
-states, actions = generate_sample_data(5000)
-x = torch.FloatTensor(states)
-y = torch.LongTensor(actions)
 
-print(f"입력 크기: {input_size}")
-print(f"출력 크기: {output_size}")
-print(f"행동 종류: {list(ACTIONS.keys())}")
-print(f"훈련 샘플 수: {len(x)}\n")
+def draw_sample_columns(num_samples, rng=None):
+    """
+    generate_sample_data와 같은 분포로 11개 원본 특성을 열(column) 단위로 한 번에 뽑기
+    반환값: create_state_vector의 키를 그대로 쓰는 {이름: 1D 배열} 딕셔너리
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    return {
+        'hp_ratio': rng.uniform(0.1, 1.0, num_samples),
+        'attack': rng.uniform(30, 100, num_samples),
+        'defense': rng.uniform(20, 80, num_samples),
+        'distance_to_nearest_enemy': rng.uniform(5, 100, num_samples),
+        'nearby_allies': rng.integers(0, 10, num_samples),
+        'nearby_enemies': rng.integers(0, 10, num_samples),
+        'allies_avg_hp': rng.uniform(0.3, 1.0, num_samples),
+        'enemies_avg_hp': rng.uniform(0.3, 1.0, num_samples),
+        'position_x': rng.uniform(0, 100, num_samples),
+        'position_y': rng.uniform(0, 100, num_samples),
+        'distance_to_objective': rng.uniform(10, 100, num_samples),
+    }
 
-model = UnitMLP(input_size, output_size)
-loss_fn = nn.CrossEntropyLoss()  # 분류 문제이므로 CrossEntropyLoss 사용
-optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
 
-losses = []
-accuracies = []
+def draw_unit_states(num_samples, rng=None):
+    """
+    draw_sample_columns와 같은 분포의 원본 유닛 상태를 UNIT_STATE_DTYPE 배열로 생성
+    - Common.records.feature_matrix로 (N, 11) view를 만들어 원본 값 입력 모델에 바로 전달 가능
+    """
+    return records_from_columns(draw_sample_columns(num_samples, rng), UNIT_STATE_DTYPE)
 
-for epoch in range(1000):
-    pred = model(x)
-    loss = loss_fn(pred, y)
-    
-    # 정확도 계산
-    with torch.no_grad():
-        predicted_actions = torch.argmax(pred, dim=1)
-        accuracy = (predicted_actions == y).float().mean().item()
-        accuracies.append(accuracy)
-    
-    optimizer.zero_grad()
-    loss.backward()
-    optimizer.step()
-    
-    losses.append(loss.item())
-    if (epoch + 1) % 100 == 0:
-        print(f"Epoch {epoch + 1}/1000, Loss: {loss.item():.6f}, Accuracy: {accuracy:.4f}")
-
-# Plot training loss and accuracy
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 5))
-
-ax1.plot(losses)
-ax1.set_xlabel('Epoch')
-ax1.set_ylabel('Loss')
-ax1.set_title('Training Loss Over Time')
-ax1.grid(True)
-
-ax2.plot(accuracies)
-ax2.set_xlabel('Epoch')
-ax2.set_ylabel('Accuracy')
-ax2.set_title('Training Accuracy Over Time')
-ax2.grid(True)
-
-plt.tight_layout()
-plt.savefig('training_results.png')
-plt.show()
-print("\n학습 완료! training_results.png 파일이 생성되었습니다.")
-
-# 테스트 예제
-print("\n=== 테스트 예제 ===")
-test_cases = [
+
+def generate_sample_data_batch(num_samples=1000, rng=None):
+    """
+    generate_sample_data의 벡터화 버전
+    - 샘플마다 dict를 만들지 않고 특성 전체를 배열로 생성/정규화/레이블링
+    - 반환값: states (N, 11) float32, actions (N,) int64
+    """
+    columns = draw_sample_columns(num_samples, rng)
+    states = create_state_vectors(columns)
+    actions = label_actions(
+        columns['hp_ratio'],
+        columns['distance_to_nearest_enemy'],
+        columns['nearby_allies'],
+        columns['nearby_enemies'],
+    )
+    return states, actions
+
+
+TEST_CASES = [
     {
         'name': '낮은 체력, 적이 많음',
         'data': {'hp_ratio': 0.2, 'attack': 50, 'defense': 40, 
@@ -203,38 +287,188 @@ test_cases = [
     }
 ]
 
-model.eval()
-action_names = {v: k for k, v in ACTIONS.items()}
 
-with torch.no_grad():
-    for test in test_cases:
-        state = create_state_vector(test['data'])
-        state_tensor = torch.FloatTensor(state).unsqueeze(0)
-        output = model(state_tensor)
-        probabilities = torch.softmax(output, dim=1)[0]
-        predicted_action = torch.argmax(output, dim=1).item()
-        
-        print(f"\n시나리오: {test['name']}")
-        print(f"  예측된 행동: {action_names[predicted_action]}")
+def build_dataset(args):
+    """
+    학습 데이터셋 준비
+    - args.data가 있으면 기록된 게임 로그 샤드, 없으면 합성 데이터 args.samples개
+    - args.generator == 'sim'이면 전투 시뮬레이터(Common.battle_sim)로 생성
+    - args.cache_dir가 있으면 같은 조건으로 만든 데이터를 디스크 캐시에서 재사용
+    """
+    if args.data:
+        print(f"샤드 데이터셋 사용: {args.data}")
+        return ShardedDataset(args.data, schema='state')
+    print("훈련 데이터 생성 중...")
+    generator = generate_sample_data_batch
+    if args.generator == 'sim':
+        from Common.battle_sim import simulate_sample_data as generator
+    states, actions = generate_cached(args, generator)
+    return TensorDataset(torch.from_numpy(states), torch.from_numpy(actions))
+
+
+def train_model(dataset, args, profiler=None):
+    """
+    UnitMLP를 만들어 dataset으로 학습
+    - --checkpoint-dir / --resume이 있으면 주기적으로 저장하고 마지막 체크포인트에서 재개
+    - profiler(Common.profiling.Profiler)가 있으면 배치 구간별 시간 기록
+    - 반환: (CPU로 옮긴 모델, fit history)
+    """
+    # 첫 옵티마이저 생성은 torch._dynamo import(수 초)를 포함하므로 setup 구간으로 따로 기록
+    with (profiler or NULL_PROFILER).phase('setup'):
+        model = UnitMLP(11, len(ACTIONS)).to(args.device)
+        loss_fn = nn.CrossEntropyLoss()  # 분류 문제이므로 CrossEntropyLoss 사용
+        optimizer = torch.optim.Adam(model.parameters(), lr=args.lr)
+        train_loader, val_loader = build_loaders(dataset, args)
+        checkpoint, resume = checkpoint_from_args(args)
+    history = fit(
+        model, train_loader, loss_fn, optimizer, args.epochs,
+        metrics={'accuracy': accuracy_count},
+        device=args.device,
+        log_every=args.log_every,
+        val_loader=val_loader,
+        patience=args.patience,
+        min_delta=args.min_delta,
+        time_budget=args.time_budget,
+        checkpoint=checkpoint,
+        resume=resume,
+        profiler=profiler,
+    )
+    return model.to('cpu'), history
+
+
+def plot_history(history, path='training_results.png', show=True):
+    """
+    학습 손실/정확도 곡선을 path에 저장 (matplotlib은 여기서만 import)
+    - show=False: 창을 띄우지 않음 (Agg 백엔드, 헤드리스 서버용)
+    """
+    import matplotlib
+    if not show:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 5))
+
+    ax1.plot(history['loss'], label='Train')
+    if 'val_loss' in history:
+        ax1.plot(history['val_loss'], label='Validation')
+        ax1.legend()
+    ax1.set_xlabel('Epoch')
+    ax1.set_ylabel('Loss')
+    ax1.set_title('Training Loss Over Time')
+    ax1.grid(True)
+
+    ax2.plot(history['accuracy'], label='Train')
+    if 'val_accuracy' in history:
+        ax2.plot(history['val_accuracy'], label='Validation')
+        ax2.legend()
+    ax2.set_xlabel('Epoch')
+    ax2.set_ylabel('Accuracy')
+    ax2.set_title('Training Accuracy Over Time')
+    ax2.grid(True)
+
+    plt.tight_layout()
+    plt.savefig(path)
+    if show:
+        plt.show()
+    plt.close(fig)
+
+
+def predict_test_cases(model, test_cases=TEST_CASES):
+    """
+    시나리오 dict들을 UNIT_STATE_DTYPE 레코드로 모아 한 번에 정규화/추론
+    - 반환: [(시나리오 이름, 행동 이름, 행동별 확률 dict)]
+    """
+    model.eval()
+    action_names = {v: k for k, v in ACTIONS.items()}
+    test_states = records_from_dicts([test['data'] for test in test_cases], UNIT_STATE_DTYPE)
+    with torch.no_grad():
+        outputs = model(torch.from_numpy(create_state_vectors(test_states)))
+    probabilities = torch.softmax(outputs, dim=1)
+    return [
+        (test['name'], action_names[action],
+         {name: probs[action_id].item() for name, action_id in ACTIONS.items()})
+        for test, probs, action in zip(test_cases, probabilities, outputs.argmax(dim=1).tolist())
+    ]
+
+
+def export_models(model, output_dir='.'):
+    """
+    학습된 모델을 output_dir에 저장
+    - unit_action_mlp.onnx (state 입력), unit_action_mlp_raw.onnx (raw_state 입력), unit_action_mlp.pt
+    - 반환: 저장한 파일 경로 리스트
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = [os.path.join(output_dir, name)
+             for name in ('unit_action_mlp.onnx', 'unit_action_mlp.pt', 'unit_action_mlp_raw.onnx')]
+    export_onnx(model, paths[0])
+    torch.save(model.state_dict(), paths[1])
+    export_raw_onnx(model, paths[2])
+    return paths
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="UnitMLP 행동 결정 모델 학습")
+    add_training_arguments(parser, epochs=1000, samples=5000)
+    group = parser.add_argument_group('출력')
+    group.add_argument('--output-dir', default='.', help="ONNX/가중치/그래프 저장 디렉터리")
+    group.add_argument('--headless', action='store_true',
+                       help="창을 띄우지 않음 (그래프는 파일로만 저장, 배치 서버용)")
+    group.add_argument('--no-plot', action='store_true', help="학습 곡선 그래프 생략 (matplotlib 불필요)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    # 실행: 저장소 루트에서 python -m MLP.mlp [--batch-size 256 --headless ...]
+    args = parse_args(argv)
+
+    if args.seed is not None:
+        torch.manual_seed(args.seed)
+    profiler = Profiler(enabled=bool(args.profile or args.torch_trace), trace_path=args.torch_trace)
+
+    # 데이터 생성 (또는 기록된 게임 로그 샤드 사용)
+    with profiler.phase('data_generation'):
+        dataset = build_dataset(args)
+
+    print("입력 크기: 11")
+    print(f"출력 크기: {len(ACTIONS)}")
+    print(f"행동 종류: {list(ACTIONS.keys())}")
+    print(f"훈련 샘플 수: {len(dataset)}")
+    print(f"배치 크기: {args.batch_size or '전체'}\n")
+
+    with profiler.phase('training'):
+        model, history = train_model(dataset, args, profiler)
+
+    if not args.no_plot:
+        plot_path = os.path.join(args.output_dir, 'training_results.png')
+        os.makedirs(args.output_dir, exist_ok=True)
+        with profiler.phase('plot'):
+            plot_history(history, plot_path, show=not args.headless)
+        print(f"\n학습 완료! {plot_path} 파일이 생성되었습니다.")
+
+    # 테스트 예제
+    print("\n=== 테스트 예제 ===")
+    with profiler.phase('inference'):
+        predictions = predict_test_cases(model)
+    for name, action, probabilities in predictions:
+        print(f"\n시나리오: {name}")
+        print(f"  예측된 행동: {action}")
         print(f"  행동 확률:")
-        for action_name, action_id in ACTIONS.items():
-            print(f"    {action_name}: {probabilities[action_id].item():.3f}")
+        for action_name, probability in probabilities.items():
+            print(f"    {action_name}: {probability:.3f}")
 
+    with profiler.phase('export'):
+        onnx_path, weights_path, raw_path = export_models(model, args.output_dir)
+    print(f"\nONNX 모델이 {onnx_path} 파일로 저장되었습니다.")
+    print(f"PyTorch 가중치가 {weights_path} 파일로 저장되었습니다 (python -m MLP.distill --teacher).")
+    print(f"정규화 층을 포함한 원본 값 입력 모델이 {raw_path} 파일로 저장되었습니다.")
 
+    if args.profile:
+        profiler.print_summary()
+        print("프로파일 저장: " + ", ".join(profiler.save(args.profile)))
 
-dummy_input = torch.randn(1, input_size)
 
-torch.onnx.export(
-    model,
-    dummy_input,
-    "unit_action_mlp.onnx",
-    input_names=["state"],
-    output_names=["action_logits"],
-    opset_version=13,
-    do_constant_folding=True,
-    dynamic_axes={'state': {0: 'batch_size'}, 'action_logits': {0: 'batch_size'}}
-)
-print("\nONNX 모델이 unit_action_mlp.onnx 파일로 저장되었습니다.")
+if __name__ == '__main__':
+    main()
 
 
 # ==========================================
@@ -245,10 +479,11 @@ C# 코드 예제:
 
 using Unity.Sentis;
 using UnityEngine;
+using System.Runtime.InteropServices;
 
 public class UnitAIController : MonoBehaviour
 {
-    [SerializeField] ModelAsset modelAsset;
+    [SerializeField] ModelAsset modelAsset;  // unit_action_mlp_raw.onnx (정규화 층 포함)
     
     private Model model;
     private IWorker worker;
@@ -271,20 +506,20 @@ public class UnitAIController : MonoBehaviour
     
     public UnitAction DecideAction(UnitState state)
     {
-        // 1. 상태 벡터 생성 (Python의 create_state_vector와 동일)
+        // 1. 원본 상태 값 (Python의 STATE_FEATURES 순서, 정규화는 모델 그래프 안에서 수행)
         float[] stateVector = new float[11]
         {
-            state.hpRatio,                          // HP 비율
-            state.attack / 100f,                     // 공격력 (정규화)
-            state.defense / 100f,                    // 방어력 (정규화)
-            state.distanceToNearestEnemy / 100f,    // 가장 가까운 적까지의 거리
-            state.nearbyAllies / 10f,               // 주변 아군 수
-            state.nearbyEnemies / 10f,              // 주변 적군 수
-            state.alliesAvgHp,                      // 아군 평균 HP
-            state.enemiesAvgHp,                     // 적군 평균 HP
-            state.positionX / 100f,                 // 현재 x 위치
-            state.positionY / 100f,                 // 현재 y 위치
-            state.distanceToObjective / 100f        // 목표까지의 거리
+            state.hpRatio,                  // HP 비율
+            state.attack,                   // 공격력
+            state.defense,                  // 방어력
+            state.distanceToNearestEnemy,   // 가장 가까운 적까지의 거리
+            state.nearbyAllies,             // 주변 아군 수
+            state.nearbyEnemies,            // 주변 적군 수
+            state.alliesAvgHp,              // 아군 평균 HP
+            state.enemiesAvgHp,             // 적군 평균 HP
+            state.positionX,                // 현재 x 위치
+            state.positionY,                // 현재 y 위치
+            state.distanceToObjective       // 목표까지의 거리
         };
         
         // 2. 입력 텐서 생성
@@ -324,15 +559,17 @@ public class UnitAIController : MonoBehaviour
     }
 }
 
-// 유닛 상태 구조체
+// 유닛 상태 구조체 (Python의 UNIT_STATE_DTYPE과 같은 레이아웃: float 11개, 44바이트)
+// NativeArray<UnitState>를 float 배열로 재해석하면 (N, 11) raw_state 입력이 됨
+[StructLayout(LayoutKind.Sequential, Pack = 1)]
 public struct UnitState
 {
     public float hpRatio;
     public float attack;
     public float defense;
     public float distanceToNearestEnemy;
-    public int nearbyAllies;
-    public int nearbyEnemies;
+    public float nearbyAllies;
+    public float nearbyEnemies;
     public float alliesAvgHp;
     public float enemiesAvgHp;
     public float positionX;